@@ -0,0 +1,260 @@
+#!/usr/bin/python
+
+"""
+Asyncio Core
+
+This module runs the stack on an asyncio event loop rather than the core
+run() loop.  Tasks are scheduled with loop.call_at(), deferred functions
+with loop.call_soon(), and the sockets of the UDP and TCP directors are
+watched by the loop so the stacks built on them run unchanged.  Call
+setup() before building the application to embed the stack in an
+application that already has an event loop, or run() in place of
+core.run().  It does not need asyncore.
+"""
+
+import asyncio
+
+from time import time as _time
+
+from . import core
+from .task import TaskManager, RecurringTask, OneShotDeleteTask
+from .debugging import bacpypes_debugging, ModuleLogger
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   _event_loop
+#
+
+def _event_loop():
+    """Return the running event loop, or a new one that becomes the current
+    loop of this thread when there isn't one running yet."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    return loop
+
+#
+#   AsyncioTaskManager
+#
+
+@bacpypes_debugging
+class AsyncioTaskManager(TaskManager):
+
+    """A task manager where each scheduled task is a loop.call_at() timer,
+    the entry of the task is the timer handle.
+    """
+
+    def __init__(self, loop=None):
+        if _debug: AsyncioTaskManager._debug("__init__ loop=%r", loop)
+
+        # the loop is needed for the tasks that are waiting to be installed
+        self.loop = loop or _event_loop()
+
+        # stopped by stop() when started by run()
+        self.running = False
+
+        # dispatchers watched by the loop, fd to dispatcher
+        self.readers = {}
+        self.writers = {}
+        self.syncPending = False
+
+        TaskManager.__init__(self)
+
+        # the loop wakes up on its own, no trigger
+        if self.trigger:
+            self.trigger.close()
+            self.trigger = None
+
+    def install_task(self, task):
+        if _debug: AsyncioTaskManager._debug("install_task %r @ %r", task, task.taskTime)
+
+        # if the taskTime is None is hasn't been computed correctly
+        if task.taskTime is None:
+            raise RuntimeError("task time is None")
+
+        # if this is already installed, cancel the old timer
+        if task.isScheduled:
+            task._taskEntry.cancel()
+
+        # the loop has its own clock
+        when = self.loop.time() + (task.taskTime - _time())
+        task._taskEntry = self.loop.call_at(when, self._run_task, task)
+        task.isScheduled = True
+
+    def suspend_task(self, task):
+        if _debug: AsyncioTaskManager._debug("suspend_task %r", task)
+
+        if task.isScheduled:
+            if _debug: AsyncioTaskManager._debug("    - task found")
+            task._taskEntry.cancel()
+            task._taskEntry = None
+            task.isScheduled = False
+        else:
+            if _debug: AsyncioTaskManager._debug("    - task not found")
+
+    def get_next_task(self):
+        """The loop runs the tasks, there are never any to get."""
+        return (None, None)
+
+    def process_task(self, task):
+        if _debug: AsyncioTaskManager._debug("process_task %r", task)
+
+        # process the task
+        task.process_task()
+
+        # see if it should be rescheduled
+        if isinstance(task, RecurringTask):
+            task.install_task()
+        elif isinstance(task, OneShotDeleteTask):
+            del task
+
+    def _run_task(self, task):
+        """Called by the loop when it is time for the task."""
+        task._taskEntry = None
+        task.isScheduled = False
+
+        try:
+            self.process_task(task)
+        finally:
+            self.sync_dispatchers()
+
+    def deferred(self, fn, args, kwargs):
+        """Call a function when the loop has a chance, this may be called
+        from other threads."""
+        self.loop.call_soon_threadsafe(self._call_deferred, fn, args, kwargs)
+
+    def _call_deferred(self, fn, args, kwargs):
+        try:
+            fn(*args, **kwargs)
+        finally:
+            self.sync_dispatchers()
+
+    def sync_dispatchers(self):
+        """Something has run that might have changed what the dispatchers
+        want to do, check them when the loop has a chance.  This may be
+        called from other threads and wakes up the loop."""
+        if self.syncPending:
+            return
+
+        self.syncPending = True
+        self.loop.call_soon_threadsafe(self._sync_dispatchers)
+
+    def _sync_dispatchers(self):
+        """Watch the sockets of the dispatchers that are readable or
+        writable the same way asyncore.loop() would."""
+        self.syncPending = False
+
+        socket_map = core.socket_map
+        readers = self.readers
+        writers = self.writers
+
+        # forget the ones that have been closed
+        for fd in [fd for fd, obj in readers.items() if socket_map.get(fd) is not obj]:
+            self.loop.remove_reader(fd)
+            del readers[fd]
+        for fd in [fd for fd, obj in writers.items() if socket_map.get(fd) is not obj]:
+            self.loop.remove_writer(fd)
+            del writers[fd]
+
+        for fd, obj in list(socket_map.items()):
+            if obj.readable():
+                if fd not in readers:
+                    self.loop.add_reader(fd, self._handle_read, obj)
+                    readers[fd] = obj
+            elif fd in readers:
+                self.loop.remove_reader(fd)
+                del readers[fd]
+
+            if obj.writable() and not obj.accepting:
+                if fd not in writers:
+                    self.loop.add_writer(fd, self._handle_write, obj)
+                    writers[fd] = obj
+            elif fd in writers:
+                self.loop.remove_writer(fd)
+                del writers[fd]
+
+    def _handle_read(self, obj):
+        try:
+            obj.handle_read_event()
+        except Exception:
+            obj.handle_error()
+        finally:
+            self.sync_dispatchers()
+
+    def _handle_write(self, obj):
+        try:
+            obj.handle_write_event()
+        except Exception:
+            obj.handle_error()
+        finally:
+            self.sync_dispatchers()
+
+    def stop(self):
+        """Stop the loop if it was started by run(), this may be called
+        from other threads."""
+        if _debug: AsyncioTaskManager._debug("stop")
+
+        if self.running:
+            self.running = False
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+#
+#   setup
+#
+
+@bacpypes_debugging
+def setup(loop=None):
+    """Create the task manager for the event loop and route the deferred
+    functions to it, call this before building the application.  Without a
+    loop it uses the one that is running or creates a new one for run()."""
+    if _debug: setup._debug("setup loop=%r", loop)
+
+    task_manager = AsyncioTaskManager(loop)
+
+    core.taskManager = task_manager
+    core.asyncioTaskManager = task_manager
+
+    # the deferred functions from before now
+    while core.deferredFns:
+        fnlist = core.deferredFns
+        core.deferredFns = []
+        for fn, args, kwargs in fnlist:
+            task_manager.deferred(fn, args, kwargs)
+
+    # start watching the dispatchers that have already been created
+    task_manager.sync_dispatchers()
+
+    return task_manager
+
+#
+#   run
+#
+
+@bacpypes_debugging
+def run(loop=None):
+    """Run the event loop of the task manager until core.stop() is called,
+    the same as core.run()."""
+    if _debug: run._debug("run loop=%r", loop)
+
+    task_manager = core.asyncioTaskManager
+    if not task_manager:
+        task_manager = setup(loop)
+
+    # watch the dispatchers created since setup
+    task_manager.sync_dispatchers()
+
+    task_manager.running = core.running = True
+    try:
+        task_manager.loop.run_forever()
+    except KeyboardInterrupt:
+        if _debug: run._info("keyboard interrupt")
+
+    task_manager.running = core.running = False
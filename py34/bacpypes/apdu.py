@@ -9,9 +9,10 @@ from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
 
 from .pdu import PCI, PDUData
 from .primitivedata import Boolean, CharacterString, Enumerated, Integer, \
-    ObjectIdentifier, ObjectType, OctetString, Real, TagList, Unsigned, \
-    expand_enumerations
-from .constructeddata import Any, Choice, Element, Sequence, SequenceOf
+    ObjectIdentifier, ObjectType, OctetString, Real, TagList, TagReader, \
+    Unsigned, expand_enumerations
+from .constructeddata import Any, Choice, Element, LazySequence, Sequence, \
+    SequenceOf
 from .basetypes import ChannelValue, DateTime, DeviceAddress, ErrorType, \
     EventState, EventTransitionBits, EventType, LifeSafetyOperation, \
     NotificationParameters, NotifyType, ObjectPropertyReference, \
@@ -100,6 +101,9 @@ def decode_max_apdu_length_accepted(arg):
 @bacpypes_debugging
 class APCI(PCI, DebugContents):
 
+    # the attributes are in the slots or the dictionary of the PDU class
+    __slots__ = ()
+
     _debug_contents = ('apduType', 'apduSeg', 'apduMor', 'apduSA', 'apduSrv'
         , 'apduNak', 'apduSeq', 'apduWin', 'apduMaxSegs', 'apduMaxResp'
         , 'apduService', 'apduInvokeID', 'apduAbortRejectReason'
@@ -351,6 +355,13 @@ class APCI(PCI, DebugContents):
 
 class APDU(APCI, PDUData):
 
+    __slots__ = ('pduUserData', 'pduSource', 'pduDestination',
+        'pduExpectingReply', 'pduNetworkPriority',
+        'apduType', 'apduSeg', 'apduMor', 'apduSA', 'apduSrv', 'apduNak',
+        'apduSeq', 'apduWin', 'apduMaxSegs', 'apduMaxResp', 'apduService',
+        'apduInvokeID', 'apduAbortRejectReason', '_xpdu',
+        )
+
     def __init__(self, *args, **kwargs):
         if _debug: APDU._debug("__init__ %r %r", args, kwargs)
         super(APDU, self).__init__(*args, **kwargs)
@@ -358,7 +369,7 @@ class APDU(APCI, PDUData):
     def encode(self, pdu):
         if _debug: APCI._debug("encode %s", str(pdu))
         APCI.encode(self, pdu)
-        pdu.put_data(self.pduData)
+        pdu.put_pdu_data(self)
 
     def decode(self, pdu):
         if _debug: APCI._debug("decode %s", str(pdu))
@@ -395,9 +406,11 @@ class APDU(APCI, PDUData):
 
 class _APDU(APDU):
 
+    __slots__ = ()
+
     def encode(self, pdu):
         APCI.update(pdu, self)
-        pdu.put_data(self.pduData)
+        pdu.put_pdu_data(self)
 
     def decode(self, pdu):
         APCI.update(self, pdu)
@@ -431,6 +444,8 @@ class _APDU(APDU):
 
 @bacpypes_debugging
 class ConfirmedRequestPDU(_APDU):
+    __slots__ = ()
+
     pduType = 0
 
     def __init__(self, choice=None, *args, **kwargs):
@@ -449,6 +464,8 @@ register_apdu_type(ConfirmedRequestPDU)
 
 @bacpypes_debugging
 class UnconfirmedRequestPDU(_APDU):
+    __slots__ = ()
+
     pduType = 1
 
     def __init__(self, choice=None, *args, **kwargs):
@@ -466,6 +483,8 @@ register_apdu_type(UnconfirmedRequestPDU)
 
 @bacpypes_debugging
 class SimpleAckPDU(_APDU):
+    __slots__ = ()
+
     pduType = 2
 
     def __init__(self, choice=None, invokeID=None, context=None, *args, **kwargs):
@@ -489,6 +508,8 @@ register_apdu_type(SimpleAckPDU)
 
 @bacpypes_debugging
 class ComplexAckPDU(_APDU):
+    __slots__ = ()
+
     pduType = 3
 
     def __init__(self, choice=None, invokeID=None, context=None, *args, **kwargs):
@@ -512,6 +533,8 @@ register_apdu_type(ComplexAckPDU)
 
 @bacpypes_debugging
 class SegmentAckPDU(_APDU):
+    __slots__ = ()
+
     pduType = 4
 
     def __init__(self, nak=None, srv=None, invokeID=None, sequenceNumber=None, windowSize=None, *args, **kwargs):
@@ -533,6 +556,8 @@ register_apdu_type(SegmentAckPDU)
 
 @bacpypes_debugging
 class ErrorPDU(_APDU):
+    __slots__ = ()
+
     pduType = 5
 
     def __init__(self, choice=None, invokeID=None, context=None, *args, **kwargs):
@@ -573,6 +598,8 @@ expand_enumerations(RejectReason)
 
 @bacpypes_debugging
 class RejectPDU(_APDU):
+    __slots__ = ()
+
     pduType = 6
 
     def __init__(self, invokeID=None, reason=None, context=None, *args, **kwargs):
@@ -619,6 +646,8 @@ expand_enumerations(AbortReason)
 
 @bacpypes_debugging
 class AbortPDU(_APDU):
+    __slots__ = ()
+
     pduType = 7
 
     def __init__(self, srv=None, invokeID=None, reason=None, context=None, *args, **kwargs):
@@ -654,6 +683,9 @@ register_apdu_type(AbortPDU)
 @bacpypes_debugging
 class APCISequence(APCI, Sequence):
 
+    # no __slots__, the element values are named by the sequenceElements of
+    # each service and they are kept in the instance dictionary
+
     def __init__(self, *args, **kwargs):
         if _debug: APCISequence._debug("__init__ %r %r", args, kwargs)
         super(APCISequence, self).__init__(*args, **kwargs)
@@ -671,7 +703,9 @@ class APCISequence(APCI, Sequence):
         self._tag_list = TagList()
         Sequence.encode(self, self._tag_list)
 
-        # encode the tag list
+        # encode the tag list into a buffer that has room for the headers
+        if apdu.get_buffer() is None:
+            apdu.use_buffer()
         self._tag_list.encode(apdu)
 
     def decode(self, apdu):
@@ -680,12 +714,20 @@ class APCISequence(APCI, Sequence):
         # copy the header fields
         self.update(apdu)
 
-        # create a tag list and decode the rest of the data
-        self._tag_list = TagList()
-        self._tag_list.decode(apdu)
+        # decode the elements straight from the data, tags are only built
+        # for the values that are decoded.  The elements of a LazySequence
+        # are only found, they are decoded when they are used.
+        data = apdu.pduData
+        if not isinstance(data, memoryview):
+            data = bytes(data)
+        apdu.pduData = apdu.pduData[len(apdu.pduData):]
+
+        reader = TagReader(data)
+        self._tag_list = Sequence.decode_reader(self, reader, isinstance(self, LazySequence))
 
-        # pass the taglist to the Sequence for additional decoding
-        Sequence.decode(self, self._tag_list)
+        # a closing tag that does not belong to anything
+        if reader:
+            self._tag_list.extend(TagList(reader))
 
         # trailing unmatched tags
         if self._tag_list:
@@ -5,14 +5,19 @@ Application Module
 """
 
 import warnings
+from collections import OrderedDict
 
 from .debugging import bacpypes_debugging, DebugContents, ModuleLogger
+from .core import deferred
 from .comm import ApplicationServiceElement, bind
-from .iocb import IOController, SieveQueue
+from .iocb import IOCB, AwaitableIOCB, IOController, WindowQueue, IDLE, PENDING, ACTIVE, ABORTED
+from .task import FunctionTask, TaskManager
 
 from .pdu import Address
 
-from .primitivedata import ObjectIdentifier
+from .primitivedata import Atomic, Null, Unsigned, ObjectIdentifier
+from .constructeddata import Any, Array
+from .object import get_datatype
 
 from .capability import Collector
 from .appservice import StateMachineAccessPoint, ApplicationServiceAccessPoint
@@ -20,14 +25,19 @@ from .netservice import NetworkServiceAccessPoint, NetworkServiceElement
 from .bvllservice import BIPSimple, BIPForeign, AnnexJCodec, UDPMultiplexer
 
 from .apdu import UnconfirmedRequestPDU, ConfirmedRequestPDU, \
-    SimpleAckPDU, ComplexAckPDU, ErrorPDU, RejectPDU, AbortPDU, Error
+    SimpleAckPDU, ComplexAckPDU, ErrorPDU, RejectPDU, AbortPDU, AbortReason, \
+    RejectReason, Error, ReadPropertyRequest, ReadPropertyACK, \
+    ReadAccessSpecification, ReadPropertyMultipleRequest, \
+    ReadPropertyMultipleACK, ReadAccessResult, ReadAccessResultElement, \
+    ReadAccessResultElementChoice, WritePropertyRequest, \
+    WritePropertyMultipleRequest
 
 from .errors import ExecutionError, UnrecognizedService, AbortException, RejectException
 
 # for computing protocol services supported
 from .apdu import confirmed_request_types, unconfirmed_request_types, \
     ConfirmedServiceChoice, UnconfirmedServiceChoice
-from .basetypes import ServicesSupported
+from .basetypes import ServicesSupported, PropertyIdentifier, PropertyReference
 
 # basic services
 from .service.device import WhoIsIAmServices
@@ -52,6 +62,8 @@ class DeviceInfo(DebugContents):
         'vendorID',
         'maxNpduLength',
         'maxSegmentsAccepted',
+        'smoothedRoundTripTime',
+        'roundTripTimeVariance',
         )
 
     def __init__(self):
@@ -65,6 +77,14 @@ class DeviceInfo(DebugContents):
         self.maxNpduLength = 1497           # maximum we can send in transit
         self.maxSegmentsAccepted = None     # value for proposed/actual window size
 
+        # round trip time estimates in milliseconds, from the client
+        # segmentation state machines
+        self.smoothedRoundTripTime = None
+        self.roundTripTimeVariance = None
+
+        # number of transactions using this record
+        self._ref_count = 0
+
 #
 #   DeviceInfoCache
 #
@@ -72,12 +92,19 @@ class DeviceInfo(DebugContents):
 @bacpypes_debugging
 class DeviceInfoCache:
 
+    # number of records with only round trip times to keep when no
+    # transaction is using them
+    max_idle_devices = 256
+
     def __init__(self):
         if _debug: DeviceInfoCache._debug("__init__")
 
         # empty cache
         self.cache = {}
 
+        # records kept for their round trip times, least recently used first
+        self.idle = OrderedDict()
+
     def has_device_info(self, key):
         """Return true iff cache has information about the device."""
         if _debug: DeviceInfoCache._debug("has_device_info %r", key)
@@ -172,11 +199,59 @@ class DeviceInfoCache:
         # update the keys
         info._cache_keys = (cache_id, cache_address)
 
+    def acquire_device_info(self, key):
+        """This function is called by the segmentation state machine when it
+        starts a transaction with the device, the record stays in the cache
+        until every transaction using it has released it."""
+        if _debug: DeviceInfoCache._debug("acquire_device_info %r", key)
+
+        info = self.get_device_info(key)
+        if info is not None:
+            info._ref_count += 1
+            self.idle.pop(info, None)
+
+        return info
+
     def release_device_info(self, info):
         """This function is called by the segmentation state machine when it
-        has finished with the device information."""
+        has finished with the device information.  Generic records are
+        dropped and those from an I-Am are kept.  Up to max_idle_devices
+        records with round trip times are kept, the least recently used are
+        dropped first."""
         if _debug: DeviceInfoCache._debug("release_device_info %r", info)
 
+        # other transactions are still using it
+        info._ref_count -= 1
+        if info._ref_count > 0:
+            if _debug: DeviceInfoCache._debug("    - still in use")
+            return
+
+        # it came from an I-Am
+        if info.deviceIdentifier is not None:
+            if _debug: DeviceInfoCache._debug("    - keep it")
+            return
+
+        # keep the round trip times for a while
+        if info.smoothedRoundTripTime is not None:
+            if _debug: DeviceInfoCache._debug("    - keep it for now")
+            self.idle[info] = None
+
+            if len(self.idle) <= self.max_idle_devices:
+                return
+
+            info, _ = self.idle.popitem(last=False)
+            if _debug: DeviceInfoCache._debug("    - drop: %r", info)
+
+            # an I-Am has arrived since
+            if info.deviceIdentifier is not None:
+                return
+
+        self.remove_device_info(info)
+
+    def remove_device_info(self, info):
+        """Remove the device information record from the cache."""
+        if _debug: DeviceInfoCache._debug("remove_device_info %r", info)
+
         cache_id, cache_address = info._cache_keys
         if cache_id is not None:
             del self.cache[cache_id]
@@ -373,12 +448,173 @@ class Application(ApplicationServiceElement, Collector):
                 resp = Error(errorClass='device', errorCode='operationalProblem', context=apdu)
                 self.response(resp)
 
+#
+#   AsyncClientMixIn
+#
+
+def decode_property_value(objectIdentifier, propertyIdentifier, propertyArrayIndex, propertyValue):
+    """Return the value of a property from the Any in a response."""
+    datatype = get_datatype(objectIdentifier[0], propertyIdentifier)
+    if not datatype:
+        raise TypeError("unknown datatype")
+
+    # special case for array parts, others are managed by cast_out
+    if issubclass(datatype, Array) and (propertyArrayIndex is not None):
+        if propertyArrayIndex == 0:
+            return propertyValue.cast_out(Unsigned)
+        else:
+            return propertyValue.cast_out(datatype.subtype)
+    else:
+        return propertyValue.cast_out(datatype)
+
+def encode_property_value(objectIdentifier, propertyIdentifier, propertyArrayIndex, value):
+    """Return an Any with the value of a property, None is a Null and
+    atomic values can be plain Python values."""
+    datatype = get_datatype(objectIdentifier[0], propertyIdentifier)
+    if not datatype:
+        raise TypeError("unknown datatype")
+
+    if value is None:
+        value = Null()
+    elif issubclass(datatype, Array) and (propertyArrayIndex is not None):
+        if propertyArrayIndex == 0:
+            value = Unsigned(value)
+        elif issubclass(datatype.subtype, Atomic):
+            value = datatype.subtype(value)
+        elif not isinstance(value, datatype.subtype):
+            raise TypeError("invalid datatype, expecting %s" % (datatype.subtype.__name__,))
+    elif issubclass(datatype, Atomic):
+        value = datatype(value)
+    elif not isinstance(value, datatype):
+        raise TypeError("invalid datatype, expecting %s" % (datatype.__name__,))
+
+    property_value = Any()
+    property_value.cast_in(value)
+    return property_value
+
+@bacpypes_debugging
+class AsyncClientMixIn:
+
+    """Methods for an IOController that return awaitables for the values of
+    the common client services, so a coroutine can read and write without a
+    thread waiting for each request.  They are called from the coroutine,
+    the awaitables belong to the running event loop."""
+
+    def read_property(self, address, objectIdentifier, propertyIdentifier, propertyArrayIndex=None):
+        """Read a property, the result is the value."""
+        if _debug: AsyncClientMixIn._debug("read_property %r %r %r %r", address, objectIdentifier, propertyIdentifier, propertyArrayIndex)
+
+        request = ReadPropertyRequest(
+            objectIdentifier=objectIdentifier,
+            propertyIdentifier=propertyIdentifier,
+            propertyArrayIndex=propertyArrayIndex,
+            )
+
+        def decode(apdu):
+            return decode_property_value(apdu.objectIdentifier, apdu.propertyIdentifier,
+                apdu.propertyArrayIndex, apdu.propertyValue)
+
+        return self._async_request(address, request, decode)
+
+    def read_property_multiple(self, address, readAccessSpecs):
+        """Read properties of objects, readAccessSpecs is a list of
+        (objectIdentifier, properties) where each property is an identifier
+        or an (identifier, index) tuple.  The result is a dict of the values
+        by (objectIdentifier, propertyIdentifier, propertyArrayIndex) and
+        properties that could not be read have an ExecutionError."""
+        if _debug: AsyncClientMixIn._debug("read_property_multiple %r %r", address, readAccessSpecs)
+
+        read_access_spec_list = []
+        for objectIdentifier, properties in readAccessSpecs:
+            property_reference_list = []
+            for prop in properties:
+                if isinstance(prop, tuple):
+                    propertyIdentifier, propertyArrayIndex = prop
+                else:
+                    propertyIdentifier, propertyArrayIndex = prop, None
+                property_reference_list.append(PropertyReference(
+                    propertyIdentifier=propertyIdentifier,
+                    propertyArrayIndex=propertyArrayIndex,
+                    ))
+
+            read_access_spec_list.append(ReadAccessSpecification(
+                objectIdentifier=objectIdentifier,
+                listOfPropertyReferences=property_reference_list,
+                ))
+
+        request = ReadPropertyMultipleRequest(listOfReadAccessSpecs=read_access_spec_list)
+
+        def decode(apdu):
+            values = {}
+            for result in apdu.listOfReadAccessResults:
+                objectIdentifier = result.objectIdentifier
+                for element in result.listOfResults:
+                    key = (objectIdentifier, element.propertyIdentifier, element.propertyArrayIndex)
+
+                    read_result = element.readResult
+                    if read_result.propertyAccessError is not None:
+                        error = read_result.propertyAccessError
+                        values[key] = ExecutionError(error.errorClass, error.errorCode)
+                    else:
+                        values[key] = decode_property_value(objectIdentifier,
+                            element.propertyIdentifier, element.propertyArrayIndex,
+                            read_result.propertyValue)
+            return values
+
+        return self._async_request(address, request, decode)
+
+    def write_property(self, address, objectIdentifier, propertyIdentifier, value, propertyArrayIndex=None, priority=None):
+        """Write a property, the result is None."""
+        if _debug: AsyncClientMixIn._debug("write_property %r %r %r %r %r %r", address, objectIdentifier, propertyIdentifier, value, propertyArrayIndex, priority)
+
+        request = WritePropertyRequest(
+            objectIdentifier=objectIdentifier,
+            propertyIdentifier=propertyIdentifier,
+            propertyValue=encode_property_value(objectIdentifier, propertyIdentifier,
+                propertyArrayIndex, value),
+            )
+        if propertyArrayIndex is not None:
+            request.propertyArrayIndex = propertyArrayIndex
+        if priority is not None:
+            request.priority = priority
+
+        return self._async_request(address, request, lambda apdu: None)
+
+    def _async_request(self, address, request, decode):
+        if not isinstance(address, Address):
+            address = Address(address)
+        request.pduDestination = address
+
+        iocb = AwaitableIOCB(request)
+        future = iocb.get_future(decode)
+
+        # the caller might not be running in the stack
+        deferred(self.request_io, iocb)
+
+        return future
+
 #
 #   ApplicationIOController
 #
 
+# abort reasons that mean the device is overwhelmed or not answering
+_congestion_abort_reasons = set((
+    AbortReason.bufferOverflow,
+    AbortReason.preemptedByHigherPriorityTask,
+    AbortReason.applicationExceededReplyTime,
+    AbortReason.outOfResources,
+    AbortReason.tsmTimeout,
+    AbortReason.serverTimeout,
+    AbortReason.noResponse,
+    ))
+
 @bacpypes_debugging
-class ApplicationIOController(IOController, Application):
+class ApplicationIOController(IOController, Application, AsyncClientMixIn):
+
+    # outstanding confirmed requests for each device, the window starts at
+    # the initial size and adapts up to the maximum size
+    initial_window_size = 1
+    max_window_size = 1
 
     def __init__(self, *args, **kwargs):
         if _debug: ApplicationIOController._debug("__init__")
@@ -398,15 +634,17 @@ class ApplicationIOController(IOController, Application):
         # look up the queue
         queue = self.queue_by_address.get(destination_address, None)
         if not queue:
-            queue = SieveQueue(self.request, destination_address)
+            queue = WindowQueue(self.request, destination_address,
+                self.initial_window_size, self.max_window_size,
+                )
             self.queue_by_address[destination_address] = queue
         if _debug: ApplicationIOController._debug("    - queue: %r", queue)
 
         # ask the queue to process the request
         queue.request_io(iocb)
 
-    def _app_complete(self, address, apdu):
-        if _debug: ApplicationIOController._debug("_app_complete %r %r", address, apdu)
+    def _app_complete(self, address, apdu, request=None):
+        if _debug: ApplicationIOController._debug("_app_complete %r %r %r", address, apdu, request)
 
         # look up the queue
         queue = self.queue_by_address.get(address, None)
@@ -415,25 +653,46 @@ class ApplicationIOController(IOController, Application):
             return
         if _debug: ApplicationIOController._debug("    - queue: %r", queue)
 
-        # make sure it has an active iocb
-        if not queue.active_iocb:
-            ApplicationIOController._debug("no active request for %r" % (address,))
+        # find the active iocb for the request that was sent, or with the
+        # same invoke ID as the response.  A response that does not match
+        # one, like a late one for a request that has already been given
+        # up, is dropped.
+        for iocb in queue.active_iocbs:
+            if request is not None:
+                if iocb.args[0] is request:
+                    break
+            elif iocb.args[0].apduInvokeID == apdu.apduInvokeID:
+                break
+        else:
+            ApplicationIOController._debug("no active request for %r" % (apdu or request,))
             return
+        if _debug: ApplicationIOController._debug("    - iocb: %r", iocb)
 
         # this request is complete
         if isinstance(apdu, (None.__class__, SimpleAckPDU, ComplexAckPDU)):
-            queue.complete_io(queue.active_iocb, apdu)
+            queue.complete_io(iocb, apdu)
         elif isinstance(apdu, (ErrorPDU, RejectPDU, AbortPDU)):
-            queue.abort_io(queue.active_iocb, apdu)
+            if self._congested(apdu):
+                queue.congestion()
+            queue.abort_io(iocb, apdu)
         else:
             raise RuntimeError("unrecognized APDU type")
         if _debug: Application._debug("    - controller finished")
 
         # if the queue is empty and idle, forget about the controller
-        if not queue.ioQueue.queue and not queue.active_iocb:
+        if not queue.ioQueue.queue and not queue.active_iocbs:
             if _debug: ApplicationIOController._debug("    - queue is empty")
             del self.queue_by_address[address]
 
+    def _congested(self, apdu):
+        """Return true if the response means the device is overwhelmed or
+        not answering, so fewer requests should be outstanding."""
+        if isinstance(apdu, AbortPDU):
+            return apdu.apduAbortRejectReason in _congestion_abort_reasons
+        if isinstance(apdu, Error):
+            return apdu.errorCode == 'busy'
+        return False
+
     def request(self, apdu):
         if _debug: ApplicationIOController._debug("request %r", apdu)
 
@@ -442,7 +701,7 @@ class ApplicationIOController(IOController, Application):
 
         # if this was an unconfirmed request, it's complete, no message
         if isinstance(apdu, UnconfirmedRequestPDU):
-            self._app_complete(apdu.pduDestination, None)
+            self._app_complete(apdu.pduDestination, None, apdu)
 
     def confirmation(self, apdu):
         if _debug: ApplicationIOController._debug("confirmation %r", apdu)
@@ -450,6 +709,662 @@ class ApplicationIOController(IOController, Application):
         # this is an ack, error, reject or abort
         self._app_complete(apdu.pduSource, apdu)
 
+#
+#   read_property_key
+#
+
+def read_property_key(apdu):
+    """Return the object identifier, property identifier and array index of
+    a read request or its acknowledgement in a form that can be compared."""
+    return (
+        ObjectIdentifier(apdu.objectIdentifier).value,
+        PropertyIdentifier(apdu.propertyIdentifier).value,
+        apdu.propertyArrayIndex,
+        )
+
+#
+#   ReadPropertyBatchController
+#
+
+# abort reasons that mean the batch was too much for the device
+_batch_abort_reasons = set((
+    AbortReason.bufferOverflow,
+    AbortReason.segmentationNotSupported,
+    AbortReason.apduTooLong,
+    ))
+
+@bacpypes_debugging
+class ReadPropertyBatchController(IOController):
+
+    """
+    Gathers the ReadProperty requests for a device that arrive within a
+    short delay and reads them with ReadPropertyMultiple requests, each small
+    enough that the response is expected to fit in the maximum APDU length
+    the device accepts.  The acknowledgement is split back into a
+    ReadPropertyACK or an Error for each of the original requests.  Other
+    requests are passed through to the application.
+
+    If the device does not like the batch the requests are sent one at a
+    time, and if the device does not support ReadPropertyMultiple at all it
+    is remembered and not tried again.
+    """
+
+    # how long to wait for more requests before sending a batch
+    batch_delay = 0.005
+
+    # the APDU length assumed for devices that are not in the cache
+    default_max_apdu_length = 480
+
+    # guess at the encoded length of a property value in the response
+    estimated_value_size = 12
+
+    def __init__(self, app, name=None):
+        if _debug: ReadPropertyBatchController._debug("__init__ %r name=%r", app, name)
+        IOController.__init__(self, name)
+
+        # the application that sends the requests
+        self.app = app
+
+        # pending requests for each address
+        self.pending = {}
+
+        # devices that do not support ReadPropertyMultiple
+        self.single_reads = set()
+
+    def process_io(self, iocb):
+        if _debug: ReadPropertyBatchController._debug("process_io %r", iocb)
+
+        apdu = iocb.args[0]
+        address = apdu.pduDestination
+
+        # only simple reads can be batched
+        if (not isinstance(apdu, ReadPropertyRequest)) \
+                or (address in self.single_reads) \
+                or (apdu.propertyIdentifier in ('all', 'required', 'optional')):
+            if _debug: ReadPropertyBatchController._debug("    - pass through")
+            self.app.request_io(iocb)
+            return
+
+        # add it to the batch, the first one starts the clock
+        pending = self.pending.get(address)
+        if pending is None:
+            pending = self.pending[address] = []
+
+            task = FunctionTask(self._send_batch, address)
+            task.install_task(delta=self.batch_delay)
+
+        pending.append(iocb)
+
+    def _max_apdu_length(self, address):
+        """Return the maximum APDU length of the device."""
+        cache = self.app.deviceInfoCache
+        if cache.has_device_info(address):
+            return cache.get_device_info(address).maxApduLengthAccepted
+
+        return self.default_max_apdu_length
+
+    def _send_batch(self, address):
+        if _debug: ReadPropertyBatchController._debug("_send_batch %r", address)
+
+        # skip the requests that have been aborted while they were waiting
+        iocbs = [iocb for iocb in self.pending.pop(address, []) if iocb.ioState == PENDING]
+        if not iocbs:
+            return
+
+        # a batch of one is just a read
+        if len(iocbs) == 1:
+            self.app.request_io(iocbs[0])
+            return
+
+        # complex ack header
+        max_apdu_length = self._max_apdu_length(address)
+        size = 3
+
+        # requests grouped by key and keys grouped by object
+        batch = {}
+        objects = {}
+
+        for iocb in iocbs:
+            key = read_property_key(iocb.args[0])
+
+            # the same read more than once in the same batch
+            if key in batch:
+                batch[key].append(iocb)
+                continue
+
+            # object identifier, opening and closing tag
+            object_size = 0 if key[0] in objects else 7
+
+            # property identifier, optional array index, opening and
+            # closing tag and a guess at the value
+            property_size = 3 + (3 if key[2] is not None else 0) + 2 + self.estimated_value_size
+
+            # full, send this one and start another
+            if batch and (size + object_size + property_size > max_apdu_length):
+                self._send_request(address, objects, batch)
+                size = 3
+                batch = {}
+                objects = {}
+                object_size = 7
+
+            size += object_size + property_size
+            batch[key] = [iocb]
+            objects.setdefault(key[0], []).append(key)
+
+        self._send_request(address, objects, batch)
+
+    def _send_request(self, address, objects, batch):
+        if _debug: ReadPropertyBatchController._debug("_send_request %r %r %r", address, objects, batch)
+
+        # build the specifications
+        read_access_specs = []
+        for objid, keys in objects.items():
+            read_access_specs.append(ReadAccessSpecification(
+                objectIdentifier=objid,
+                listOfPropertyReferences=[
+                    PropertyReference(propertyIdentifier=propid, propertyArrayIndex=indx)
+                    for _, propid, indx in keys
+                    ],
+                ))
+
+        request = ReadPropertyMultipleRequest(listOfReadAccessSpecs=read_access_specs)
+        request.pduDestination = address
+        if _debug: ReadPropertyBatchController._debug("    - request: %r", request)
+
+        # the original requests are now active
+        for iocbs in batch.values():
+            for iocb in iocbs:
+                self.active_io(iocb)
+
+        iocb = IOCB(request)
+        iocb.add_callback(self._batch_complete, address, batch)
+
+        self.app.request_io(iocb)
+
+    def _batch_complete(self, iocb, address, batch):
+        if _debug: ReadPropertyBatchController._debug("_batch_complete %r %r %r", iocb, address, batch)
+
+        if iocb.ioError:
+            err = iocb.ioError
+
+            # the device does not know about ReadPropertyMultiple
+            if isinstance(err, RejectPDU) and (err.apduAbortRejectReason == RejectReason.unrecognizedService):
+                if _debug: ReadPropertyBatchController._debug("    - single reads only")
+                self.single_reads.add(address)
+
+            # read them one at a time if the device did not like the batch
+            if isinstance(err, (ErrorPDU, RejectPDU)) or \
+                    (isinstance(err, AbortPDU) and (err.apduAbortRejectReason in _batch_abort_reasons)):
+                if _debug: ReadPropertyBatchController._debug("    - try them one at a time")
+                for iocbs in batch.values():
+                    for request_iocb in iocbs:
+                        self._resend(request_iocb)
+                return
+
+            # otherwise they all fail the same way
+            for iocbs in batch.values():
+                for request_iocb in iocbs:
+                    self.abort_io(request_iocb, err)
+            return
+
+        # split up the results
+        for read_access_result in iocb.ioResponse.listOfReadAccessResults:
+            objid = read_access_result.objectIdentifier
+
+            for element in read_access_result.listOfResults:
+                key = (
+                    ObjectIdentifier(objid).value,
+                    PropertyIdentifier(element.propertyIdentifier).value,
+                    element.propertyArrayIndex,
+                    )
+
+                iocbs = batch.pop(key, None)
+                if not iocbs:
+                    if _debug: ReadPropertyBatchController._debug("    - unexpected result: %r", key)
+                    continue
+
+                read_result = element.readResult
+                for request_iocb in iocbs:
+                    request = request_iocb.args[0]
+
+                    if read_result.propertyAccessError is not None:
+                        error = Error(
+                            errorClass=read_result.propertyAccessError.errorClass,
+                            errorCode=read_result.propertyAccessError.errorCode,
+                            context=request,
+                            )
+                        error.pduSource = address
+                        self.abort_io(request_iocb, error)
+                    else:
+                        ack = ReadPropertyACK(
+                            objectIdentifier=request.objectIdentifier,
+                            propertyIdentifier=request.propertyIdentifier,
+                            propertyArrayIndex=request.propertyArrayIndex,
+                            propertyValue=read_result.propertyValue,
+                            context=request,
+                            )
+                        ack.pduSource = address
+                        self.complete_io(request_iocb, ack)
+
+        # the device left some out, ask for them one at a time
+        for iocbs in batch.values():
+            for request_iocb in iocbs:
+                self._resend(request_iocb)
+
+    def _resend(self, iocb):
+        """Send a request that was part of a batch by itself."""
+        if _debug: ReadPropertyBatchController._debug("_resend %r", iocb)
+
+        # the client may have given up already
+        if iocb.ioState > ACTIVE:
+            return
+
+        iocb.ioState = IDLE
+        self.app.request_io(iocb)
+
+#
+#   ReadPropertyCoalescingController
+#
+
+@bacpypes_debugging
+class ReadPropertyCoalescingController(IOController):
+
+    """
+    When a ReadProperty request is the same as one that is already in
+    progress, rather than sending it again it waits for the same response.
+    The request is sent with an IOCB of its own so a client that gives up
+    on its request does not take the others with it, when they have all
+    given up the request is aborted.  Each one gets its own acknowledgement
+    with the same tags, and if the request fails they all get the same
+    error.  Other requests are passed through to the controller.
+    """
+
+    def __init__(self, controller, name=None):
+        if _debug: ReadPropertyCoalescingController._debug("__init__ %r name=%r", controller, name)
+        IOController.__init__(self, name)
+
+        # the controller that sends the requests, like an application or
+        # a batch controller
+        self.controller = controller
+
+        # requests in progress keyed by address and read, to the IOCB that
+        # was sent and a list of the IOCBs waiting for the response
+        self.in_flight = {}
+
+        # number of requests that did not need to be sent
+        self.coalesced_count = 0
+
+    def process_io(self, iocb):
+        if _debug: ReadPropertyCoalescingController._debug("process_io %r", iocb)
+
+        apdu = iocb.args[0]
+        if not isinstance(apdu, ReadPropertyRequest):
+            if _debug: ReadPropertyCoalescingController._debug("    - pass through")
+            self.controller.request_io(iocb)
+            return
+
+        key = (apdu.pduDestination, read_property_key(apdu))
+
+        # this is now an active request
+        self.active_io(iocb)
+
+        # the same read is already on its way
+        entry = self.in_flight.get(key)
+        if entry is not None:
+            if _debug: ReadPropertyCoalescingController._debug("    - already in flight")
+            entry[1].append(iocb)
+            self.coalesced_count += 1
+            return
+
+        # send it with an IOCB of its own
+        shared_iocb = IOCB(apdu)
+        shared_iocb.ioPriority = iocb.ioPriority
+        shared_iocb.add_callback(self._shared_complete, key)
+
+        self.in_flight[key] = (shared_iocb, [iocb])
+
+        self.controller.request_io(shared_iocb)
+
+    def abort_io(self, iocb, err):
+        """Called by a client giving up on its request, when nobody is
+        waiting for the response any more the request is aborted."""
+        if _debug: ReadPropertyCoalescingController._debug("abort_io %r %r", iocb, err)
+        IOController.abort_io(self, iocb, err)
+
+        apdu = iocb.args[0]
+        if not isinstance(apdu, ReadPropertyRequest):
+            return
+
+        key = (apdu.pduDestination, read_property_key(apdu))
+
+        entry = self.in_flight.get(key)
+        if (entry is None) or (iocb not in entry[1]):
+            return
+
+        shared_iocb, waiting = entry
+        if all(waiter.ioState == ABORTED for waiter in waiting):
+            if _debug: ReadPropertyCoalescingController._debug("    - nobody waiting")
+            del self.in_flight[key]
+            shared_iocb.abort(err)
+
+    def _shared_complete(self, shared_iocb, key):
+        if _debug: ReadPropertyCoalescingController._debug("_shared_complete %r %r", shared_iocb, key)
+
+        # new requests for the same thing will be sent again, those that
+        # have all been aborted are already gone
+        entry = self.in_flight.get(key)
+        if (entry is None) or (entry[0] is not shared_iocb):
+            return
+        del self.in_flight[key]
+
+        # everyone gets the same answer, those that have already been
+        # aborted are left alone
+        for iocb in entry[1]:
+            if shared_iocb.ioError:
+                self.abort_io(iocb, shared_iocb.ioError)
+            else:
+                self.complete_io(iocb, self._copy_response(shared_iocb.ioResponse))
+
+    def _copy_response(self, response):
+        """Return an acknowledgement of its own with a new Any for the same
+        tags, so changing one does not change the others."""
+        if not isinstance(response, ReadPropertyACK):
+            return response
+
+        value = Any()
+        value.tagList.extend(response.propertyValue.tagList)
+
+        ack = ReadPropertyACK(
+            objectIdentifier=response.objectIdentifier,
+            propertyIdentifier=response.propertyIdentifier,
+            propertyArrayIndex=response.propertyArrayIndex,
+            propertyValue=value,
+            )
+        ack.update(response)
+
+        return ack
+
+#
+#   ReadPropertyCacheController
+#
+
+@bacpypes_debugging
+class ReadPropertyCacheController(IOController):
+
+    """
+    Keeps the property values read from other devices for a while so that
+    ReadProperty requests, and ReadPropertyMultiple requests where every
+    value is known, are answered without asking the device.  How long a
+    value is kept depends on the property, the least recently used values
+    are dropped when the cache is full and writing a property with
+    WriteProperty or WritePropertyMultiple forgets its value.  Other
+    requests are passed through to the controller.
+
+    COV notifications are received by the application rather than by a
+    controller, so to have them refresh the values the application includes
+    ReadPropertyCacheCOVMixIn, or passes them to cov_notification() from its
+    own do_ConfirmedCOVNotificationRequest() and
+    do_UnconfirmedCOVNotificationRequest() functions.
+
+    The tags of the values are kept, each acknowledgement from the cache
+    gets its own Any objects.
+    """
+
+    # seconds to keep a value, by property identifier, zero is not at all
+    default_ttl = 5.0
+    property_ttl = {}
+
+    # the most values to keep
+    max_entries = 10000
+
+    def __init__(self, controller, name=None):
+        if _debug: ReadPropertyCacheController._debug("__init__ %r name=%r", controller, name)
+        IOController.__init__(self, name)
+
+        # the controller that sends the requests
+        self.controller = controller
+
+        # (address, objid, propid, index) to (expires, tags), in the order
+        # they were used
+        self.cache = OrderedDict()
+
+        # (address, objid, propid) to the array indexes that have a value
+        self.array_indexes = {}
+
+        # use the task manager clock
+        self.task_manager = TaskManager()
+
+        # counters
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def get_ttl(self, propid):
+        """Return how long to keep a value of the property."""
+        return self.property_ttl.get(propid, self.default_ttl)
+
+    def get_value(self, key):
+        """Return a new Any with the value for the key if it has not
+        expired, or None."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+
+        expires, tags = entry
+        if expires <= self.task_manager.get_time():
+            if _debug: ReadPropertyCacheController._debug("    - expired: %r", key)
+            self._remove(key)
+            return None
+
+        # recently used
+        self.cache.move_to_end(key)
+
+        value = Any()
+        value.tagList.extend(tags)
+
+        return value
+
+    def put_value(self, key, value):
+        """Save a value, unless the property should not be kept."""
+        if _debug: ReadPropertyCacheController._debug("put_value %r %r", key, value)
+
+        ttl = self.get_ttl(key[2])
+        if ttl <= 0:
+            return
+
+        self.cache[key] = (self.task_manager.get_time() + ttl, tuple(value.tagList))
+        self.cache.move_to_end(key)
+
+        if key[3] is not None:
+            self.array_indexes.setdefault(key[:3], set()).add(key[3])
+
+        # forget the least recently used
+        while len(self.cache) > self.max_entries:
+            self._remove(next(iter(self.cache)))
+
+    def invalidate(self, key):
+        """Forget a value.  A new value for an array element changes the
+        whole array, and a new value for the whole array or its length
+        changes its elements, so those are forgotten too."""
+        if _debug: ReadPropertyCacheController._debug("invalidate %r", key)
+
+        self._remove(key)
+        if key[3] is not None:
+            self._remove(key[:3] + (None,))
+        if key[3] in (None, 0):
+            for indx in list(self.array_indexes.get(key[:3], ())):
+                self._remove(key[:3] + (indx,))
+
+    def _remove(self, key):
+        if self.cache.pop(key, None) is None:
+            return
+
+        if key[3] is not None:
+            indexes = self.array_indexes[key[:3]]
+            indexes.discard(key[3])
+            if not indexes:
+                del self.array_indexes[key[:3]]
+
+    def process_io(self, iocb):
+        if _debug: ReadPropertyCacheController._debug("process_io %r", iocb)
+
+        apdu = iocb.args[0]
+        address = apdu.pduDestination
+
+        if isinstance(apdu, ReadPropertyRequest):
+            key = (address,) + read_property_key(apdu)
+
+            value = self.get_value(key)
+            if value is not None:
+                if _debug: ReadPropertyCacheController._debug("    - hit")
+                self.hit_count += 1
+
+                ack = ReadPropertyACK(
+                    objectIdentifier=apdu.objectIdentifier,
+                    propertyIdentifier=apdu.propertyIdentifier,
+                    propertyArrayIndex=apdu.propertyArrayIndex,
+                    propertyValue=value,
+                    context=apdu,
+                    )
+                ack.pduSource = address
+
+                self.active_io(iocb)
+                self.complete_io(iocb, ack)
+                return
+
+        elif isinstance(apdu, ReadPropertyMultipleRequest):
+            ack = self._cached_rpm(apdu)
+            if ack is not None:
+                if _debug: ReadPropertyCacheController._debug("    - hit")
+                self.hit_count += 1
+
+                self.active_io(iocb)
+                self.complete_io(iocb, ack)
+                return
+
+        elif isinstance(apdu, WritePropertyRequest):
+            self.invalidate((address,) + read_property_key(apdu))
+            self.controller.request_io(iocb)
+            return
+
+        elif isinstance(apdu, WritePropertyMultipleRequest):
+            for write_access_spec in apdu.listOfWriteAccessSpecs:
+                objid = ObjectIdentifier(write_access_spec.objectIdentifier).value
+                for property_value in write_access_spec.listOfProperties:
+                    propid = PropertyIdentifier(property_value.propertyIdentifier).value
+                    self.invalidate((address, objid, propid, property_value.propertyArrayIndex))
+            self.controller.request_io(iocb)
+            return
+
+        else:
+            if _debug: ReadPropertyCacheController._debug("    - pass through")
+            self.controller.request_io(iocb)
+            return
+
+        # ask the device and save what comes back
+        self.miss_count += 1
+        iocb.add_callback(self._read_complete, address)
+
+        self.controller.request_io(iocb)
+
+    def _cached_rpm(self, apdu):
+        """Return a ReadPropertyMultipleACK if all of the values are known,
+        or None."""
+        address = apdu.pduDestination
+
+        read_access_results = []
+        for read_access_spec in apdu.listOfReadAccessSpecs:
+            objid = ObjectIdentifier(read_access_spec.objectIdentifier).value
+
+            results = []
+            for property_reference in read_access_spec.listOfPropertyReferences:
+                propid = PropertyIdentifier(property_reference.propertyIdentifier).value
+                indx = property_reference.propertyArrayIndex
+
+                value = self.get_value((address, objid, propid, indx))
+                if value is None:
+                    return None
+
+                results.append(ReadAccessResultElement(
+                    propertyIdentifier=property_reference.propertyIdentifier,
+                    propertyArrayIndex=indx,
+                    readResult=ReadAccessResultElementChoice(propertyValue=value),
+                    ))
+
+            read_access_results.append(ReadAccessResult(
+                objectIdentifier=read_access_spec.objectIdentifier,
+                listOfResults=results,
+                ))
+
+        ack = ReadPropertyMultipleACK(
+            listOfReadAccessResults=read_access_results,
+            context=apdu,
+            )
+        ack.pduSource = address
+
+        return ack
+
+    def _read_complete(self, iocb, address):
+        if _debug: ReadPropertyCacheController._debug("_read_complete %r %r", iocb, address)
+
+        ack = iocb.ioResponse
+        if isinstance(ack, ReadPropertyACK):
+            self.put_value((address,) + read_property_key(ack), ack.propertyValue)
+
+        elif isinstance(ack, ReadPropertyMultipleACK):
+            for read_access_result in ack.listOfReadAccessResults:
+                objid = ObjectIdentifier(read_access_result.objectIdentifier).value
+
+                for element in read_access_result.listOfResults:
+                    value = element.readResult.propertyValue
+                    if value is None:
+                        continue
+
+                    propid = PropertyIdentifier(element.propertyIdentifier).value
+                    self.put_value((address, objid, propid, element.propertyArrayIndex), value)
+
+    def cov_notification(self, apdu):
+        """Called by the application with a confirmed or unconfirmed COV
+        notification to refresh the values it carries."""
+        if _debug: ReadPropertyCacheController._debug("cov_notification %r", apdu)
+
+        address = apdu.pduSource
+        objid = ObjectIdentifier(apdu.monitoredObjectIdentifier).value
+
+        for element in apdu.listOfValues:
+            key = (address, objid, PropertyIdentifier(element.propertyIdentifier).value, element.propertyArrayIndex)
+
+            # a new value for the whole array replaces its elements
+            self.invalidate(key)
+            self.put_value(key, element.value)
+
+#
+#   ReadPropertyCacheCOVMixIn
+#
+
+@bacpypes_debugging
+class ReadPropertyCacheCOVMixIn:
+
+    """Application functions that pass the COV notifications it receives to
+    the ReadPropertyCacheController in readPropertyCache, confirmed
+    notifications are acknowledged."""
+
+    readPropertyCache = None
+
+    def do_ConfirmedCOVNotificationRequest(self, apdu):
+        if _debug: ReadPropertyCacheCOVMixIn._debug("do_ConfirmedCOVNotificationRequest %r", apdu)
+
+        if self.readPropertyCache is not None:
+            self.readPropertyCache.cov_notification(apdu)
+
+        # success
+        self.response(SimpleAckPDU(context=apdu))
+
+    def do_UnconfirmedCOVNotificationRequest(self, apdu):
+        if _debug: ReadPropertyCacheCOVMixIn._debug("do_UnconfirmedCOVNotificationRequest %r", apdu)
+
+        if self.readPropertyCache is not None:
+            self.readPropertyCache.cov_notification(apdu)
+
 #
 #   BIPSimpleApplication
 #
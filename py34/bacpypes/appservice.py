@@ -5,14 +5,16 @@ Application Layer
 """
 
 from time import time as _time
+from collections import deque, OrderedDict
 
 from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
 
+from .core import deferred
 from .comm import Client, ServiceAccessPoint, ApplicationServiceElement
-from .task import OneShotTask
+from .task import OneShotTask, TaskManager
 
-from .pdu import Address, LocalStation, RemoteStation
-from .apdu import AbortPDU, AbortReason, ComplexAckPDU, \
+from .pdu import Address, LocalStation, RemoteStation, PDU
+from .apdu import APDU, AbortPDU, AbortReason, ComplexAckPDU, \
     ConfirmedRequestPDU, Error, ErrorPDU, RejectPDU, SegmentAckPDU, \
     SimpleAckPDU, UnconfirmedRequestPDU, apdu_types, \
     unconfirmed_request_types, confirmed_request_types, complex_ack_types, \
@@ -49,6 +51,7 @@ class SSM(OneShotTask, DebugContents):
         , 'state', 'segmentAPDU', 'segmentSize', 'segmentCount', 'maxSegmentsAccepted'
         , 'retryCount', 'segmentRetryCount', 'sentAllSegments', 'lastSequenceNumber'
         , 'initialSequenceNumber', 'actualWindowSize', 'proposedWindowSize'
+        , 'windowLimit', 'windowThreshold', 'windowReduced', 'segmentLength'
         )
 
     def __init__(self, sap, remoteDevice):
@@ -59,11 +62,16 @@ class SSM(OneShotTask, DebugContents):
         self.ssmSAP = sap                   # service access point
         self.remoteDevice = remoteDevice    # remote device information, a DeviceInfo instance
         self.invokeID = None                # invoke ID
+        self.transactionKey = None          # (address, invokeID) in the SAP
+        self.requestFingerprint = None      # (service, data) of the request
 
         self.state = IDLE                   # initial state
         self.segmentAPDU = None             # refers to request or response
         self.segmentSize = None             # how big the pieces are
         self.segmentCount = None
+        self.segmentView = None             # view of the data being sent
+        self.segmentChunks = None           # data of the segments received
+        self.segmentLength = None
 
         self.retryCount = None
         self.segmentRetryCount = None
@@ -73,6 +81,11 @@ class SSM(OneShotTask, DebugContents):
         self.actualWindowSize = None
         self.proposedWindowSize = None
 
+        # adaptive window when receiving segments
+        self.windowLimit = None
+        self.windowThreshold = None
+        self.windowReduced = False
+
         # the maximum number of segments starts out being what's in the SAP
         # which is the defaults or values from the local device.
         self.maxSegmentsAccepted = self.ssmSAP.maxSegmentsAccepted
@@ -133,6 +146,9 @@ class SSM(OneShotTask, DebugContents):
 
         # set the context
         self.segmentAPDU = apdu
+        self.segmentView = None
+        self.segmentChunks = None
+        self.segmentLength = None
 
     def get_segment(self, indx):
         """This function returns an APDU coorisponding to a particular
@@ -184,24 +200,55 @@ class SSM(OneShotTask, DebugContents):
             segAPDU.apduSeg = False
             segAPDU.apduMor = False
 
-        # add the content
-        offset = indx * self.segmentSize
-        segAPDU.put_data( self.segmentAPDU.pduData[offset:offset+self.segmentSize] )
+        # add the content, an unsegmented message can take over the buffer
+        if (self.segmentCount == 1):
+            segAPDU.put_pdu_data(self.segmentAPDU)
+        else:
+            # segments are slices of one view of the data, not copies
+            if self.segmentView is None:
+                self.segmentView = memoryview(self.segmentAPDU.pduData)
+
+            offset = indx * self.segmentSize
+            segAPDU.pduData = self.segmentView[offset:offset+self.segmentSize]
 
         # success
         return segAPDU
 
     def append_segment(self, apdu):
-        """This function appends the apdu content to the end of the current
-        APDU being built.  The segmentAPDU is the context."""
+        """This function collects the apdu content to be added to the end of
+        the current APDU being built.  The segmentAPDU is the context.
+        Returns False when it would be larger than the SAP is willing to
+        reassemble."""
         if _debug: SSM._debug("append_segment %r", apdu)
 
         # check for no context
         if not self.segmentAPDU:
             raise RuntimeError("no segmentation context established")
 
-        # append the data
-        self.segmentAPDU.put_data(apdu.pduData)
+        # the first segment is the context
+        if self.segmentChunks is None:
+            self.segmentChunks = [self.segmentAPDU.pduData]
+            self.segmentLength = len(self.segmentAPDU.pduData)
+
+        # check the size
+        self.segmentLength += len(apdu.pduData)
+        if (self.ssmSAP.maxReassemblySize is not None) and (self.segmentLength > self.ssmSAP.maxReassemblySize):
+            if _debug: SSM._debug("    - too big: %r", self.segmentLength)
+            return False
+
+        # save the data
+        self.segmentChunks.append(apdu.pduData)
+
+        return True
+
+    def join_segments(self):
+        """This function is called when the last segment has been received
+        to join the content of the segments together, once."""
+        if _debug: SSM._debug("join_segments")
+
+        if self.segmentChunks is not None:
+            self.segmentAPDU.pduData = memoryview(b''.join(self.segmentChunks))
+            self.segmentChunks = None
 
     def in_window(self, seqA, seqB):
         if _debug: SSM._debug("in_window %r %r", seqA, seqB)
@@ -211,6 +258,53 @@ class SSM(OneShotTask, DebugContents):
 
         return rslt
 
+    def start_window(self, proposedWindowSize):
+        """Return the window size for the first segment ack when receiving a
+        segmented message.  It is the minimum of what the peer would like to
+        send and what this device is willing to receive, in adaptive mode it
+        starts at one and is opened up as the segments arrive."""
+        if _debug: SSM._debug("start_window %r", proposedWindowSize)
+
+        self.windowLimit = min(proposedWindowSize, self.ssmSAP.maxSegmentsAccepted)
+        if not self.ssmSAP.adaptiveSegmentWindow:
+            return self.windowLimit
+
+        self.windowThreshold = self.windowLimit
+        self.windowReduced = False
+
+        return 1
+
+    def open_window(self):
+        """Called when a group of segments has been received in order, the
+        window doubles until it reaches the threshold and then grows by one."""
+        if _debug: SSM._debug("open_window")
+
+        if not self.ssmSAP.adaptiveSegmentWindow:
+            return
+
+        if self.actualWindowSize < self.windowThreshold:
+            window_size = min(self.actualWindowSize * 2, self.windowThreshold)
+        else:
+            window_size = self.actualWindowSize + 1
+
+        self.actualWindowSize = min(window_size, self.windowLimit)
+        self.windowReduced = False
+        if _debug: SSM._debug("    - actualWindowSize: %r", self.actualWindowSize)
+
+    def close_window(self):
+        """Called when a segment is received out of order, which is what
+        a lost segment or the peer timing out and sending the window again
+        looks like.  The window is cut in half once per group."""
+        if _debug: SSM._debug("close_window")
+
+        if (not self.ssmSAP.adaptiveSegmentWindow) or self.windowReduced:
+            return
+
+        self.actualWindowSize = max(self.actualWindowSize // 2, 1)
+        self.windowThreshold = self.actualWindowSize
+        self.windowReduced = True
+        if _debug: SSM._debug("    - actualWindowSize: %r", self.actualWindowSize)
+
     def FillWindow(self, seqNum):
         """This function sends all of the packets necessary to fill
         out the segmentation window."""
@@ -241,6 +335,10 @@ class ClientSSM(SSM):
         # initialize the retry count
         self.retryCount = 0
 
+        # when the request was sent for the round trip time, None after it
+        # has been sent again
+        self.requestTime = None
+
     def set_state(self, newState, timer=0):
         """This function is called when the client wants to change state."""
         if _debug: ClientSSM._debug("set_state %r (%s) timer=%r", newState, SSM.transactionLabels[newState], timer)
@@ -251,7 +349,7 @@ class ClientSSM(SSM):
         # when completed or aborted, remove tracking
         if (newState == COMPLETED) or (newState == ABORTED):
             if _debug: ClientSSM._debug("    - remove from active transactions")
-            self.ssmSAP.clientTransactions.remove(self)
+            self.ssmSAP.remove_client_transaction(self)
 
             if _debug: ClientSSM._debug("    - release device information")
             self.ssmSAP.deviceInfoCache.release_device_info(self.remoteDevice)
@@ -330,7 +428,8 @@ class ClientSSM(SSM):
             # SendConfirmedUnsegmented
             self.sentAllSegments = True
             self.retryCount = 0
-            self.set_state(AWAIT_CONFIRMATION, self.ssmSAP.retryTimeout)
+            self.requestTime = TaskManager().get_time()
+            self.set_state(AWAIT_CONFIRMATION, self.ssmSAP.get_retry_timeout(self.remoteDevice))
         else:
             # SendConfirmedSegmented
             self.sentAllSegments = False
@@ -416,10 +515,12 @@ class ClientSSM(SSM):
                 if _debug: ClientSSM._debug("    - not in window")
                 self.restart_timer(self.ssmSAP.segmentTimeout)
 
-            # final ack received?
-            elif self.sentAllSegments:
+            # final ack received, a negative ack is for some segments
+            # that have to be sent again
+            elif self.sentAllSegments and (apdu.apduSeq == (self.segmentCount - 1) % 256):
                 if _debug: ClientSSM._debug("    - all done sending request")
-                self.set_state(AWAIT_CONFIRMATION, self.ssmSAP.retryTimeout)
+                self.requestTime = TaskManager().get_time()
+                self.set_state(AWAIT_CONFIRMATION, self.ssmSAP.get_retry_timeout(self.remoteDevice))
 
             # more segments to send
             else:
@@ -428,6 +529,7 @@ class ClientSSM(SSM):
                 self.initialSequenceNumber = (apdu.apduSeq + 1) % 256
                 self.actualWindowSize = apdu.apduWin
                 self.segmentRetryCount = 0
+                self.sentAllSegments = False
                 self.FillWindow(self.initialSequenceNumber)
                 self.restart_timer(self.ssmSAP.segmentTimeout)
 
@@ -459,7 +561,7 @@ class ClientSSM(SSM):
                 # set the segmented response context
                 self.set_segmentation_context(apdu)
 
-                self.actualWindowSize = min(apdu.apduWin, self.ssmSAP.maxSegmentsAccepted)
+                self.actualWindowSize = self.start_window(apdu.apduWin)
                 self.lastSequenceNumber = 0
                 self.initialSequenceNumber = 0
                 self.set_state(SEGMENTED_CONFIRMATION, self.ssmSAP.segmentTimeout)
@@ -494,6 +596,12 @@ class ClientSSM(SSM):
     def await_confirmation(self, apdu):
         if _debug: ClientSSM._debug("await_confirmation %r", apdu)
 
+        # the device answered a request that was only sent once
+        if (self.requestTime is not None) and (apdu.apduType != SegmentAckPDU.pduType):
+            elapsed = TaskManager().get_time() - self.requestTime
+            self.ssmSAP.update_round_trip_time(self.remoteDevice, elapsed * 1000.0)
+            self.requestTime = None
+
         if (apdu.apduType == AbortPDU.pduType):
             if _debug: ClientSSM._debug("    - server aborted")
 
@@ -527,7 +635,7 @@ class ClientSSM(SSM):
                 # set the segmented response context
                 self.set_segmentation_context(apdu)
 
-                self.actualWindowSize = min(apdu.apduWin, self.ssmSAP.maxSegmentsAccepted)
+                self.actualWindowSize = self.start_window(apdu.apduWin)
                 self.lastSequenceNumber = 0
                 self.initialSequenceNumber = 0
                 self.set_state(SEGMENTED_CONFIRMATION, self.ssmSAP.segmentTimeout)
@@ -563,6 +671,13 @@ class ClientSSM(SSM):
             saveCount = self.retryCount
             self.indication(self.segmentAPDU)
             self.retryCount = saveCount
+
+            # a response could be to either request, so no round trip time
+            self.requestTime = None
+
+            # wait longer each time
+            if self.ssmSAP.adaptiveRetryTimeout and (self.state == AWAIT_CONFIRMATION):
+                self.restart_timer(self.ssmSAP.get_retry_timeout(self.remoteDevice, self.retryCount))
         else:
             if _debug: ClientSSM._debug("    - retry count exceeded")
             abort = self.abort(AbortReason.noResponse)
@@ -593,14 +708,23 @@ class ClientSSM(SSM):
         if apdu.apduSeq != (self.lastSequenceNumber + 1) % 256:
             if _debug: ClientSSM._debug("    - segment %s received out of order, should be %s", apdu.apduSeq, (self.lastSequenceNumber + 1) % 256)
 
-            # segment received out of order
+            # segment received out of order, the next group starts after
+            # the last one received in order
+            self.close_window()
+            self.initialSequenceNumber = self.lastSequenceNumber
             self.restart_timer(self.ssmSAP.segmentTimeout)
             segack = SegmentAckPDU( 1, 0, self.invokeID, self.lastSequenceNumber, self.actualWindowSize )
             self.request(segack)
             return
 
         # add the data
-        self.append_segment(apdu)
+        if not self.append_segment(apdu):
+            if _debug: ClientSSM._debug("    - too big to reassemble")
+
+            abort = self.abort(AbortReason.bufferOverflow)
+            self.request(abort) # send it to the device
+            self.response(abort) # send it to the application
+            return
 
         # update the sequence number
         self.lastSequenceNumber = (self.lastSequenceNumber + 1) % 256
@@ -608,6 +732,7 @@ class ClientSSM(SSM):
         # last segment received
         if not apdu.apduMor:
             if _debug: ClientSSM._debug("    - no more follows")
+            self.join_segments()
 
             # send a final ack
             segack = SegmentAckPDU( 0, 0, self.invokeID, self.lastSequenceNumber, self.actualWindowSize )
@@ -619,6 +744,7 @@ class ClientSSM(SSM):
         elif apdu.apduSeq == ((self.initialSequenceNumber + self.actualWindowSize) % 256):
             if _debug: ClientSSM._debug("    - last segment in the group")
 
+            self.open_window()
             self.initialSequenceNumber = self.lastSequenceNumber
             self.restart_timer(self.ssmSAP.segmentTimeout)
             segack = SegmentAckPDU( 0, 0, self.invokeID, self.lastSequenceNumber, self.actualWindowSize )
@@ -657,7 +783,7 @@ class ServerSSM(SSM):
         # when completed or aborted, remove tracking
         if (newState == COMPLETED) or (newState == ABORTED):
             if _debug: ServerSSM._debug("    - remove from active transactions")
-            self.ssmSAP.serverTransactions.remove(self)
+            self.ssmSAP.remove_server_transaction(self)
 
             if _debug: ServerSSM._debug("    - release device information")
             self.ssmSAP.deviceInfoCache.release_device_info(self.remoteDevice)
@@ -721,6 +847,9 @@ class ServerSSM(SSM):
             self.response(apdu)
             return
 
+        # keep it around for retransmissions of the request
+        self.ssmSAP.cache_response(self, apdu)
+
         # simple response
         if (apdu.apduType == SimpleAckPDU.pduType) or (apdu.apduType == ErrorPDU.pduType) or (apdu.apduType == RejectPDU.pduType):
             if _debug: ServerSSM._debug("    - simple ack, error, or reject")
@@ -873,6 +1002,14 @@ class ServerSSM(SSM):
         # unsegmented request
         if not apdu.apduSeg:
             self.set_state(AWAIT_RESPONSE, self.ssmSAP.applicationTimeout)
+
+            # the client might be sending it again after it was answered
+            response = self.ssmSAP.get_cached_response(self, apdu)
+            if response is not None:
+                if _debug: ServerSSM._debug("    - cached response")
+                self.confirmation(response)
+                return
+
             self.request(apdu)
             return
 
@@ -887,7 +1024,7 @@ class ServerSSM(SSM):
 
         # the window size is the minimum of what I'm willing to receive and
         # what the device has said it would like to send
-        self.actualWindowSize = min(apdu.apduWin, self.ssmSAP.maxSegmentsAccepted)
+        self.actualWindowSize = self.start_window(apdu.apduWin)
 
         # initialize the state
         self.lastSequenceNumber = 0
@@ -927,7 +1064,10 @@ class ServerSSM(SSM):
         if apdu.apduSeq != (self.lastSequenceNumber + 1) % 256:
             if _debug: ServerSSM._debug("    - segment %d received out of order, should be %d", apdu.apduSeq, (self.lastSequenceNumber + 1) % 256)
 
-            # segment received out of order
+            # segment received out of order, the next group starts after
+            # the last one received in order
+            self.close_window()
+            self.initialSequenceNumber = self.lastSequenceNumber
             self.restart_timer(self.ssmSAP.segmentTimeout)
 
             # send back a segment ack
@@ -937,7 +1077,13 @@ class ServerSSM(SSM):
             return
 
         # add the data
-        self.append_segment(apdu)
+        if not self.append_segment(apdu):
+            if _debug: ServerSSM._debug("    - too big to reassemble")
+
+            abort = self.abort(AbortReason.bufferOverflow)
+            self.request(abort) # send it to the application
+            self.response(abort) # send it to the device
+            return
 
         # update the sequence number
         self.lastSequenceNumber = (self.lastSequenceNumber + 1) % 256
@@ -945,6 +1091,7 @@ class ServerSSM(SSM):
         # last segment?
         if not apdu.apduMor:
             if _debug: ServerSSM._debug("    - no more follows")
+            self.join_segments()
 
             # send back a final segment ack
             segack = SegmentAckPDU( 0, 1, self.invokeID, self.lastSequenceNumber, self.actualWindowSize )
@@ -957,6 +1104,7 @@ class ServerSSM(SSM):
         elif apdu.apduSeq == ((self.initialSequenceNumber + self.actualWindowSize) % 256):
                 if _debug: ServerSSM._debug("    - last segment in the group")
 
+                self.open_window()
                 self.initialSequenceNumber = self.lastSequenceNumber
                 self.restart_timer(self.ssmSAP.segmentTimeout)
 
@@ -1013,8 +1161,9 @@ class ServerSSM(SSM):
                 if _debug: ServerSSM._debug("    - not in window")
                 self.restart_timer(self.ssmSAP.segmentTimeout)
 
-            # final ack received?
-            elif self.sentAllSegments:
+            # final ack received, a negative ack is for some segments
+            # that have to be sent again
+            elif self.sentAllSegments and (apdu.apduSeq == (self.segmentCount - 1) % 256):
                 if _debug: ServerSSM._debug("    - all done sending response")
                 self.set_state(COMPLETED)
 
@@ -1024,6 +1173,7 @@ class ServerSSM(SSM):
                 self.initialSequenceNumber = (apdu.apduSeq + 1) % 256
                 self.actualWindowSize = apdu.apduWin
                 self.segmentRetryCount = 0
+                self.sentAllSegments = False
                 self.FillWindow(self.initialSequenceNumber)
                 self.restart_timer(self.ssmSAP.segmentTimeout)
 
@@ -1047,6 +1197,85 @@ class ServerSSM(SSM):
             # give up
             self.set_state(ABORTED)
 
+#
+#   InvokeIDAllocator
+#
+
+@bacpypes_debugging
+class InvokeIDAllocator(DebugContents):
+
+    """
+    Each peer has its own space of 256 invoke IDs.  The free IDs of a peer
+    with transactions in progress are kept in a queue, IDs are handed out
+    from the front and released IDs go to the back so the one most recently
+    used is the last to be used again.
+
+    An ID that is handed out is only taken out of the free IDs when it is
+    reserved for a transaction, so one that never gets that far is not lost.
+    A peer is forgotten when all of its IDs are free again.
+    """
+
+    _debug_contents = ('nextInvokeID', 'peers')
+
+    def __init__(self):
+        if _debug: InvokeIDAllocator._debug("__init__")
+
+        # where the free IDs of the next new peer start
+        self.nextInvokeID = 1
+
+        # peer address to a deque of free invoke IDs
+        self.peers = {}
+
+    def allocate(self, addr):
+        """Return a free invoke ID for the peer."""
+        if _debug: InvokeIDAllocator._debug("allocate %r", addr)
+
+        free_ids = self.peers.get(addr)
+        if free_ids is None:
+            invokeID = self.nextInvokeID
+            self.nextInvokeID = (invokeID + 1) % 256
+            return invokeID
+
+        if not free_ids:
+            raise RuntimeError("no available invoke ID")
+
+        # the next one is handed out after the rest
+        invokeID = free_ids[0]
+        free_ids.rotate(-1)
+
+        return invokeID
+
+    def reserve(self, addr, invokeID):
+        """Take an invoke ID out of the free IDs of the peer for a
+        transaction, it may or may not have come from allocate()."""
+        if _debug: InvokeIDAllocator._debug("reserve %r %r", addr, invokeID)
+
+        free_ids = self.peers.get(addr)
+        if free_ids is None:
+            # the ones after this are handed out next
+            start = (invokeID + 1) % 256
+            free_ids = self.peers[addr] = deque(range(start, 256))
+            free_ids.extend(range(start))
+            free_ids.pop()
+        elif invokeID in free_ids:
+            free_ids.remove(invokeID)
+        else:
+            raise RuntimeError("invoke ID in use")
+
+    def release(self, addr, invokeID):
+        """Return an invoke ID to the free IDs of the peer."""
+        if _debug: InvokeIDAllocator._debug("release %r %r", addr, invokeID)
+
+        free_ids = self.peers.get(addr)
+        if (free_ids is None) or (invokeID in free_ids):
+            return
+
+        free_ids.append(invokeID)
+
+        # forget about peers with nothing in progress
+        if len(free_ids) == 256:
+            del self.peers[addr]
+
 #
 #   StateMachineAccessPoint
 #
@@ -1064,23 +1293,63 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
         # save a reference to the device information cache
         self.deviceInfoCache = deviceInfoCache
 
-        # client settings
-        self.nextInvokeID = 1
-        self.clientTransactions = []
-
-        # server settings
-        self.serverTransactions = []
+        # client settings, transactions are keyed by (address, invokeID).
+        # These used to be lists of transactions, iterate over the values().
+        self.invokeIDAllocator = InvokeIDAllocator()
+        self.clientTransactions = {}
+
+        # server settings, transactions are keyed by (address, invokeID)
+        self.serverTransactions = {}
+
+        # responses to unsegmented requests are kept for this many
+        # milliseconds so a retransmitted request is answered again without
+        # going to the application, zero to disable
+        self.responseCacheTime = 0
+        self.maxCachedResponses = 256
+        self.responseCache = OrderedDict()
+
+        # limits on the number of server transactions, in total and for each
+        # device, None for no limit.  When there are too many requests wait
+        # in a queue, when that is full they are aborted.  Requests that
+        # have waited longer than the retry timeout are dropped, the client
+        # has already sent them again or given up.
+        self.maxServerTransactions = None
+        self.maxServerTransactionsPerPeer = None
+        self.maxQueuedRequests = 0
+        self.queuedRequests = OrderedDict()
+        self.peerTransactions = {}
+
+        # counters for sizing the limits
+        self.requestsAdmitted = 0
+        self.requestsQueued = 0
+        self.requestsShed = 0
+        self.requestsDropped = 0
+        self.peakServerTransactions = 0
 
         # confirmed request defaults
         self.retryCount = 3
         self.retryTimeout = 3000
         self.maxApduLengthAccepted = 1024
 
+        # when enabled the retry timeout for each device comes from its
+        # round trip times, between the minimum and maximum
+        self.adaptiveRetryTimeout = False
+        self.minRetryTimeout = 100
+        self.maxRetryTimeout = 10000
+
         # segmentation defaults
         self.segmentationSupported = 'noSegmentation'
         self.segmentTimeout = 1500
         self.maxSegmentsAccepted = 8
 
+        # when enabled the window for receiving segments starts small and
+        # follows how well the segments are arriving
+        self.adaptiveSegmentWindow = False
+
+        # the largest segmented message that will be put back together,
+        # None for no limit
+        self.maxReassemblySize = None
+
         # local device object provides these
         if localDevice:
             self.retryCount = localDevice.numberOfApduRetries
@@ -1094,26 +1363,281 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
         # layer to form a response and send it
         self.applicationTimeout = 3000
 
+    def get_retry_timeout(self, remoteDevice, retryCount=0):
+        """Return how long to wait for a response from the device in
+        milliseconds, doubled for each time the request has been sent
+        again."""
+        if _debug: StateMachineAccessPoint._debug("get_retry_timeout %r %r", remoteDevice, retryCount)
+
+        # not enabled or nothing known about the device
+        if (not self.adaptiveRetryTimeout) or (remoteDevice.smoothedRoundTripTime is None):
+            return self.retryTimeout
+
+        timeout = remoteDevice.smoothedRoundTripTime + 4 * remoteDevice.roundTripTimeVariance
+        timeout *= (1 << retryCount)
+        timeout = min(max(timeout, self.minRetryTimeout), self.maxRetryTimeout)
+        if _debug: StateMachineAccessPoint._debug("    - timeout: %r", timeout)
+
+        return int(timeout)
+
+    def update_round_trip_time(self, remoteDevice, msecs):
+        """Called by a client transaction with the time it took for the
+        device to respond to a request that was only sent once."""
+        if _debug: StateMachineAccessPoint._debug("update_round_trip_time %r %r", remoteDevice, msecs)
+
+        # keep one bad sample from the clock from swamping the estimate
+        msecs = min(max(msecs, 0.0), self.maxRetryTimeout)
+
+        if remoteDevice.smoothedRoundTripTime is None:
+            remoteDevice.smoothedRoundTripTime = msecs
+            remoteDevice.roundTripTimeVariance = msecs / 2.0
+        else:
+            # same weights as TCP
+            remoteDevice.roundTripTimeVariance = 0.75 * remoteDevice.roundTripTimeVariance \
+                + 0.25 * abs(remoteDevice.smoothedRoundTripTime - msecs)
+            remoteDevice.smoothedRoundTripTime = 0.875 * remoteDevice.smoothedRoundTripTime \
+                + 0.125 * msecs
+
     def get_next_invoke_id(self, addr):
         """Called by clients to get an unused invoke ID."""
         if _debug: StateMachineAccessPoint._debug("get_next_invoke_id")
 
-        initialID = self.nextInvokeID
-        while 1:
-            invokeID = self.nextInvokeID
-            self.nextInvokeID = (self.nextInvokeID + 1) % 256
+        return self.invokeIDAllocator.allocate(addr)
 
-            # see if we've checked for them all
-            if initialID == self.nextInvokeID:
-                raise RuntimeError("no available invoke ID")
+    def add_client_transaction(self, tr, addr, invokeID):
+        """Track a client transaction with the address and invoke ID
+        it was sent with."""
+        if _debug: StateMachineAccessPoint._debug("add_client_transaction %r %r %r", tr, addr, invokeID)
 
-            for tr in self.clientTransactions:
-                if (invokeID == tr.invokeID) and (addr == tr.remoteDevice.address):
-                    break
-            else:
+        # the invoke ID is not free until the transaction is removed
+        self.invokeIDAllocator.reserve(addr, invokeID)
+
+        tr.transactionKey = (addr, invokeID)
+        self.clientTransactions[tr.transactionKey] = tr
+
+    def remove_client_transaction(self, tr):
+        """Stop tracking a client transaction and make its invoke ID
+        available again."""
+        if _debug: StateMachineAccessPoint._debug("remove_client_transaction %r", tr)
+
+        if self.clientTransactions.get(tr.transactionKey) is tr:
+            del self.clientTransactions[tr.transactionKey]
+            self.invokeIDAllocator.release(*tr.transactionKey)
+
+    def add_server_transaction(self, tr, addr, invokeID):
+        """Track a server transaction with the address and invoke ID
+        of the request."""
+        if _debug: StateMachineAccessPoint._debug("add_server_transaction %r %r %r", tr, addr, invokeID)
+
+        tr.transactionKey = (addr, invokeID)
+        self.serverTransactions[tr.transactionKey] = tr
+        self.peerTransactions[addr] = self.peerTransactions.get(addr, 0) + 1
+
+        self.peakServerTransactions = max(self.peakServerTransactions, len(self.serverTransactions))
+
+    def remove_server_transaction(self, tr):
+        """Stop tracking a server transaction."""
+        if _debug: StateMachineAccessPoint._debug("remove_server_transaction %r", tr)
+
+        if self.serverTransactions.get(tr.transactionKey) is tr:
+            del self.serverTransactions[tr.transactionKey]
+            self._release_peer(tr.transactionKey[0])
+
+            # there might be room for a request that is waiting
+            if self.queuedRequests:
+                deferred(self._start_queued_requests)
+
+    def _release_peer(self, addr):
+        """One less transaction or queued request for the device."""
+        count = self.peerTransactions[addr] - 1
+        if count:
+            self.peerTransactions[addr] = count
+        else:
+            del self.peerTransactions[addr]
+
+    def _server_transaction_available(self):
+        """Return true if another server transaction can be started."""
+        return (self.maxServerTransactions is None) \
+            or (len(self.serverTransactions) < self.maxServerTransactions)
+
+    def admit_request(self, apdu):
+        """Called with a confirmed request that does not belong to a server
+        transaction, it is started, queued, or aborted if there are too
+        many requests."""
+        if _debug: StateMachineAccessPoint._debug("admit_request %r", apdu)
+
+        now = TaskManager().get_time()
+        self._drop_stale_requests(now)
+
+        # already waiting, a retransmission, the client is still waiting
+        key = (apdu.pduSource, apdu.apduInvokeID)
+        if key in self.queuedRequests:
+            if _debug: StateMachineAccessPoint._debug("    - already queued")
+            self.queuedRequests[key] = (now, apdu)
+            return
+
+        # answered already, the application is not involved
+        if self._find_cached_response(key, apdu) is not None:
+            if _debug: StateMachineAccessPoint._debug("    - cached response")
+            self.start_server_transaction(apdu)
+            return
+
+        # too many from this device
+        if (self.maxServerTransactionsPerPeer is not None) and \
+                (self.peerTransactions.get(apdu.pduSource, 0) >= self.maxServerTransactionsPerPeer):
+            if _debug: StateMachineAccessPoint._debug("    - too many from the device")
+            self.shed_request(apdu)
+            return
+
+        # room now and nothing waiting ahead of it
+        if (not self.queuedRequests) and self._server_transaction_available():
+            self.start_server_transaction(apdu)
+            return
+
+        # no room to wait
+        if len(self.queuedRequests) >= self.maxQueuedRequests:
+            if _debug: StateMachineAccessPoint._debug("    - queue full")
+            self.shed_request(apdu)
+            return
+
+        if _debug: StateMachineAccessPoint._debug("    - queued")
+        self.queuedRequests[key] = (now, apdu)
+        self.peerTransactions[apdu.pduSource] = self.peerTransactions.get(apdu.pduSource, 0) + 1
+        self.requestsQueued += 1
+
+    def start_server_transaction(self, apdu):
+        """Build a server transaction for the request and let it run."""
+        if _debug: StateMachineAccessPoint._debug("start_server_transaction %r", apdu)
+
+        # find the remote device information
+        remoteDevice = self.deviceInfoCache.acquire_device_info(apdu.pduSource)
+
+        # build a server transaction
+        tr = ServerSSM(self, remoteDevice)
+
+        # add it to our transactions to track it
+        self.add_server_transaction(tr, apdu.pduSource, apdu.apduInvokeID)
+        self.requestsAdmitted += 1
+
+        # let it run with the apdu
+        tr.indication(apdu)
+
+    def shed_request(self, apdu):
+        """Tell the device there are not enough resources for the request."""
+        if _debug: StateMachineAccessPoint._debug("shed_request %r", apdu)
+
+        self.requestsShed += 1
+
+        abort = AbortPDU(True, apdu.apduInvokeID, AbortReason.outOfResources)
+        abort.pduDestination = apdu.pduSource
+        self.request(abort)
+
+    def _start_queued_requests(self):
+        """Start the requests that are waiting while there is room."""
+        if _debug: StateMachineAccessPoint._debug("_start_queued_requests")
+
+        self._drop_stale_requests(TaskManager().get_time())
+
+        while self.queuedRequests and self._server_transaction_available():
+            key, (queued, apdu) = self.queuedRequests.popitem(last=False)
+            self._release_peer(apdu.pduSource)
+
+            self.start_server_transaction(apdu)
+
+    def _drop_stale_requests(self, now):
+        """Forget the requests that have been waiting too long."""
+        oldest = now - (self.retryTimeout / 1000.0)
+
+        for key, (queued, apdu) in list(self.queuedRequests.items()):
+            if queued > oldest:
+                continue
+            if _debug: StateMachineAccessPoint._debug("    - stale: %r", key)
+
+            del self.queuedRequests[key]
+            self._release_peer(apdu.pduSource)
+            self.requestsDropped += 1
+
+    def get_cached_response(self, tr, apdu):
+        """Called by a server transaction with an unsegmented request, returns
+        the response to the same request from the same device if there is
+        one in the cache."""
+        if _debug: StateMachineAccessPoint._debug("get_cached_response %r %r", tr, apdu)
+
+        if not self.responseCacheTime:
+            return None
+
+        # the invoke ID might have been reused for a different request
+        tr.requestFingerprint = (apdu.apduService, bytes(apdu.pduData))
+
+        response = self._find_cached_response(tr.transactionKey, apdu)
+        if response is None:
+            return None
+
+        # answering from the cache does not keep it around any longer
+        tr.requestFingerprint = None
+
+        # decode a new copy, the last one might have been changed on the
+        # way down the stack
+        xpdu = APDU()
+        xpdu.decode(PDU(response))
+        apdu = apdu_types[xpdu.apduType]()
+        apdu.decode(xpdu)
+        apdu.pduDestination = tr.remoteDevice.address
+
+        return apdu
+
+    def _find_cached_response(self, key, apdu):
+        """Return the encoded response to the unsegmented request if it is
+        in the cache and has not expired, or None."""
+        if (not self.responseCacheTime) or apdu.apduSeg:
+            return None
+
+        entry = self.responseCache.get(key)
+        if entry is None:
+            return None
+
+        expires, fingerprint, response = entry
+        if expires <= TaskManager().get_time():
+            if _debug: StateMachineAccessPoint._debug("    - expired")
+            del self.responseCache[key]
+            return None
+
+        # the invoke ID might have been reused for a different request
+        if fingerprint != (apdu.apduService, bytes(apdu.pduData)):
+            if _debug: StateMachineAccessPoint._debug("    - different request")
+            return None
+
+        return response
+
+    def cache_response(self, tr, apdu):
+        """Called by a server transaction with the response from the
+        application."""
+        if _debug: StateMachineAccessPoint._debug("cache_response %r %r", tr, apdu)
+
+        if (not self.responseCacheTime) or (tr.requestFingerprint is None):
+            return
+        if apdu.apduType == AbortPDU.pduType:
+            return
+
+        now = TaskManager().get_time()
+
+        # the oldest entries expire first
+        while self.responseCache:
+            key, (expires, fingerprint, response) = next(iter(self.responseCache.items()))
+            if (expires > now) and (len(self.responseCache) < self.maxCachedResponses):
                 break
+            del self.responseCache[key]
 
-        return invokeID
+        # keep the encoded response
+        xpdu = APDU()
+        apdu.encode(xpdu)
+        pdu = PDU()
+        xpdu.encode(pdu)
+
+        self.responseCache.pop(tr.transactionKey, None)
+        self.responseCache[tr.transactionKey] = (
+            now + (self.responseCacheTime / 1000.0), tr.requestFingerprint, bytes(pdu.pduData),
+            )
 
     def confirmation(self, pdu):
         """Packets coming up the stack are APDU's."""
@@ -1132,18 +1656,10 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
 
         if isinstance(apdu, ConfirmedRequestPDU):
             # find duplicates of this request
-            for tr in self.serverTransactions:
-                if (apdu.pduSource == tr.remoteDevice.address) and (apdu.apduInvokeID == tr.invokeID):
-                    break
-            else:
-                # find the remote device information
-                remoteDevice = self.deviceInfoCache.get_device_info(apdu.pduSource)
-
-                # build a server transaction
-                tr = ServerSSM(self, remoteDevice)
-
-                # add it to our transactions to track it
-                self.serverTransactions.append(tr)
+            tr = self.serverTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+            if tr is None:
+                self.admit_request(apdu)
+                return
 
             # let it run with the apdu
             tr.indication(apdu)
@@ -1158,10 +1674,8 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
             or isinstance(apdu, RejectPDU):
 
             # find the client transaction this is acking
-            for tr in self.clientTransactions:
-                if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.remoteDevice.address):
-                    break
-            else:
+            tr = self.clientTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+            if tr is None:
                 return
 
             # send the packet on to the transaction
@@ -1170,19 +1684,15 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
         elif isinstance(apdu, AbortPDU):
             # find the transaction being aborted
             if apdu.apduSrv:
-                for tr in self.clientTransactions:
-                    if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.remoteDevice.address):
-                        break
-                else:
+                tr = self.clientTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+                if tr is None:
                     return
 
                 # send the packet on to the transaction
                 tr.confirmation(apdu)
             else:
-                for tr in self.serverTransactions:
-                    if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.remoteDevice.address):
-                        break
-                else:
+                tr = self.serverTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+                if tr is None:
                     return
 
                 # send the packet on to the transaction
@@ -1191,19 +1701,15 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
         elif isinstance(apdu, SegmentAckPDU):
             # find the transaction being aborted
             if apdu.apduSrv:
-                for tr in self.clientTransactions:
-                    if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.remoteDevice.address):
-                        break
-                else:
+                tr = self.clientTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+                if tr is None:
                     return
 
                 # send the packet on to the transaction
                 tr.confirmation(apdu)
             else:
-                for tr in self.serverTransactions:
-                    if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduSource == tr.remoteDevice.address):
-                        break
-                else:
+                tr = self.serverTransactions.get((apdu.pduSource, apdu.apduInvokeID))
+                if tr is None:
                     return
 
                 # send the packet on to the transaction
@@ -1227,16 +1733,15 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
                 apdu.apduInvokeID = self.get_next_invoke_id(apdu.pduDestination)
             else:
                 # verify the invoke ID isn't already being used
-                for tr in self.clientTransactions:
-                    if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduDestination == tr.remoteDevice.address):
-                        raise RuntimeError("invoke ID in use")
+                if (apdu.pduDestination, apdu.apduInvokeID) in self.clientTransactions:
+                    raise RuntimeError("invoke ID in use")
 
             # warning for bogus requests
             if (apdu.pduDestination.addrType != Address.localStationAddr) and (apdu.pduDestination.addrType != Address.remoteStationAddr):
                 StateMachineAccessPoint._warning("%s is not a local or remote station", apdu.pduDestination)
 
             # find the remote device information
-            remoteDevice = self.deviceInfoCache.get_device_info(apdu.pduDestination)
+            remoteDevice = self.deviceInfoCache.acquire_device_info(apdu.pduDestination)
             if _debug: StateMachineAccessPoint._debug("    - remoteDevice: %r", remoteDevice)
 
             # create a client transaction state machine
@@ -1244,7 +1749,7 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
             if _debug: StateMachineAccessPoint._debug("    - client segmentation state machine: %r", tr)
 
             # add it to our transactions to track it
-            self.clientTransactions.append(tr)
+            self.add_client_transaction(tr, apdu.pduDestination, apdu.apduInvokeID)
 
             # let it run
             tr.indication(apdu)
@@ -1263,10 +1768,8 @@ class StateMachineAccessPoint(Client, ServiceAccessPoint):
                 or isinstance(apdu, RejectPDU) \
                 or isinstance(apdu, AbortPDU):
             # find the appropriate server transaction
-            for tr in self.serverTransactions:
-                if (apdu.apduInvokeID == tr.invokeID) and (apdu.pduDestination == tr.remoteDevice.address):
-                    break
-            else:
+            tr = self.serverTransactions.get((apdu.pduDestination, apdu.apduInvokeID))
+            if tr is None:
                 return
 
             # pass control to the transaction
@@ -7,7 +7,7 @@ BACnet Virtual Link Layer Module
 from .errors import EncodingError, DecodingError
 from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
 
-from .pdu import Address, PCI, PDUData, unpack_ip_addr
+from .pdu import Address, PCI, PDUData, intern_address, unpack_ip_addr
 
 # some debugging
 _debug = 0
@@ -26,6 +26,9 @@ def register_bvlpdu_type(klass):
 @bacpypes_debugging
 class BVLCI(PCI, DebugContents):
 
+    # the attributes are in the slots or the dictionary of the PDU class
+    __slots__ = ()
+
     _debug_contents = ('bvlciType', 'bvlciFunction', 'bvlciLength')
 
     result                              = 0x00
@@ -110,13 +113,18 @@ class BVLCI(PCI, DebugContents):
 @bacpypes_debugging
 class BVLPDU(BVLCI, PDUData):
 
+    __slots__ = ('pduUserData', 'pduSource', 'pduDestination',
+        'pduExpectingReply', 'pduNetworkPriority',
+        'bvlciType', 'bvlciFunction', 'bvlciLength',
+        )
+
     def __init__(self, *args, **kwargs):
         if _debug: BVLPDU._debug("__init__ %r %r", args, kwargs)
         super(BVLPDU, self).__init__(*args, **kwargs)
 
     def encode(self, pdu):
         BVLCI.encode(self, pdu)
-        pdu.put_data(self.pduData)
+        pdu.put_pdu_data(self)
 
     def decode(self, pdu):
         BVLCI.decode(self, pdu)
@@ -171,6 +179,8 @@ def key_value_contents(use_dict=None, as_class=dict, key_values=()):
 
 class Result(BVLPDU):
 
+    __slots__ = ('bvlciResultCode',)
+
     _debug_contents = ('bvlciResultCode',)
 
     messageType = BVLCI.result
@@ -206,6 +216,8 @@ register_bvlpdu_type(Result)
 
 class WriteBroadcastDistributionTable(BVLPDU):
 
+    __slots__ = ('bvlciBDT',)
+
     _debug_contents = ('bvlciBDT',)
 
     messageType = BVLCI.writeBroadcastDistributionTable
@@ -250,6 +262,8 @@ register_bvlpdu_type(WriteBroadcastDistributionTable)
 #
 
 class ReadBroadcastDistributionTable(BVLPDU):
+    __slots__ = ()
+
     messageType = BVLCI.readBroadcastDistributionTable
 
     def __init__(self, *args, **kwargs):
@@ -279,6 +293,8 @@ register_bvlpdu_type(ReadBroadcastDistributionTable)
 
 class ReadBroadcastDistributionTableAck(BVLPDU):
 
+    __slots__ = ('bvlciBDT',)
+
     _debug_contents = ('bvlciBDT',)
 
     messageType = BVLCI.readBroadcastDistributionTableAck
@@ -331,6 +347,8 @@ register_bvlpdu_type(ReadBroadcastDistributionTableAck)
 
 class ForwardedNPDU(BVLPDU):
 
+    __slots__ = ('bvlciAddress',)
+
     _debug_contents = ('bvlciAddress',)
 
     messageType = BVLCI.forwardedNPDU
@@ -352,13 +370,13 @@ class ForwardedNPDU(BVLPDU):
         bvlpdu.put_data( self.bvlciAddress.addrAddr )
 
         # encode the rest of the data
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.put_pdu_data( self )
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
 
         # get the address
-        self.bvlciAddress = Address(unpack_ip_addr(bvlpdu.get_data(6)))
+        self.bvlciAddress = intern_address(bvlpdu.get_data(6))
 
         # get the rest of the data
         self.pduData = bvlpdu.get_data(len(bvlpdu.pduData))
@@ -418,6 +436,8 @@ class FDTEntry(DebugContents):
 
 class RegisterForeignDevice(BVLPDU):
 
+    __slots__ = ('bvlciTimeToLive',)
+
     _debug_contents = ('bvlciTimeToLive',)
 
     messageType = BVLCI.registerForeignDevice
@@ -453,6 +473,8 @@ register_bvlpdu_type(RegisterForeignDevice)
 
 class ReadForeignDeviceTable(BVLPDU):
 
+    __slots__ = ()
+
     messageType = BVLCI.readForeignDeviceTable
 
     def __init__(self, ttl=None, *args, **kwargs):
@@ -482,6 +504,8 @@ register_bvlpdu_type(ReadForeignDeviceTable)
 
 class ReadForeignDeviceTableAck(BVLPDU):
 
+    __slots__ = ('bvlciFDT',)
+
     _debug_contents = ('bvlciFDT',)
 
     messageType = BVLCI.readForeignDeviceTableAck
@@ -530,6 +554,8 @@ register_bvlpdu_type(ReadForeignDeviceTableAck)
 
 class DeleteForeignDeviceTableEntry(BVLPDU):
 
+    __slots__ = ('bvlciAddress',)
+
     _debug_contents = ('bvlciAddress',)
 
     messageType = BVLCI.deleteForeignDeviceTableEntry
@@ -547,7 +573,7 @@ class DeleteForeignDeviceTableEntry(BVLPDU):
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
-        self.bvlciAddress = Address(unpack_ip_addr(bvlpdu.get_data(6)))
+        self.bvlciAddress = intern_address(bvlpdu.get_data(6))
 
     def bvlpdu_contents(self, use_dict=None, as_class=dict):
         """Return the contents of an object as a dict."""
@@ -565,6 +591,8 @@ register_bvlpdu_type(DeleteForeignDeviceTableEntry)
 
 class DistributeBroadcastToNetwork(BVLPDU):
 
+    __slots__ = ()
+
     messageType = BVLCI.distributeBroadcastToNetwork
 
     def __init__(self, *args, **kwargs):
@@ -576,7 +604,7 @@ class DistributeBroadcastToNetwork(BVLPDU):
     def encode(self, bvlpdu):
         self.bvlciLength = 4 + len(self.pduData)
         BVLCI.update(bvlpdu, self)
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.put_pdu_data( self )
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
@@ -608,6 +636,8 @@ register_bvlpdu_type(DistributeBroadcastToNetwork)
 #
 
 class OriginalUnicastNPDU(BVLPDU):
+    __slots__ = ()
+
     messageType = BVLCI.originalUnicastNPDU
 
     def __init__(self, *args, **kwargs):
@@ -619,7 +649,7 @@ class OriginalUnicastNPDU(BVLPDU):
     def encode(self, bvlpdu):
         self.bvlciLength = 4 + len(self.pduData)
         BVLCI.update(bvlpdu, self)
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.put_pdu_data( self )
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
@@ -651,6 +681,8 @@ register_bvlpdu_type(OriginalUnicastNPDU)
 #
 
 class OriginalBroadcastNPDU(BVLPDU):
+    __slots__ = ()
+
     messageType = BVLCI.originalBroadcastNPDU
 
     def __init__(self, *args, **kwargs):
@@ -662,7 +694,7 @@ class OriginalBroadcastNPDU(BVLPDU):
     def encode(self, bvlpdu):
         self.bvlciLength = 4 + len(self.pduData)
         BVLCI.update(bvlpdu, self)
-        bvlpdu.put_data( self.pduData )
+        bvlpdu.put_pdu_data( self )
 
     def decode(self, bvlpdu):
         BVLCI.update(self, bvlpdu)
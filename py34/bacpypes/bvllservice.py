@@ -16,7 +16,7 @@ from .comm import Client, Server, bind, \
     ServiceAccessPoint, ApplicationServiceElement
 
 from .pdu import Address, LocalBroadcast, LocalStation, PDU, \
-    unpack_ip_addr
+    intern_address, unpack_ip_addr
 from .bvll import BVLPDU, DeleteForeignDeviceTableEntry, \
     DistributeBroadcastToNetwork, FDTEntry, ForwardedNPDU, \
     OriginalBroadcastNPDU, OriginalUnicastNPDU, \
@@ -126,7 +126,7 @@ class UDPMultiplexer:
             return
 
         # the PDU source is a tuple, convert it to an Address instance
-        src = Address(pdu.pduSource)
+        src = intern_address(pdu.pduSource)
 
         # match the destination in case the stack needs it
         if client is self.direct:
@@ -269,6 +269,10 @@ class AnnexJCodec(Client, Server):
     def confirmation(self, pdu):
         if _debug: AnnexJCodec._debug("confirmation %r", pdu)
 
+        # decode the upper layers from a view of the data
+        if isinstance(pdu.pduData, (bytes, bytearray)):
+            pdu.pduData = memoryview(pdu.pduData)
+
         # interpret as a BVLL PDU
         bvlpdu = BVLPDU()
         bvlpdu.decode(pdu)
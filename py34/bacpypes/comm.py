@@ -6,7 +6,7 @@ Communications Module
 
 import sys
 import struct
-from copy import copy as _copy
+from copy import copy as _copy, deepcopy as _deepcopy
 
 from .errors import DecodingError, ConfigurationError
 from .debugging import ModuleLogger, DebugContents, bacpypes_debugging, btox
@@ -35,6 +35,9 @@ element_map = {}
 @bacpypes_debugging
 class PCI(DebugContents):
 
+    # the attributes are in the slots or the dictionary of the PDU class
+    __slots__ = ()
+
     _debug_contents = ('pduUserData+', 'pduSource', 'pduDestination')
 
     def __init__(self, *args, **kwargs):
@@ -93,36 +96,214 @@ class PCI(DebugContents):
 
         return self.pci_contents(use_dict=use_dict, as_class=as_class)
 
+#
+#   PDUBuffer
+#
+#   An encoding buffer with a write cursor and room reserved in front of
+#   the data, so the headers of the lower layers can be prepended without
+#   copying the payload again.
+#
+
+@bacpypes_debugging
+class PDUBuffer(object):
+
+    def __init__(self, size=512, headroom=64):
+        if _debug: PDUBuffer._debug("__init__ size=%r headroom=%r", size, headroom)
+
+        self.buffer = bytearray(headroom + size)
+        self.start = headroom
+        self.end = headroom
+
+        # view of the contents, reset when they change
+        self.view = None
+
+    def __len__(self):
+        return self.end - self.start
+
+    def get_view(self):
+        """Return a view of the contents."""
+        if self.view is None:
+            self.view = memoryview(self.buffer)[self.start:self.end]
+        return self.view
+
+    def reserve(self, dlen):
+        """Make room for dlen more octets at the end.  Views that have been
+        handed out keep the old buffer so it is never resized in place."""
+        if self.end + dlen > len(self.buffer):
+            buffer = bytearray(max(2 * len(self.buffer), self.end + dlen))
+            buffer[self.start:self.end] = memoryview(self.buffer)[self.start:self.end]
+            self.buffer = buffer
+        self.view = None
+
+    def put(self, n):
+        self.reserve(1)
+        self.buffer[self.end] = n
+        self.end += 1
+
+    def put_data(self, data):
+        dlen = len(data)
+        self.reserve(dlen)
+        self.buffer[self.end:self.end + dlen] = data
+        self.end += dlen
+
+    def put_short(self, n):
+        self.reserve(2)
+        struct.pack_into('>H', self.buffer, self.end, n & _short_mask)
+        self.end += 2
+
+    def put_long(self, n):
+        self.reserve(4)
+        struct.pack_into('>L', self.buffer, self.end, n & _long_mask)
+        self.end += 4
+
+    def prepend(self, data):
+        """Put the data in front of the current contents."""
+        dlen = len(data)
+        if dlen > self.start:
+            headroom = dlen + self.start
+            buffer = bytearray(headroom + len(self.buffer) - self.start)
+            buffer[headroom:headroom + self.end - self.start] = memoryview(self.buffer)[self.start:self.end]
+            self.end += headroom - self.start
+            self.start = headroom
+            self.buffer = buffer
+
+        self.start -= dlen
+        self.buffer[self.start:self.start + dlen] = data
+        self.view = None
+
 #
 #   PDUData
 #
+#   When the data is a memoryview the PDU is in "decode mode", the octets
+#   are shared rather than copied and each get*() call advances the read
+#   offset of the view, which is cheaper than deleting octets from the
+#   front of a bytearray.  Any put*() call switches back to a bytearray.
+#
 
 @bacpypes_debugging
 class PDUData(object):
 
+    # pduBuffer is the encoding buffer when the data is a view of one
+    __slots__ = ('pduData', 'pduBuffer')
+
     def __init__(self, data=None, *args, **kwargs):
         if _debug: PDUData._debug("__init__ %r %r %r", data, args, kwargs)
 
         # this call will fail if there are args or kwargs, but not if there
         # is another class in the __mro__ of this thing being constructed
         super(PDUData, self).__init__(*args, **kwargs)
+        self.pduBuffer = None
 
         # function acts like a copy constructor
         if data is None:
             self.pduData = bytearray()
         elif isinstance(data, (bytes, bytearray)):
             self.pduData = bytearray(data)
+        elif isinstance(data, memoryview):
+            # decode mode, share the buffer
+            self.pduData = data
+        elif isinstance(data, PDUBuffer):
+            self.pduBuffer = data
+            self.pduData = data.get_view()
         elif isinstance(data, PDUData) or isinstance(data, PDU):
-            self.pduData = _copy(data.pduData)
+            if isinstance(data.pduData, memoryview):
+                self.pduData = data.pduData
+
+                # take over the encoding buffer
+                buff = data.get_buffer()
+                if buff is not None:
+                    data.pduBuffer = None
+                    self.pduBuffer = buff
+            else:
+                self.pduData = _copy(data.pduData)
         else:
-            raise TypeError("bytes or bytearray expected")
+            raise TypeError("bytes, bytearray, memoryview or PDUBuffer expected")
+
+    def get_buffer(self):
+        """Return the encoding buffer if the data is still a view of it."""
+        buff = self.pduBuffer
+        if buff is not None:
+            if self.pduData is buff.view:
+                return buff
+
+            # the data has been replaced
+            self.pduBuffer = None
+
+        return None
+
+    def __deepcopy__(self, memo):
+        """Deep copies have their own data, a view is copied into a bytearray
+        and the encoding buffer is not shared."""
+        rslt = self.__class__.__new__(self.__class__)
+        memo[id(self)] = rslt
+
+        for klass in self.__class__.__mro__:
+            for attr in klass.__dict__.get('__slots__', ()):
+                if attr in ('pduData', 'pduBuffer', '__dict__', '__weakref__'):
+                    continue
+                if hasattr(self, attr):
+                    setattr(rslt, attr, _deepcopy(getattr(self, attr), memo))
+        if hasattr(self, '__dict__'):
+            for attr, value in self.__dict__.items():
+                if attr in ('pduData', 'pduBuffer'):
+                    continue
+                setattr(rslt, attr, _deepcopy(value, memo))
+
+        rslt.pduData = bytearray(self.pduData)
+        rslt.pduBuffer = None
+
+        return rslt
+
+    def __getstate__(self):
+        """Pickled data is a copy of the view, the encoding buffer is
+        not included."""
+        state = {}
+        for klass in self.__class__.__mro__:
+            for attr in klass.__dict__.get('__slots__', ()):
+                if attr in ('__dict__', '__weakref__'):
+                    continue
+                if hasattr(self, attr):
+                    state[attr] = getattr(self, attr)
+        if hasattr(self, '__dict__'):
+            state.update(self.__dict__)
+
+        state['pduData'] = bytearray(self.pduData)
+        state['pduBuffer'] = None
+
+        return state
+
+    def __setstate__(self, state):
+        for attr, value in state.items():
+            setattr(self, attr, value)
+
+    def use_buffer(self, size=512, headroom=64):
+        """Continue encoding into a buffer with room for the headers of the
+        lower layers, the current contents are copied into it."""
+        if _debug: PDUData._debug("use_buffer size=%r headroom=%r", size, headroom)
+
+        buff = PDUBuffer(max(size, len(self.pduData)), headroom)
+        buff.put_data(self.pduData)
+
+        self.pduBuffer = buff
+        self.pduData = buff.get_view()
+
+    def _put_buffer(self):
+        """Return the encoding buffer or make sure the data is a bytearray."""
+        buff = self.get_buffer()
+        if (buff is None) and isinstance(self.pduData, memoryview):
+            self.pduData = bytearray(self.pduData)
+
+        return buff
 
     def get(self):
         if len(self.pduData) == 0:
             raise DecodingError("no more packet data")
 
         octet = self.pduData[0]
-        del self.pduData[0]
+        if isinstance(self.pduData, memoryview):
+            self.pduData = self.pduData[1:]
+        else:
+            del self.pduData[0]
 
         return octet
 
@@ -130,8 +311,12 @@ class PDUData(object):
         if len(self.pduData) < dlen:
             raise DecodingError("no more packet data")
 
+        # in decode mode this is a slice of the view, not a copy
         data = self.pduData[:dlen]
-        del self.pduData[:dlen]
+        if isinstance(self.pduData, memoryview):
+            self.pduData = self.pduData[dlen:]
+        else:
+            del self.pduData[:dlen]
 
         return data
 
@@ -142,30 +327,66 @@ class PDUData(object):
         return struct.unpack('>L',self.get_data(4))[0]
 
     def put(self, n):
-        # pduData is a bytearray
-        self.pduData += bytes([n])
+        buff = self._put_buffer()
+        if buff is not None:
+            buff.put(n)
+            self.pduData = buff.get_view()
+        else:
+            # pduData is a bytearray
+            self.pduData += bytes([n])
 
     def put_data(self, data):
         if isinstance(data, bytes):
             pass
-        elif isinstance(data, bytearray):
+        elif isinstance(data, (bytearray, memoryview)):
             pass
         elif isinstance(data, list):
             data = bytes(data)
         else:
-            raise TypeError("data must be bytes, bytearray, or a list")
+            raise TypeError("data must be bytes, bytearray, memoryview, or a list")
 
-        # regular append works
-        self.pduData += data
+        buff = self._put_buffer()
+        if buff is not None:
+            buff.put_data(data)
+            self.pduData = buff.get_view()
+        else:
+            # regular append works
+            self.pduData += data
 
     def put_short(self, n):
-        self.pduData += struct.pack('>H',n & _short_mask)
+        buff = self._put_buffer()
+        if buff is not None:
+            buff.put_short(n)
+            self.pduData = buff.get_view()
+        else:
+            self.pduData += struct.pack('>H',n & _short_mask)
 
     def put_long(self, n):
-        self.pduData += struct.pack('>L',n & _long_mask)
+        buff = self._put_buffer()
+        if buff is not None:
+            buff.put_long(n)
+            self.pduData = buff.get_view()
+        else:
+            self.pduData += struct.pack('>L',n & _long_mask)
+
+    def put_pdu_data(self, pdu):
+        """Append the data of another PDU.  When that PDU has an encoding
+        buffer the contents of this one are prepended to it and the buffer
+        is taken over, so the data is not copied."""
+        buff = pdu.get_buffer()
+        if (buff is None) or (self.get_buffer() is not None):
+            self.put_data(pdu.pduData)
+            return
+
+        # take over the buffer
+        pdu.pduBuffer = None
+        buff.prepend(self.pduData)
+
+        self.pduBuffer = buff
+        self.pduData = buff.get_view()
 
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
-        if isinstance(self.pduData, bytearray):
+        if isinstance(self.pduData, (bytearray, memoryview)):
             if len(self.pduData) > 20:
                 hexed = btox(self.pduData[:20],'.') + "..."
             else:
@@ -185,7 +406,7 @@ class PDUData(object):
         # add the data if it is not None
         v = self.pduData
         if v is not None:
-            if isinstance(v, bytearray):
+            if isinstance(v, (bytearray, memoryview)):
                 v = btox(v)
             elif hasattr(v, 'dict_contents'):
                 v = v.dict_contents(as_class=as_class)
@@ -207,6 +428,8 @@ class PDUData(object):
 @bacpypes_debugging
 class PDU(PCI, PDUData):
 
+    __slots__ = ('pduUserData', 'pduSource', 'pduDestination')
+
     def __init__(self, data=None, **kwargs):
         if _debug: PDU._debug("__init__ %r %r", data, kwargs)
 
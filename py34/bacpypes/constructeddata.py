@@ -11,7 +11,7 @@ from .errors import DecodingError, \
 from .debugging import ModuleLogger, bacpypes_debugging
 
 from .primitivedata import Atomic, ClosingTag, OpeningTag, Tag, TagList, \
-    Unsigned
+    TagReader, Unsigned
 
 # some debugging
 _debug = 0
@@ -40,6 +40,280 @@ class Element:
 
         return '<' + desc + ' instance at 0x%08x' % (id(self),) + '>'
 
+#
+#   Element Codecs
+#
+#   The kind of each element (a SequenceOf, an atomic value, any atomic value
+#   or some other structure) depends only on the class, so rather than
+#   figuring it out for every element of every encode and decode, the kinds
+#   are resolved once and a specialized function is built for each element.
+#
+
+_sequence_of_kind = 1
+_atomic_kind = 2
+_any_atomic_kind = 3
+_structure_kind = 4
+
+# returned by choice decoders when the tag is not for the element
+_no_choice = object()
+
+def _element_kind(element):
+    """Return the kind of element."""
+    global _sequence_of_classes
+
+    if element.klass in _sequence_of_classes:
+        return _sequence_of_kind
+    elif issubclass(element.klass, Atomic):
+        return _atomic_kind
+    elif issubclass(element.klass, AnyAtomic):
+        return _any_atomic_kind
+    else:
+        return _structure_kind
+
+def _element_encoder(element, kind):
+    """Return a function that encodes a value of the element into a tag list."""
+    name, klass, context = element.name, element.klass, element.context
+
+    if kind == _sequence_of_kind:
+        def encode(value, taglist):
+            # might need to encode an opening tag
+            if context is not None:
+                taglist.append(OpeningTag(context))
+
+            # a helper encodes the list
+            klass(value).encode(taglist)
+
+            # might need to encode a closing tag
+            if context is not None:
+                taglist.append(ClosingTag(context))
+
+    elif kind in (_atomic_kind, _any_atomic_kind):
+        def encode(value, taglist):
+            # a helper cooperates between the atomic value and the tag
+            helper = klass(value)
+
+            # build a tag and encode the data into it
+            tag = Tag()
+            helper.encode(tag)
+
+            # convert it to context encoding iff necessary
+            if context is not None:
+                tag = tag.app_to_context(context)
+
+            # now append the tag
+            taglist.append(tag)
+
+    else:
+        def encode(value, taglist):
+            if not isinstance(value, klass):
+                raise TypeError("%s must be of type %s" % (name, klass.__name__))
+
+            # might need to encode an opening tag
+            if context is not None:
+                taglist.append(OpeningTag(context))
+
+            # encode the value
+            value.encode(taglist)
+
+            # might need to encode a closing tag
+            if context is not None:
+                taglist.append(ClosingTag(context))
+
+    return encode
+
+def _sequence_element_decoder(element, kind):
+    """Return a function that decodes the value of a sequence element from a
+    tag list, the tag is the one at the front of the list."""
+    name, klass, context, optional = element.name, element.klass, element.context, element.optional
+
+    if kind == _sequence_of_kind:
+        def decode(taglist, tag):
+            # check for context encoding
+            if context is not None:
+                if tag.tagClass != Tag.openingTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise MissingRequiredParameter("%s expected opening tag %d" % (name, context))
+
+                    # omitted optional element
+                    return []
+                taglist.Pop()
+
+            # a helper cooperates between the atomic value and the tag
+            helper = klass()
+            helper.decode(taglist)
+
+            # check for context closing tag
+            if context is not None:
+                tag = taglist.Pop()
+                if tag.tagClass != Tag.closingTagClass or tag.tagNumber != context:
+                    raise InvalidTag("%s expected closing tag %d" % (name, context))
+
+            return helper.value
+
+    elif kind in (_atomic_kind, _any_atomic_kind):
+        def decode(taglist, tag):
+            # convert it to application encoding
+            if context is not None:
+                if tag.tagClass != Tag.contextTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise InvalidTag("%s expected context tag %d" % (name, context))
+                    return None
+                tag = tag.context_to_app(klass._app_tag)
+            elif kind == _atomic_kind:
+                if tag.tagClass != Tag.applicationTagClass or tag.tagNumber != klass._app_tag:
+                    if not optional:
+                        raise InvalidParameterDatatype("%s expected application tag %s" % (name, Tag._app_tag_name[klass._app_tag]))
+                    return None
+            else:
+                if tag.tagClass != Tag.applicationTagClass:
+                    if not optional:
+                        raise InvalidParameterDatatype("%s expected application tag" % (name,))
+                    return None
+
+            # consume the tag
+            taglist.Pop()
+
+            # a helper cooperates between the atomic value and the tag
+            return klass(tag).value
+
+    else:
+        def decode(taglist, tag):
+            if context is not None:
+                if tag.tagClass != Tag.openingTagClass or tag.tagNumber != context:
+                    if not optional:
+                        raise InvalidTag("%s expected opening tag %d" % (name, context))
+                    return None
+                taglist.Pop()
+
+            try:
+                # mark the tag list in case the structure manages to decode
+                # some content but not all of it.  This is not supposed to
+                # happen if the ASN.1 has been formed correctly.
+                mark = taglist.mark()
+
+                # build a value and decode it
+                value = klass()
+                value.decode(taglist)
+            except DecodingError:
+                # if the context tag was matched, the substructure has to be decoded
+                # correctly.
+                if context is None and optional:
+                    # go back to the mark, omitted optional element
+                    taglist.restore(mark)
+                    value = None
+                else:
+                    raise
+
+            if context is not None:
+                tag = taglist.Pop()
+                if (not tag) or tag.tagClass != Tag.closingTagClass or tag.tagNumber != context:
+                    raise InvalidTag("%s expected closing tag %d" % (name, context))
+
+            return value
+
+    return decode
+
+def _choice_element_decoder(element, kind):
+    """Return a function that decodes the value of a choice element from a
+    tag list, or returns _no_choice if the tag is not for this element."""
+    name, klass, context = element.name, element.klass, element.context
+
+    if kind == _sequence_of_kind:
+        def decode(taglist, tag):
+            # check for context encoding
+            if context is None:
+                raise NotImplementedError("choice of a SequenceOf must be context encoded")
+            # match the context tag number
+            if tag.tagClass != Tag.contextTagClass or tag.tagNumber != context:
+                return _no_choice
+            taglist.Pop()
+
+            # a helper cooperates between the atomic value and the tag
+            helper = klass()
+            helper.decode(taglist)
+
+            # check for context closing tag
+            tag = taglist.Pop()
+            if tag.tagClass != Tag.closingTagClass or tag.tagNumber != context:
+                raise InvalidTag("%s expected closing tag %d" % (name, context))
+
+            return helper.value
+
+    elif kind in (_atomic_kind, _any_atomic_kind):
+        def decode(taglist, tag):
+            # convert it to application encoding
+            if context is not None:
+                if tag.tagClass != Tag.contextTagClass or tag.tagNumber != context:
+                    return _no_choice
+                tag = tag.context_to_app(klass._app_tag)
+            else:
+                if tag.tagClass != Tag.applicationTagClass or tag.tagNumber != klass._app_tag:
+                    return _no_choice
+
+            # consume the tag
+            taglist.Pop()
+
+            # a helper cooperates between the atomic value and the tag
+            return klass(tag).value
+
+    else:
+        def decode(taglist, tag):
+            # check for context encoding
+            if context is None:
+                raise NotImplementedError("choice of non-atomic data must be context encoded")
+            if tag.tagClass != Tag.openingTagClass or tag.tagNumber != context:
+                return _no_choice
+            taglist.Pop()
+
+            # build a value and decode it
+            value = klass()
+            value.decode(taglist)
+
+            # check for the correct closing tag
+            tag = taglist.Pop()
+            if tag.tagClass != Tag.closingTagClass or tag.tagNumber != context:
+                raise DecodingError("'%s' expected closing tag %d" % (name, context))
+
+            return value
+
+    return decode
+
+_sequence_codecs = {}
+
+def _sequence_codec(klass):
+    """Return the list of (element, kind, encoder, decoder) tuples for the
+    sequenceElements of a Sequence class, building it the first time."""
+    codec = _sequence_codecs.get(klass)
+    if codec is None:
+        codec = []
+        for element in klass.sequenceElements:
+            kind = _element_kind(element)
+            codec.append((element, kind,
+                _element_encoder(element, kind),
+                _sequence_element_decoder(element, kind),
+                ))
+        _sequence_codecs[klass] = codec
+
+    return codec
+
+_choice_codecs = {}
+
+def _choice_codec(klass):
+    """Return the list of (element, kind, encoder, decoder) tuples for the
+    choiceElements of a Choice class, building it the first time."""
+    codec = _choice_codecs.get(klass)
+    if codec is None:
+        codec = []
+        for element in klass.choiceElements:
+            kind = _element_kind(element)
+            codec.append((element, kind,
+                _element_encoder(element, kind),
+                _choice_element_decoder(element, kind),
+                ))
+        _choice_codecs[klass] = codec
+
+    return codec
+
 #
 #   Sequence
 #
@@ -78,60 +352,20 @@ class Sequence(object):
         """
         """
         if _debug: Sequence._debug("encode %r", taglist)
-        global _sequence_of_classes
 
         # make sure we're dealing with a tag list
         if not isinstance(taglist, TagList):
             raise TypeError("TagList expected")
 
-        for element in self.sequenceElements:
+        for element, kind, encoder, decoder in _sequence_codec(self.__class__):
             value = getattr(self, element.name, None)
-            if element.optional and value is None:
-                continue
-            if not element.optional and value is None:
+            if value is None:
+                if element.optional:
+                    continue
                 raise MissingRequiredParameter("%s is a missing required element of %s" % (element.name, self.__class__.__name__))
-            if element.klass in _sequence_of_classes:
-                # might need to encode an opening tag
-                if element.context is not None:
-                    taglist.append(OpeningTag(element.context))
-
-                if _debug: Sequence._debug("    - build sequence helper: %r %r", element.klass, value)
-                helper = element.klass(value)
-
-                # encode the value
-                helper.encode(taglist)
-
-                # might need to encode a closing tag
-                if element.context is not None:
-                    taglist.append(ClosingTag(element.context))
-            elif issubclass(element.klass, (Atomic, AnyAtomic)):
-                # a helper cooperates between the atomic value and the tag
-                if _debug: Sequence._debug("    - build helper: %r %r", element.klass, value)
-                helper = element.klass(value)
-
-                # build a tag and encode the data into it
-                tag = Tag()
-                helper.encode(tag)
 
-                # convert it to context encoding iff necessary
-                if element.context is not None:
-                    tag = tag.app_to_context(element.context)
-
-                # now append the tag
-                taglist.append(tag)
-            elif isinstance(value, element.klass):
-                # might need to encode an opening tag
-                if element.context is not None:
-                    taglist.append(OpeningTag(element.context))
-
-                # encode the value
-                value.encode(taglist)
-
-                # might need to encode a closing tag
-                if element.context is not None:
-                    taglist.append(ClosingTag(element.context))
-            else:
-                raise TypeError("%s must be of type %s" % (element.name, element.klass.__name__))
+            if _debug: Sequence._debug("    - encode %s: %r", element.name, value)
+            encoder(value, taglist)
 
     def decode(self, taglist):
         if _debug: Sequence._debug("decode %r", taglist)
@@ -140,7 +374,11 @@ class Sequence(object):
         if not isinstance(taglist, TagList):
             raise TypeError("TagList expected")
 
-        for element in self.sequenceElements:
+        self._decode_elements(_sequence_codec(self.__class__), taglist)
+
+    def _decode_elements(self, codec, taglist):
+        """Decode the elements in the codec from the tag list."""
+        for element, kind, encoder, decoder in codec:
             tag = taglist.Peek()
 
             # no more elements
@@ -148,7 +386,7 @@ class Sequence(object):
                 if element.optional:
                     # omitted optional element
                     setattr(self, element.name, None)
-                elif element.klass in _sequence_of_classes:
+                elif kind == _sequence_of_kind:
                     # empty list
                     setattr(self, element.name, [])
                 else:
@@ -162,127 +400,105 @@ class Sequence(object):
                 # omitted optional element
                 setattr(self, element.name, None)
 
-            # check for a sequence element
-            elif element.klass in _sequence_of_classes:
-                # check for context encoding
-                if element.context is not None:
-                    if tag.tagClass != Tag.openingTagClass or tag.tagNumber != element.context:
-                        if not element.optional:
-                            raise MissingRequiredParameter("%s expected opening tag %d" % (element.name, element.context))
-                        else:
-                            # omitted optional element
-                            setattr(self, element.name, [])
-                            continue
-                    taglist.Pop()
-
-                # a helper cooperates between the atomic value and the tag
-                helper = element.klass()
-                helper.decode(taglist)
-
-                # now save the value
-                setattr(self, element.name, helper.value)
-
-                # check for context closing tag
-                if element.context is not None:
-                    tag = taglist.Pop()
-                    if tag.tagClass != Tag.closingTagClass or tag.tagNumber != element.context:
-                        raise InvalidTag("%s expected closing tag %d" % (element.name, element.context))
+            # let the element decode itself
+            else:
+                setattr(self, element.name, decoder(taglist, tag))
+
+    def decode_reader(self, reader, lazy=False):
+        """Decode the elements from a TagReader.  The tag headers are checked
+        without building Tag objects, a Tag is only built for an atomic value
+        that is decoded and a context encoded sequence is decoded from the
+        same reader.  When lazy is set, which is only for a LazySequence,
+        the elements are only found in the encoded data, each one is decoded
+        the first time its attribute is read so errors in its content are
+        raised then.
+
+        When an element cannot be found from the tag headers alone, for
+        example a structure that is not context encoded, the tags up to the
+        end of the sequence are read into a TagList and it and the ones that
+        follow it are decoded from that.  Return the TagList of the tags that
+        are left over."""
+        if _debug: Sequence._debug("decode_reader %r lazy=%r", reader, lazy)
+
+        codec = _sequence_codec(self.__class__)
+        if lazy:
+            self._lazy_elements = lazy_elements = {}
+
+        for i, (element, kind, encoder, decoder) in enumerate(codec):
+            header = reader.peek()
+
+            # no more elements or enclosed in a context
+            if (header is None) or (header[0] == Tag.closingTagClass):
+                break
+            tagClass, tagNumber = header[0], header[1]
+            klass, context = element.klass, element.context
 
-            # check for an atomic element
-            elif issubclass(element.klass, Atomic):
-                # convert it to application encoding
-                if element.context is not None:
-                    if tag.tagClass != Tag.contextTagClass or tag.tagNumber != element.context:
-                        if not element.optional:
-                            raise InvalidTag("%s expected context tag %d" % (element.name, element.context))
-                        else:
-                            setattr(self, element.name, None)
-                            continue
-                    tag = tag.context_to_app(element.klass._app_tag)
+            if context is not None:
+                if kind in (_atomic_kind, _any_atomic_kind):
+                    found = (tagClass == Tag.contextTagClass)
                 else:
-                    if tag.tagClass != Tag.applicationTagClass or tag.tagNumber != element.klass._app_tag:
-                        if not element.optional:
-                            raise InvalidParameterDatatype("%s expected application tag %s" % (element.name, Tag._app_tag_name[element.klass._app_tag]))
-                        else:
-                            setattr(self, element.name, None)
-                            continue
-
-                # consume the tag
-                taglist.Pop()
+                    found = (tagClass == Tag.openingTagClass)
+                if (not found) or (tagNumber != context):
+                    if not element.optional:
+                        break
 
-                # a helper cooperates between the atomic value and the tag
-                helper = element.klass(tag)
+                    # omitted optional element
+                    setattr(self, element.name, [] if kind == _sequence_of_kind else None)
+                    continue
 
-                # now save the value
-                setattr(self, element.name, helper.value)
+            elif kind == _atomic_kind:
+                if (tagClass != Tag.applicationTagClass) or (tagNumber != klass._app_tag):
+                    break
 
-            # check for an AnyAtomic element
-            elif issubclass(element.klass, AnyAtomic):
-                # convert it to application encoding
-                if element.context is not None:
-                    if tag.tagClass != Tag.contextTagClass or tag.tagNumber != element.context:
-                        if not element.optional:
-                            raise InvalidTag("%s expected context tag %d" % (element.name, element.context))
-                        else:
-                            setattr(self, element.name, None)
-                            continue
-                    tag = tag.context_to_app(element.klass._app_tag)
-                else:
-                    if tag.tagClass != Tag.applicationTagClass:
-                        if not element.optional:
-                            raise InvalidParameterDatatype("%s expected application tag" % (element.name,))
-                        else:
-                            setattr(self, element.name, None)
-                            continue
-
-                # consume the tag
-                taglist.Pop()
+            elif kind == _any_atomic_kind:
+                if tagClass != Tag.applicationTagClass:
+                    break
 
-                # a helper cooperates between the atomic value and the tag
-                helper = element.klass(tag)
+            else:
+                # the end cannot be found without decoding it
+                break
 
-                # now save the value
-                setattr(self, element.name, helper.value)
+            # save where it is for later
+            if lazy:
+                if _debug: Sequence._debug("    - lazy element: %s", element.name)
+                lazy_elements[element.name] = (decoder, reader.skip())
+                self.__dict__.pop(element.name, None)
+                continue
+
+            if kind in (_atomic_kind, _any_atomic_kind):
+                # build the one tag for the value
+                tag = reader.read()
+                if context is not None:
+                    tag = tag.context_to_app(klass._app_tag)
+                value = klass(tag).value
+
+            elif (kind == _structure_kind) and issubclass(klass, Sequence) \
+                    and (klass.decode is Sequence.decode):
+                # decode the sequence between the opening and closing tags
+                reader.advance()
+                value = klass()
+                if value.decode_reader(reader):
+                    raise InvalidTag("%s expected closing tag %d" % (element.name, context))
+
+                header = reader.peek()
+                if (header is None) or (header[0] != Tag.closingTagClass) or (header[1] != context):
+                    raise InvalidTag("%s expected closing tag %d" % (element.name, context))
+                reader.advance()
 
-            # some kind of structure
             else:
-                if element.context is not None:
-                    if tag.tagClass != Tag.openingTagClass or tag.tagNumber != element.context:
-                        if not element.optional:
-                            raise InvalidTag("%s expected opening tag %d" % (element.name, element.context))
-                        else:
-                            setattr(self, element.name, None)
-                            continue
-                    taglist.Pop()
+                # only the tags of this element are built
+                taglist = TagList(TagReader(reader.skip()))
+                value = decoder(taglist, taglist.Peek())
 
-                try:
-                    # make a backup of the tag list in case the structure manages to
-                    # decode some content but not all of it.  This is not supposed to
-                    # happen if the ASN.1 has been formed correctly.
-                    backup = taglist.tagList[:]
+            setattr(self, element.name, value)
+        else:
+            i = len(codec)
 
-                    # build a value and decode it
-                    value = element.klass()
-                    value.decode(taglist)
+        # decode the rest from the tags up to the end of the sequence
+        taglist = TagList(reader.read_tags())
+        self._decode_elements(codec[i:], taglist)
 
-                    # save the result
-                    setattr(self, element.name, value)
-                except DecodingError:
-                    # if the context tag was matched, the substructure has to be decoded
-                    # correctly.
-                    if element.context is None and element.optional:
-                        # omitted optional element
-                        setattr(self, element.name, None)
-
-                        # restore the backup
-                        taglist.tagList = backup
-                    else:
-                        raise
-
-                if element.context is not None:
-                    tag = taglist.Pop()
-                    if (not tag) or tag.tagClass != Tag.closingTagClass or tag.tagNumber != element.context:
-                        raise InvalidTag("%s expected closing tag %d" % (element.name, element.context))
+        return taglist
 
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
         global _sequence_of_classes
@@ -347,6 +563,42 @@ class Sequence(object):
         # return what we built/updated
         return use_dict
 
+#
+#   LazySequence
+#
+
+@bacpypes_debugging
+class LazySequence(Sequence):
+
+    """A mix-in class for a sequence that is decoded lazily, the elements
+    that decode_reader() finds are decoded the first time their attribute
+    is read.  An element that cannot be decoded raises a DecodingError
+    every time it is read."""
+
+    def __getattr__(self, attr):
+        # decode a lazy element the first time it is read
+        lazy_elements = self.__dict__.get('_lazy_elements')
+        if lazy_elements and (attr in lazy_elements):
+            if _debug: LazySequence._debug("__getattr__ %r", attr)
+            decoder, data = lazy_elements[attr]
+
+            # an AttributeError from the decoder would look like a missing
+            # attribute to getattr() with a default
+            try:
+                taglist = TagList(TagReader(data))
+                value = decoder(taglist, taglist.Peek())
+            except DecodingError:
+                raise
+            except Exception as err:
+                raise DecodingError("%s of %s: %s" % (attr, self.__class__.__name__, err))
+
+            del lazy_elements[attr]
+            setattr(self, attr, value)
+
+            return value
+
+        raise AttributeError(attr)
+
 #
 #   SequenceOf
 #
@@ -428,7 +680,7 @@ def SequenceOf(klass):
         def decode(self, taglist):
             if _debug: _SequenceOf._debug("(%r)decode %r", self.__class__.__name__, taglist)
 
-            while len(taglist) != 0:
+            while taglist:
                 tag = taglist.Peek()
                 if tag.tagClass == Tag.closingTagClass:
                     return
@@ -624,7 +876,7 @@ def ArrayOf(klass):
             # start with an empty array
             self.value = [0]
 
-            while len(taglist) != 0:
+            while taglist:
                 tag = taglist.Peek()
                 if tag.tagClass == Tag.closingTagClass:
                     break
@@ -794,42 +1046,14 @@ class Choice(object):
     def encode(self, taglist):
         if _debug: Choice._debug("(%r)encode %r", self.__class__.__name__, taglist)
 
-        for element in self.choiceElements:
+        for element, kind, encoder, decoder in _choice_codec(self.__class__):
             value = getattr(self, element.name, None)
             if value is None:
                 continue
 
-            if issubclass(element.klass, (Atomic, AnyAtomic)):
-                # a helper cooperates between the atomic value and the tag
-                helper = element.klass(value)
-
-                # build a tag and encode the data into it
-                tag = Tag()
-                helper.encode(tag)
-
-                # convert it to context encoding
-                if element.context is not None:
-                    tag = tag.app_to_context(element.context)
-
-                # now encode the tag
-                taglist.append(tag)
-                break
-
-            elif isinstance(value, element.klass):
-                # encode an opening tag
-                if element.context is not None:
-                    taglist.append(OpeningTag(element.context))
-
-                # encode the value
-                value.encode(taglist)
-
-                # encode a closing tag
-                if element.context is not None:
-                    taglist.append(ClosingTag(element.context))
-                break
-
-            else:
-                raise TypeError("%s must be a %s" % (element.name, element.klass.__name__))
+            # encode the first one found
+            encoder(value, taglist)
+            break
         else:
             raise AttributeError("missing choice of %s" % (self.__class__.__name__,))
 
@@ -843,93 +1067,21 @@ class Choice(object):
         if tag.tagClass == Tag.closingTagClass:
             raise AttributeError("missing choice of %s" % (self.__class__.__name__,))
 
-        # keep track of which one was found
-        foundElement = {}
-
         # figure out which choice it is
-        for element in self.choiceElements:
+        codec = _choice_codec(self.__class__)
+        for element, kind, encoder, decoder in codec:
             if _debug: Choice._debug("    - checking choice: %s", element.name)
 
-            # check for a sequence element
-            if element.klass in _sequence_of_classes:
-                # check for context encoding
-                if element.context is None:
-                    raise NotImplementedError("choice of a SequenceOf must be context encoded")
-                # match the context tag number
-                if tag.tagClass != Tag.contextTagClass or tag.tagNumber != element.context:
-                    continue
-                taglist.Pop()
-
-                # a helper cooperates between the atomic value and the tag
-                helper = element.klass()
-                helper.decode(taglist)
-
-                # now save the value
-                foundElement[element.name] = helper.value
-
-                # check for context closing tag
-                tag = taglist.Pop()
-                if tag.tagClass != Tag.closingTagClass or tag.tagNumber != element.context:
-                    raise InvalidTag("%s expected closing tag %d" % (element.name, element.context))
-
-                # done
-                if _debug: Choice._debug("    - found choice (sequence)")
-                break
-
-            # check for an atomic element
-            elif issubclass(element.klass, (Atomic, AnyAtomic)):
-                # convert it to application encoding
-                if element.context is not None:
-                    if tag.tagClass != Tag.contextTagClass or tag.tagNumber != element.context:
-                        continue
-                    tag = tag.context_to_app(element.klass._app_tag)
-                else:
-                    if tag.tagClass != Tag.applicationTagClass or tag.tagNumber != element.klass._app_tag:
-                        continue
-
-                # consume the tag
-                taglist.Pop()
-
-                # a helper cooperates between the atomic value and the tag
-                helper = element.klass(tag)
-
-                # now save the value
-                foundElement[element.name] = helper.value
-
-                # done
-                if _debug: Choice._debug("    - found choice (atomic)")
-                break
-
-            # some kind of structure
-            else:
-                # check for context encoding
-                if element.context is None:
-                    raise NotImplementedError("choice of non-atomic data must be context encoded")
-                if tag.tagClass != Tag.openingTagClass or tag.tagNumber != element.context:
-                    continue
-                taglist.Pop()
-
-                # build a value and decode it
-                value = element.klass()
-                value.decode(taglist)
-
-                # now save the value
-                foundElement[element.name] = value
-
-                # check for the correct closing tag
-                tag = taglist.Pop()
-                if tag.tagClass != Tag.closingTagClass or tag.tagNumber != element.context:
-                    raise DecodingError("'%s' expected closing tag %d" % (element.name, element.context))
-
-                # done
-                if _debug: Choice._debug("    - found choice (structure)")
+            value = decoder(taglist, tag)
+            if value is not _no_choice:
+                if _debug: Choice._debug("    - found choice")
                 break
         else:
             raise AttributeError("missing choice of %s" % (self.__class__.__name__,))
 
         # now save the value and None everywhere else
-        for element in self.choiceElements:
-            setattr(self, element.name, foundElement.get(element.name, None))
+        for other_element, kind, encoder, decoder in codec:
+            setattr(self, other_element.name, value if (other_element is element) else None)
 
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
         for element in self.choiceElements:
@@ -1001,7 +1153,7 @@ class Any:
         if _debug: Any._debug("decode %r", taglist)
 
         lvl = 0
-        while len(taglist) != 0:
+        while taglist:
             tag = taglist.Peek()
             if tag.tagClass == Tag.openingTagClass:
                 lvl += 1
@@ -1031,7 +1183,7 @@ class Any:
         else:
             element.encode(t)
 
-        self.tagList.extend(t.tagList)
+        self.tagList.extend(t)
 
     def cast_out(self, klass):
         """Interpret the content as a particular class."""
@@ -1042,15 +1194,16 @@ class Any:
             # build a sequence helper
             helper = klass()
 
-            # make a copy of the tag list
-            t = TagList(self.tagList[:])
-
-            # let it decode itself
-            helper.decode(t)
+            # let it decode itself, then go back to the start of the tag list
+            mark = self.tagList.mark()
+            try:
+                helper.decode(self.tagList)
 
-            # make sure everything was consumed
-            if len(t) != 0:
-                raise DecodingError("incomplete cast")
+                # make sure everything was consumed
+                if len(self.tagList) != 0:
+                    raise DecodingError("incomplete cast")
+            finally:
+                self.tagList.restore(mark)
 
             # return what was built
             return helper.value
@@ -1060,15 +1213,16 @@ class Any:
             # build a sequence helper
             helper = klass()
 
-            # make a copy of the tag list
-            t = TagList(self.tagList[:])
-
-            # let it decode itself
-            helper.decode(t)
+            # let it decode itself, then go back to the start of the tag list
+            mark = self.tagList.mark()
+            try:
+                helper.decode(self.tagList)
 
-            # make sure everything was consumed
-            if len(t) != 0:
-                raise DecodingError("incomplete cast")
+                # make sure everything was consumed
+                if len(self.tagList) != 0:
+                    raise DecodingError("incomplete cast")
+            finally:
+                self.tagList.restore(mark)
 
             # return what was built with Python list semantics
             return helper.value[1:]
@@ -1094,15 +1248,16 @@ class Any:
             # build an element
             value = klass()
 
-            # make a copy of the tag list
-            t = TagList(self.tagList[:])
-
-            # let it decode itself
-            value.decode(t)
+            # let it decode itself, then go back to the start of the tag list
+            mark = self.tagList.mark()
+            try:
+                value.decode(self.tagList)
 
-            # make sure everything was consumed
-            if len(t) != 0:
-                raise DecodingError("incomplete cast")
+                # make sure everything was consumed
+                if len(self.tagList) != 0:
+                    raise DecodingError("incomplete cast")
+            finally:
+                self.tagList.restore(mark)
 
             # return what was built
             return value
@@ -4,12 +4,24 @@
 Core
 """
 
+import os
 import sys
-import asyncore
 import signal
+import socket
 import time
 import traceback
 
+from errno import EALREADY, EINPROGRESS, EWOULDBLOCK, ECONNRESET, EINVAL, \
+    ENOTCONN, ESHUTDOWN, EISCONN, EBADF, ECONNABORTED, EPIPE, EAGAIN, \
+    errorcode
+
+# asyncore is gone from the standard library in Python 3.12, the stack can
+# still run on an asyncio event loop, see aiocore
+try:
+    import asyncore
+except ImportError:
+    asyncore = None
+
 from .task import TaskManager
 from .debugging import bacpypes_debugging, ModuleLogger
 
@@ -23,6 +35,12 @@ taskManager = None
 deferredFns = []
 sleeptime = 0.0
 
+# set when an asyncio event loop is running the stack, see aiocore
+asyncioTaskManager = None
+
+# file descriptor to dispatcher, shared with asyncore when it is available
+socket_map = asyncore.socket_map if asyncore else {}
+
 #
 #   run
 #
@@ -34,6 +52,9 @@ def run(spin=SPIN):
     if _debug: run._debug("run spin=%r", spin)
     global running, taskManager, deferredFns, sleeptime
 
+    if not asyncore:
+        raise RuntimeError("asyncore is not available, use aiocore.run()")
+
     # reference the task manager (a singleton)
     taskManager = TaskManager()
 
@@ -157,6 +178,11 @@ def stop(*args):
 
     running = False
 
+    # stop the asyncio event loop
+    if asyncioTaskManager:
+        if _debug: stop._debug("    - asyncio")
+        asyncioTaskManager.stop()
+
     # trigger the task manager event
     if taskManager and taskManager.trigger:
         if _debug: stop._debug("    - trigger")
@@ -218,6 +244,11 @@ def deferred(fn, *args, **kwargs):
 #           deferred._debug("    %s:%s" % (filename.split('/')[-1], lineno))
     global deferredFns, taskManager
 
+    # the asyncio event loop calls it
+    if asyncioTaskManager:
+        asyncioTaskManager.deferred(fn, args, kwargs)
+        return
+
     # append it to the list
     deferredFns.append((fn, args, kwargs))
 
@@ -226,6 +257,247 @@ def deferred(fn, *args, **kwargs):
 #       if _debug: deferred._debug("    - trigger")
         taskManager.trigger.set()
 
+#
+#   Dispatcher
+#
+
+_DISCONNECTED = frozenset({ECONNRESET, ENOTCONN, ESHUTDOWN, ECONNABORTED, EPIPE, EBADF})
+
+@bacpypes_debugging
+class Dispatcher:
+
+    """A wrapper around a non-blocking socket with the same interface as
+    asyncore.dispatcher.  It is watched by asyncore.loop() in run(), or by
+    the event loop when aiocore.setup() has been called.
+    """
+
+    connected = False
+    accepting = False
+    connecting = False
+    addr = None
+    socket = None
+    _fileno = None
+
+    def __init__(self, sock=None):
+        if _debug: Dispatcher._debug("__init__ %r", sock)
+
+        # a socket that is already connected, like one that was accepted
+        if sock:
+            sock.setblocking(False)
+            self.set_socket(sock)
+            self.connected = True
+
+            try:
+                self.addr = sock.getpeername()
+            except socket.error as err:
+                if err.errno in (ENOTCONN, EINVAL):
+                    self.connected = False
+                else:
+                    self.del_channel()
+                    raise
+
+    def add_channel(self):
+        """Start watching the socket."""
+        if _debug: Dispatcher._debug("add_channel")
+
+        if (not asyncore) and (not asyncioTaskManager):
+            raise RuntimeError("asyncore is not available, call aiocore.setup() first")
+
+        socket_map[self._fileno] = self
+        self.update_channel()
+
+    def del_channel(self):
+        """Stop watching the socket."""
+        if _debug: Dispatcher._debug("del_channel")
+
+        if socket_map.get(self._fileno) is self:
+            del socket_map[self._fileno]
+        self._fileno = None
+
+        self.update_channel()
+
+    def update_channel(self):
+        """Called when the dispatcher might have become readable or
+        writable.  The asyncio event loop only watches for what the
+        dispatcher wants to do, asyncore.loop() asks each time."""
+        if asyncioTaskManager:
+            asyncioTaskManager.sync_dispatchers()
+
+    def create_socket(self, family, type):
+        sock = socket.socket(family, type)
+        sock.setblocking(False)
+        self.set_socket(sock)
+
+    def set_socket(self, sock):
+        self.socket = sock
+        self._fileno = sock.fileno()
+        self.add_channel()
+
+    def set_reuse_addr(self):
+        self.socket.setsockopt(
+            socket.SOL_SOCKET, socket.SO_REUSEADDR,
+            self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR) | 1,
+            )
+
+    #----- what the dispatcher is waiting for
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    #----- socket methods
+
+    def listen(self, num):
+        self.accepting = True
+        if os.name == 'nt' and num > 5:
+            num = 5
+        return self.socket.listen(num)
+
+    def bind(self, addr):
+        self.addr = addr
+        return self.socket.bind(addr)
+
+    def connect(self, address):
+        self.connected = False
+        self.connecting = True
+
+        err = self.socket.connect_ex(address)
+        if err in (EINPROGRESS, EALREADY, EWOULDBLOCK) or (err == EINVAL and os.name == 'nt'):
+            self.addr = address
+            self.update_channel()
+            return
+
+        if err in (0, EISCONN):
+            self.addr = address
+            self.handle_connect_event()
+        else:
+            raise socket.error(err, errorcode[err])
+
+    def accept(self):
+        """Return a (socket, address) pair or None if there is nothing to
+        accept."""
+        try:
+            return self.socket.accept()
+        except TypeError:
+            return None
+        except socket.error as err:
+            if err.errno in (EWOULDBLOCK, ECONNABORTED, EAGAIN):
+                return None
+            raise
+
+    def send(self, data):
+        try:
+            return self.socket.send(data)
+        except socket.error as err:
+            if err.errno == EWOULDBLOCK:
+                return 0
+            elif err.errno in _DISCONNECTED:
+                self.handle_close()
+                return 0
+            raise
+
+    def recv(self, buffer_size):
+        try:
+            data = self.socket.recv(buffer_size)
+            if not data:
+                # a closed connection is indicated by signaling a read
+                # condition, and having recv() return 0
+                self.handle_close()
+                return b''
+            return data
+        except socket.error as err:
+            if err.errno in _DISCONNECTED:
+                self.handle_close()
+                return b''
+            raise
+
+    def close(self):
+        if _debug: Dispatcher._debug("close")
+
+        self.connected = False
+        self.accepting = False
+        self.connecting = False
+        self.del_channel()
+
+        if self.socket is not None:
+            try:
+                self.socket.close()
+            except socket.error as err:
+                if err.errno not in (ENOTCONN, EBADF):
+                    raise
+
+    #----- events from the loop
+
+    def handle_read_event(self):
+        if self.accepting:
+            # accepting sockets are never connected, they "spawn" new
+            # sockets that are connected
+            self.handle_accept()
+        elif not self.connected:
+            if self.connecting:
+                self.handle_connect_event()
+            self.handle_read()
+        else:
+            self.handle_read()
+
+    def handle_connect_event(self):
+        err = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err != 0:
+            raise socket.error(err, errorcode.get(err, err))
+
+        self.handle_connect()
+        self.connected = True
+        self.connecting = False
+
+    def handle_write_event(self):
+        if self.accepting:
+            # accepting sockets shouldn't get a write event
+            return
+
+        if not self.connected:
+            if self.connecting:
+                self.handle_connect_event()
+        self.handle_write()
+
+    def handle_expt_event(self):
+        # handle_expt_event() is called if there might be an error on the
+        # socket, or if there is OOB data
+        err = self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err != 0:
+            # we can get here when select.select() says that there is an
+            # exceptional condition on the socket
+            self.handle_close()
+        else:
+            self.handle_expt()
+
+    def handle_error(self):
+        """Called in an exception handler when an event could not be
+        handled, the dispatcher is closed."""
+        Dispatcher._exception("uncaptured python exception, closing %r", self)
+
+        self.handle_close()
+
+    def handle_expt(self):
+        Dispatcher._warning("unhandled incoming priority event")
+
+    def handle_read(self):
+        Dispatcher._warning("unhandled read event")
+
+    def handle_write(self):
+        Dispatcher._warning("unhandled write event")
+
+    def handle_connect(self):
+        Dispatcher._warning("unhandled connect event")
+
+    def handle_accept(self):
+        Dispatcher._warning("unhandled accept event")
+
+    def handle_close(self):
+        Dispatcher._warning("unhandled close event")
+        self.close()
+
 #
 #   enable_sleeping
 #
@@ -54,6 +54,21 @@ class ExecutionError(RuntimeError):
         self.args = (errorClass, errorCode)
 
 
+#
+#   IOCBError
+#
+
+class IOCBError(RuntimeError):
+
+    """This error is raised when an awaited IOCB is aborted with something
+    that is not an exception, like an Error, Reject or Abort APDU.
+    """
+
+    def __init__(self, ioError):
+        self.ioError = ioError
+        self.args = (ioError,)
+
+
 #
 #   Reject Exception Family
 #
@@ -9,10 +9,13 @@ import logging
 from time import time as _time
 
 import threading
+import asyncio
 from bisect import bisect_left
+from itertools import count
 
 from .debugging import bacpypes_debugging, ModuleLogger, DebugContents
 
+from .errors import IOCBError
 from .core import deferred
 from .task import FunctionTask
 from .comm import Client
@@ -63,12 +66,64 @@ TimeoutError = RuntimeError("timeout")
 # current time formatting (short version)
 _strftime = lambda: "%011.6f" % (_time() % 3600,)
 
+#
+#   _LazyEvent
+#
+
+_lazyEventLock = threading.Lock()
+
+class _LazyEvent(object):
+
+    """Works like a threading.Event but the event is only created when
+    something waits for it."""
+
+    __slots__ = ('_flag', '_event')
+
+    def __init__(self):
+        self._flag = False
+        self._event = None
+
+    def is_set(self):
+        return self._flag
+
+    isSet = is_set
+
+    def set(self):
+        self._flag = True
+
+        # wake up the waiters
+        event = self._event
+        if event:
+            event.set()
+
+    def clear(self):
+        self._flag = False
+
+        event = self._event
+        if event:
+            event.clear()
+
+    def wait(self, timeout=None):
+        if self._flag:
+            return True
+
+        with _lazyEventLock:
+            if self._event is None:
+                self._event = threading.Event()
+        event = self._event
+
+        # it might have been set before there was an event to set
+        if self._flag:
+            event.set()
+
+        return event.wait(timeout)
+
 #
 #   IOCB - Input Output Control Block
 #
 
-_identNext = 1
-_identLock = threading.Lock()
+# next() is atomic so the identities do not need a lock
+_identCounter = count(1)
 
 @bacpypes_debugging
 class IOCB(DebugContents):
@@ -80,18 +135,12 @@ class IOCB(DebugContents):
         , 'ioComplete', 'ioCallback+', 'ioQueue', 'ioPriority', 'ioTimeout'
         )
 
-    def __init__(self, *args, **kwargs):
-        global _identNext
-
-        # lock the identity sequence number
-        _identLock.acquire()
+    # the kind of completion event each block gets
+    completionEventClass = threading.Event
 
+    def __init__(self, *args, **kwargs):
         # generate a unique identity for this block
-        ioID = _identNext
-        _identNext += 1
-
-        # release the lock
-        _identLock.release()
+        ioID = next(_identCounter)
 
         # debugging postponed until ID acquired
         if _debug: IOCB._debug("__init__(%d) %r %r", ioID, args, kwargs)
@@ -112,8 +161,7 @@ class IOCB(DebugContents):
         self.ioController = None
 
         # each block gets a completion event
-        self.ioComplete = threading.Event()
-        self.ioComplete.clear()
+        self.ioComplete = self.completionEventClass()
 
         # applications can set a callback functions
         self.ioCallback = []
@@ -155,12 +203,12 @@ class IOCB(DebugContents):
         # if it's queued, remove it from its queue
         if self.ioQueue:
             if _debug: IOCB._debug("    - dequeue")
-            self.ioQueue.Remove(self)
+            self.ioQueue.remove(self)
 
         # if there's a timer, cancel it
         if self.ioTimeout:
             if _debug: IOCB._debug("    - cancel timeout")
-            self.ioTimeout.SuspendTask()
+            self.ioTimeout.suspend_task()
 
         # set the completion event
         self.ioComplete.set()
@@ -205,7 +253,7 @@ class IOCB(DebugContents):
         if self.ioTimeout:
             self.ioTimeout.suspend_task()
         else:
-            self.ioTimeout = FunctionTask(self.Abort, err)
+            self.ioTimeout = FunctionTask(self.abort, err)
 
         # (re)schedule it
         self.ioTimeout.install_task(_time() + delay)
@@ -219,6 +267,94 @@ class IOCB(DebugContents):
 
         return '<' + sname + desc + ' instance at 0x%08x' % (xid,) + '>'
 
+#
+#   LightweightIOCB
+#
+
+@bacpypes_debugging
+class LightweightIOCB(IOCB):
+
+    """An IOCB for applications that use callbacks, the completion event
+    is only created if something waits for it."""
+
+    completionEventClass = _LazyEvent
+
+#
+#   AwaitableIOCB
+#
+
+@bacpypes_debugging
+class AwaitableIOCB(LightweightIOCB):
+
+    """An IOCB that can be awaited by a coroutine, the result is the response
+    and an abort raises the error, or an IOCBError when the error is not an
+    exception like an Error, Reject or Abort APDU.  The future is completed
+    by a callback like any other IOCB so no threads are needed.  Coroutines
+    that are not called by the stack pass it along with deferred().
+    """
+
+    def __init__(self, *args, **kwargs):
+        if _debug: AwaitableIOCB._debug("__init__ %r %r", args, kwargs)
+        LightweightIOCB.__init__(self, *args, **kwargs)
+
+        self.ioFuture = None
+
+    def get_future(self, decode=None, loop=None):
+        """Return the future for the IOCB, the response is passed to the
+        decode function if there is one and the result is the value it
+        returns.  The future belongs to the running event loop unless a
+        loop is given."""
+        if _debug: AwaitableIOCB._debug("get_future(%d) decode=%r loop=%r", self.ioID, decode, loop)
+
+        if self.ioFuture is None:
+            if loop is None:
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    raise RuntimeError("no running event loop, pass the loop for the future")
+
+            self.ioFuture = asyncio.Future(loop=loop)
+            self.ioFuture.add_done_callback(self._future_done)
+
+            # the stack may be running in another thread
+            self.add_callback(lambda iocb: loop.call_soon_threadsafe(self._set_future, decode))
+
+        return self.ioFuture
+
+    def _set_future(self, decode):
+        if _debug: AwaitableIOCB._debug("_set_future(%d) %r", self.ioID, decode)
+
+        future = self.ioFuture
+        if future.done():
+            return
+
+        if self.ioState == ABORTED:
+            err = self.ioError
+            if not isinstance(err, BaseException):
+                err = IOCBError(err)
+            future.set_exception(err)
+        elif decode:
+            try:
+                future.set_result(decode(self.ioResponse))
+            except Exception as err:
+                future.set_exception(err)
+        else:
+            future.set_result(self.ioResponse)
+
+    def _future_done(self, future):
+        """When the caller gives up on the future, give up on the IOCB.  This
+        is called by the event loop which may not be running the stack, so
+        the abort is passed along with deferred()."""
+        if future.cancelled() and (self.ioState < COMPLETED):
+            if _debug: AwaitableIOCB._debug("    - cancelled(%d)", self.ioID)
+            deferred(self.abort, asyncio.CancelledError())
+
+    def __await__(self):
+        return iter(self.get_future())
+
+    # for 'yield from' in generator based coroutines
+    __iter__ = __await__
+
 #
 #   IOChainMixIn
 #
@@ -900,6 +1036,169 @@ class SieveQueue(IOQController):
         # send the request
         self.request_fn(iocb.args[0])
 
+#
+#   WindowQueue
+#
+
+@bacpypes_debugging
+class WindowQueue(IOController):
+
+    """
+    Like a SieveQueue, but with a window of requests that can be active at
+    the same time.  The window grows by one request for every window's worth
+    of completed requests up to the maximum size, and it is cut in half when
+    the handler reports congestion.
+    """
+
+    def __init__(self, request_fn, address=None, window_size=1, max_window_size=1):
+        if _debug: WindowQueue._debug("__init__ %r %r window_size=%r max_window_size=%r", request_fn, address, window_size, max_window_size)
+        IOController.__init__(self, str(address))
+
+        # save a reference to the request function
+        self.request_fn = request_fn
+        self.address = address
+
+        # the window may be fractional while it is growing
+        self.window_size = float(min(window_size, max_window_size))
+        self.max_window_size = max_window_size
+
+        # active requests in the order they were sent
+        self.active_iocbs = []
+
+        # create an IOQueue for iocb's requested when the window is full
+        self.ioQueue = IOQueue(str(address) + " queue")
+
+    def abort(self, err):
+        """Abort all pending requests."""
+        if _debug: WindowQueue._debug("abort %r", err)
+
+        while self.ioQueue.queue:
+            iocb = self.ioQueue.get()
+            if _debug: WindowQueue._debug("    - iocb: %r", iocb)
+
+            # change the state
+            iocb.ioState = ABORTED
+            iocb.ioError = err
+
+            # notify the client
+            iocb.trigger()
+
+    def request_io(self, iocb):
+        """Called by a client to start processing a request."""
+        if _debug: WindowQueue._debug("request_io %r", iocb)
+
+        # bind the iocb to this controller
+        iocb.ioController = self
+
+        # if the window is full, queue it
+        if len(self.active_iocbs) >= int(self.window_size):
+            if _debug: WindowQueue._debug("    - window full, request queued")
+
+            iocb.ioState = PENDING
+            self.ioQueue.put(iocb)
+            return
+
+        self._process(iocb)
+
+    def _process(self, iocb):
+        try:
+            # hopefully there won't be an error
+            err = None
+
+            # let derived class figure out how to process this
+            self.process_io(iocb)
+        except:
+            # extract the error
+            err = sys.exc_info()[1]
+
+        # if there was an error, abort the request
+        if err:
+            self.abort_io(iocb, err)
+
+    def process_io(self, iocb):
+        if _debug: WindowQueue._debug("process_io %r", iocb)
+
+        # this is now an active request
+        self.active_io(iocb)
+
+        # send the request
+        self.request_fn(iocb.args[0])
+
+    def active_io(self, iocb):
+        """Called by a handler to notify the controller that a request is
+        being processed."""
+        if _debug: WindowQueue._debug("active_io %r", iocb)
+
+        # base class work first, setting iocb state and timer data
+        IOController.active_io(self, iocb)
+
+        # keep track of the iocb
+        self.active_iocbs.append(iocb)
+
+    def complete_io(self, iocb, msg):
+        """Called by a handler to return data to the client."""
+        if _debug: WindowQueue._debug("complete_io %r %r", iocb, msg)
+
+        # check to see if it is completing an active one
+        if iocb not in self.active_iocbs:
+            raise RuntimeError("not an active iocb")
+
+        # normal completion
+        IOController.complete_io(self, iocb, msg)
+
+        # no longer active
+        self.active_iocbs.remove(iocb)
+
+        # a window's worth of successful requests opens it by one
+        if self.window_size < self.max_window_size:
+            self.window_size = min(self.window_size + 1.0 / self.window_size, self.max_window_size)
+            if _debug: WindowQueue._debug("    - window_size: %r", self.window_size)
+
+        # look for more to do
+        deferred(WindowQueue._trigger, self)
+
+    def abort_io(self, iocb, err):
+        """Called by a handler or a client to abort a transaction."""
+        if _debug: WindowQueue._debug("abort_io %r %r", iocb, err)
+
+        # it might still be waiting
+        if iocb.ioQueue is self.ioQueue:
+            if _debug: WindowQueue._debug("    - remove from queue")
+            self.ioQueue.remove(iocb)
+            iocb.ioQueue = None
+
+            IOController.abort_io(self, iocb, err)
+            return
+
+        # normal abort
+        IOController.abort_io(self, iocb, err)
+
+        # check to see if it is an active one
+        if iocb not in self.active_iocbs:
+            if _debug: WindowQueue._debug("    - not an active iocb")
+            return
+
+        # no longer active
+        self.active_iocbs.remove(iocb)
+
+        # look for more to do
+        deferred(WindowQueue._trigger, self)
+
+    def congestion(self):
+        """Called by a handler when a request has timed out or the server
+        is too busy, the window is cut in half."""
+        if _debug: WindowQueue._debug("congestion")
+
+        self.window_size = max(self.window_size / 2.0, 1.0)
+        if _debug: WindowQueue._debug("    - window_size: %r", self.window_size)
+
+    def _trigger(self):
+        """Called to launch the next requests in the queue."""
+        if _debug: WindowQueue._debug("_trigger")
+
+        while self.ioQueue.queue and (len(self.active_iocbs) < int(self.window_size)):
+            self._process(self.ioQueue.get())
+
 #
 #   SieveClientController
 #
@@ -12,7 +12,8 @@ from .errors import ConfigurationError
 from .comm import Client, Server, bind, \
     ServiceAccessPoint, ApplicationServiceElement
 
-from .pdu import Address, LocalBroadcast, LocalStation, PDU, RemoteStation
+from .pdu import Address, LocalBroadcast, PDU, RemoteStation, \
+    intern_address
 from .npdu import IAmRouterToNetwork, NPDU, WhoIsRouterToNetwork, npdu_types
 from .apdu import APDU as _APDU
 
@@ -412,7 +413,7 @@ class NetworkServiceAccessPoint(ServiceAccessPoint, Server, DebugContents):
                 if (len(self.adapters) > 1) and (adapter != self.localAdapter):
                     # combine the source address
                     if not npdu.npduSADR:
-                        apdu.pduSource = RemoteStation( adapter.adapterNet, npdu.pduSource.addrAddr )
+                        apdu.pduSource = intern_address(adapter.adapterNet, npdu.pduSource.addrAddr)
                     else:
                         apdu.pduSource = npdu.npduSADR
 
@@ -482,7 +483,7 @@ class NetworkServiceAccessPoint(ServiceAccessPoint, Server, DebugContents):
 
         # set the source address
         if not npdu.npduSADR:
-            newpdu.npduSADR = RemoteStation( adapter.adapterNet, npdu.pduSource.addrAddr )
+            newpdu.npduSADR = intern_address(adapter.adapterNet, npdu.pduSource.addrAddr)
         else:
             newpdu.npduSADR = npdu.npduSADR
 
@@ -506,7 +507,7 @@ class NetworkServiceAccessPoint(ServiceAccessPoint, Server, DebugContents):
                     if (npdu.npduDADR.addrType == Address.remoteBroadcastAddr):
                         newpdu.pduDestination = LocalBroadcast()
                     else:
-                        newpdu.pduDestination = LocalStation(npdu.npduDADR.addrAddr)
+                        newpdu.pduDestination = intern_address(npdu.npduDADR.addrAddr)
 
                     # last leg in routing
                     newpdu.npduDADR = None
@@ -7,8 +7,8 @@ NPDU
 from .errors import DecodingError
 from .debugging import ModuleLogger, DebugContents, bacpypes_debugging, btox
 
-from .pdu import Address, RemoteStation, RemoteBroadcast, GlobalBroadcast, \
-    PCI, PDUData
+from .pdu import Address, RemoteBroadcast, GlobalBroadcast, \
+    PCI, PDUData, intern_address
 
 # some debugging
 _debug = 0
@@ -27,6 +27,9 @@ def register_npdu_type(klass):
 @bacpypes_debugging
 class NPCI(PCI, DebugContents):
 
+    # the attributes are in the slots or the dictionary of the PDU class
+    __slots__ = ()
+
     _debug_contents = ('npduVersion', 'npduControl', 'npduDADR', 'npduSADR'
         , 'npduHopCount', 'npduNetMessage', 'npduVendorID'
         )
@@ -174,7 +177,7 @@ class NPCI(PCI, DebugContents):
             elif dlen == 0:
                 self.npduDADR = RemoteBroadcast(dnet)
             else:
-                self.npduDADR = RemoteStation(dnet, dadr)
+                self.npduDADR = intern_address(dnet, dadr)
 
         # extract the source address
         if snetPresent:
@@ -187,7 +190,7 @@ class NPCI(PCI, DebugContents):
             elif slen == 0:
                 raise DecodingError("SADR can't be a remote broadcast")
 
-            self.npduSADR = RemoteStation(snet, sadr)
+            self.npduSADR = intern_address(snet, sadr)
 
         # extract the hop count
         if dnetPresent:
@@ -257,12 +260,18 @@ class NPCI(PCI, DebugContents):
 @bacpypes_debugging
 class NPDU(NPCI, PDUData):
 
+    __slots__ = ('pduUserData', 'pduSource', 'pduDestination',
+        'pduExpectingReply', 'pduNetworkPriority',
+        'npduVersion', 'npduControl', 'npduDADR', 'npduSADR', 'npduHopCount',
+        'npduNetMessage', 'npduVendorID', '_xpdu',
+        )
+
     def __init__(self, *args, **kwargs):
         super(NPDU, self).__init__(*args, **kwargs)
 
     def encode(self, pdu):
         NPCI.encode(self, pdu)
-        pdu.put_data(self.pduData)
+        pdu.put_pdu_data(self)
 
     def decode(self, pdu):
         NPCI.decode(self, pdu)
@@ -317,6 +326,8 @@ def key_value_contents(use_dict=None, as_class=dict, key_values=()):
 
 class WhoIsRouterToNetwork(NPDU):
 
+    __slots__ = ('wirtnNetwork',)
+
     _debug_contents = ('wirtnNetwork',)
 
     messageType = 0x00
@@ -354,6 +365,8 @@ register_npdu_type(WhoIsRouterToNetwork)
 
 class IAmRouterToNetwork(NPDU):
 
+    __slots__ = ('iartnNetworkList',)
+
     _debug_contents = ('iartnNetworkList',)
 
     messageType = 0x01
@@ -390,6 +403,8 @@ register_npdu_type(IAmRouterToNetwork)
 
 class ICouldBeRouterToNetwork(NPDU):
 
+    __slots__ = ('icbrtnNetwork', 'icbrtnPerformanceIndex')
+
     _debug_contents = ('icbrtnNetwork','icbrtnPerformanceIndex')
 
     messageType = 0x02
@@ -427,6 +442,8 @@ register_npdu_type(ICouldBeRouterToNetwork)
 
 class RejectMessageToNetwork(NPDU):
 
+    __slots__ = ('rmtnRejectionReason', 'rmtnDNET')
+
     _debug_contents = ('rmtnRejectReason','rmtnDNET')
 
     messageType = 0x03
@@ -464,6 +481,8 @@ register_npdu_type(RejectMessageToNetwork)
 
 class RouterBusyToNetwork(NPDU):
 
+    __slots__ = ('rbtnNetworkList',)
+
     _debug_contents = ('rbtnNetworkList',)
 
     messageType = 0x04
@@ -500,6 +519,8 @@ register_npdu_type(RouterBusyToNetwork)
 
 class RouterAvailableToNetwork(NPDU):
 
+    __slots__ = ('ratnNetworkList',)
+
     _debug_contents = ('ratnNetworkList',)
 
     messageType = 0x05
@@ -562,6 +583,8 @@ class RoutingTableEntry(DebugContents):
 #
 
 class InitializeRoutingTable(NPDU):
+    __slots__ = ('irtTable',)
+
     messageType = 0x06
     _debug_contents = ('irtTable++',)
 
@@ -611,6 +634,8 @@ register_npdu_type(InitializeRoutingTable)
 #
 
 class InitializeRoutingTableAck(NPDU):
+    __slots__ = ('irtaTable',)
+
     messageType = 0x07
     _debug_contents = ('irtaTable++',)
 
@@ -661,6 +686,8 @@ register_npdu_type(InitializeRoutingTableAck)
 
 class EstablishConnectionToNetwork(NPDU):
 
+    __slots__ = ('ectnDNET', 'ectnTerminationTime')
+
     _debug_contents = ('ectnDNET', 'ectnTerminationTime')
 
     messageType = 0x08
@@ -698,6 +725,8 @@ register_npdu_type(EstablishConnectionToNetwork)
 
 class DisconnectConnectionToNetwork(NPDU):
 
+    __slots__ = ('dctnDNET',)
+
     _debug_contents = ('dctnDNET',)
 
     messageType = 0x09
@@ -731,6 +760,8 @@ register_npdu_type(DisconnectConnectionToNetwork)
 
 class WhatIsNetworkNumber(NPDU):
 
+    __slots__ = ()
+
     _debug_contents = ()
 
     messageType = 0x12
@@ -755,6 +786,8 @@ register_npdu_type(WhatIsNetworkNumber)
 
 class NetworkNumberIs(NPDU):
 
+    __slots__ = ('nniNET', 'nniFlag')
+
     _debug_contents = ('nniNET', 'nniFlag',)
 
     messageType = 0x13
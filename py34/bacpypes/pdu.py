@@ -8,6 +8,8 @@ import re
 import socket
 import struct
 
+from collections import OrderedDict
+
 from .debugging import ModuleLogger, bacpypes_debugging, btox, xtob
 from .comm import PCI as _PCI, PDUData
 
@@ -28,6 +30,12 @@ ethernet_re = re.compile(r'^([0-9A-Fa-f][0-9A-Fa-f][:]){5}([0-9A-Fa-f][0-9A-Fa-f
 
 @bacpypes_debugging
 class Address:
+
+    __slots__ = ('addrType', 'addrNet', 'addrLen', 'addrAddr',
+        'addrIP', 'addrMask', 'addrHost', 'addrSubnet', 'addrPort',
+        'addrTuple', 'addrBroadcastTuple',
+        )
+
     nullAddr = 0
     localBroadcastAddr = 1
     localStationAddr = 2
@@ -87,10 +95,11 @@ class Address:
             self.addrAddr = struct.pack('B', addr)
             self.addrLen = 1
 
-        elif isinstance(addr, (bytes, bytearray)):
-            if _debug: Address._debug("    - bytes or bytearray")
+        elif isinstance(addr, (bytes, bytearray, memoryview)):
+            if _debug: Address._debug("    - bytes, bytearray or memoryview")
 
-            self.addrAddr = bytes(addr)
+            addr = bytes(addr)
+            self.addrAddr = addr
             self.addrLen = len(addr)
 
             if self.addrLen == 6:
@@ -306,9 +315,13 @@ class Address:
         return hash( (self.addrType, self.addrNet, self.addrAddr) )
 
     def __eq__(self,arg):
+        # interned addresses are the same instance
+        if self is arg:
+            return True
+
         # try an coerce it into an address
         if not isinstance(arg, Address):
-            arg = Address(arg)
+            arg = intern_address(arg)
 
         # all of the components must match
         return (self.addrType == arg.addrType) and (self.addrNet == arg.addrNet) and (self.addrAddr == arg.addrAddr)
@@ -335,7 +348,7 @@ def pack_ip_addr(addr):
 
 def unpack_ip_addr(addr):
     """Given a six-octet BACnet address, return an IP address tuple."""
-    if isinstance(addr, bytearray):
+    if isinstance(addr, (bytearray, memoryview)):
         addr = bytes(addr)
     return (socket.inet_ntoa(addr[0:4]), struct.unpack('!H', addr[4:6])[0])
 
@@ -345,6 +358,8 @@ def unpack_ip_addr(addr):
 
 class LocalStation(Address):
 
+    __slots__ = ()
+
     def __init__(self, addr):
         self.addrType = Address.localStationAddr
         self.addrNet = None
@@ -356,14 +371,14 @@ class LocalStation(Address):
             self.addrAddr = struct.pack('B', addr)
             self.addrLen = 1
 
-        elif isinstance(addr, (bytes, bytearray)):
-            if _debug: Address._debug("    - bytes or bytearray")
+        elif isinstance(addr, (bytes, bytearray, memoryview)):
+            if _debug: Address._debug("    - bytes, bytearray or memoryview")
 
             self.addrAddr = bytes(addr)
             self.addrLen = len(addr)
 
         else:
-            raise TypeError("integer, bytes or bytearray required")
+            raise TypeError("integer, bytes, bytearray or memoryview required")
 
 #
 #   RemoteStation
@@ -371,6 +386,8 @@ class LocalStation(Address):
 
 class RemoteStation(Address):
 
+    __slots__ = ()
+
     def __init__(self, net, addr):
         if not isinstance(net, int):
             raise TypeError("integer network required")
@@ -387,14 +404,14 @@ class RemoteStation(Address):
             self.addrAddr = struct.pack('B', addr)
             self.addrLen = 1
 
-        elif isinstance(addr, (bytes, bytearray)):
-            if _debug: Address._debug("    - bytes or bytearray")
+        elif isinstance(addr, (bytes, bytearray, memoryview)):
+            if _debug: Address._debug("    - bytes, bytearray or memoryview")
 
             self.addrAddr = bytes(addr)
             self.addrLen = len(addr)
 
         else:
-            raise TypeError("integer, bytes or bytearray required")
+            raise TypeError("integer, bytes, bytearray or memoryview required")
 
 #
 #   LocalBroadcast
@@ -402,6 +419,8 @@ class RemoteStation(Address):
 
 class LocalBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self):
         self.addrType = Address.localBroadcastAddr
         self.addrNet = None
@@ -414,6 +433,8 @@ class LocalBroadcast(Address):
 
 class RemoteBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self, net):
         if not isinstance(net, int):
             raise TypeError("integer network required")
@@ -431,12 +452,115 @@ class RemoteBroadcast(Address):
 
 class GlobalBroadcast(Address):
 
+    __slots__ = ()
+
     def __init__(self):
         self.addrType = Address.globalBroadcastAddr
         self.addrNet = None
         self.addrAddr = None
         self.addrLen = None
 
+#
+#   InternedAddress
+#
+
+class InternedAddress(Address):
+
+    """An address that is shared and cannot be changed, these are built by
+    intern_address() from the attributes of another address."""
+
+    __slots__ = ()
+
+    def __init__(self, addr):
+        for attr in Address.__slots__:
+            if hasattr(addr, attr):
+                object.__setattr__(self, attr, getattr(addr, attr))
+
+    def __setattr__(self, attr, value):
+        raise TypeError("interned addresses are immutable")
+
+    def __delattr__(self, attr):
+        raise TypeError("interned addresses are immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # unpickled as a regular address
+        state = {}
+        for attr in Address.__slots__:
+            if hasattr(self, attr):
+                state[attr] = getattr(self, attr)
+        return (Address, (), (None, state))
+
+#
+#   intern_address
+#
+#   The parse cache maps the arguments that were given to the address they
+#   built, so the same arguments are not parsed again.  The intern table
+#   maps the (type, net, addr) of the address to the one shared instance so
+#   checking if two of them are equal is an identity check.  Both tables
+#   are bounded and the least recently used entries are dropped first.
+#
+
+_address_cache_size = 4096
+_address_parse_cache = OrderedDict()
+_address_intern_table = OrderedDict()
+
+def _address_cache_put(cache, key, value):
+    cache[key] = value
+    if len(cache) > _address_cache_size:
+        cache.popitem(last=False)
+
+@bacpypes_debugging
+def intern_address(*args):
+    """Return the shared immutable address built from the arguments, they
+    are the same as the arguments to Address() or an Address."""
+    if _debug: intern_address._debug("intern_address %r", args)
+
+    # an address is interned as it is
+    if (len(args) == 1) and isinstance(args[0], Address):
+        addr = args[0]
+        if isinstance(addr, InternedAddress):
+            return addr
+        key = None
+    else:
+        # the key has a copy of the octets, not a view of a buffer
+        key = args
+        for arg in args:
+            if isinstance(arg, (bytearray, memoryview)):
+                key = tuple(bytes(arg) if isinstance(arg, (bytearray, memoryview)) else arg for arg in args)
+                break
+
+        addr = _address_parse_cache.pop(key, None)
+        if addr is not None:
+            # most recently used goes at the end
+            _address_parse_cache[key] = addr
+            return addr
+
+        # parse it
+        addr = Address(*args)
+
+    # addresses with a subnet mask are not shared, the mask is not part of
+    # the address but it changes the broadcast tuple
+    if getattr(addr, 'addrMask', None) in (None, _long_mask):
+        ikey = (addr.addrType, addr.addrNet, addr.addrAddr)
+        interned_addr = _address_intern_table.pop(ikey, None)
+        if interned_addr is None:
+            interned_addr = InternedAddress(addr)
+        _address_cache_put(_address_intern_table, ikey, interned_addr)
+    else:
+        interned_addr = InternedAddress(addr)
+
+    # save it for the next time these arguments are given
+    if key is not None:
+        _address_cache_put(_address_parse_cache, key, interned_addr)
+
+    return interned_addr
+
 #
 #   PCI
 #
@@ -444,6 +568,9 @@ class GlobalBroadcast(Address):
 @bacpypes_debugging
 class PCI(_PCI):
 
+    # the attributes are in the slots or the dictionary of the PDU class
+    __slots__ = ()
+
     _debug_contents = ('pduExpectingReply', 'pduNetworkPriority')
 
     def __init__(self, *args, **kwargs):
@@ -507,6 +634,10 @@ class PCI(_PCI):
 @bacpypes_debugging
 class PDU(PCI, PDUData):
 
+    __slots__ = ('pduUserData', 'pduSource', 'pduDestination',
+        'pduExpectingReply', 'pduNetworkPriority',
+        )
+
     def __init__(self, *args, **kwargs):
         if _debug: PDU._debug("__init__ %r %r", args, kwargs)
         super(PDU, self).__init__(*args, **kwargs)
@@ -9,6 +9,13 @@ import struct
 import time
 import re
 
+from itertools import islice
+
+try:
+    from collections.abc import MutableSequence
+except ImportError:
+    from collections import MutableSequence
+
 from .debugging import ModuleLogger, btox
 
 from .errors import DecodingError, InvalidTag, InvalidParameterDatatype
@@ -24,6 +31,8 @@ _log = ModuleLogger(globals())
 
 class Tag(object):
 
+    __slots__ = ('tagClass', 'tagNumber', 'tagLVT', 'tagData')
+
     applicationTagClass     = 0
     contextTagClass         = 1
     openingTagClass         = 2
@@ -70,10 +79,10 @@ class Tag(object):
 
     def set(self, tclass, tnum, tlvt=0, tdata=b''):
         """set the values of the tag."""
-        if isinstance(tdata, bytearray):
+        if isinstance(tdata, (bytearray, memoryview)):
             tdata = bytes(tdata)
         elif not isinstance(tdata, bytes):
-            raise TypeError("tag data must be bytes or bytearray")
+            raise TypeError("tag data must be bytes, bytearray or memoryview")
 
         self.tagClass = tclass
         self.tagNumber = tnum
@@ -137,6 +146,11 @@ class Tag(object):
 
     def decode(self, pdu):
         """Decode a tag from the PDU."""
+        # decode mode walks the view with an offset
+        if isinstance(pdu.pduData, memoryview):
+            self.decode_view(pdu)
+            return
+
         try:
             tag = pdu.get()
 
@@ -173,6 +187,21 @@ class Tag(object):
         except DecodingError:
             raise InvalidTag("invalid tag encoding")
 
+    def decode_view(self, pdu):
+        """Decode a tag from a PDU in decode mode, the header octets are read
+        directly from the view and the PDU is advanced once."""
+        data = pdu.pduData
+        self.tagClass, self.tagNumber, self.tagLVT, start, end = decode_tag_header(data, 0)
+
+        # application tagged boolean has no more data
+        if start == end:
+            self.tagData = b''
+        else:
+            self.tagData = data[start:end].tobytes()
+
+        # advance past the tag
+        pdu.pduData = data[end:]
+
     def app_to_context(self, context):
         """Return a context encoded tag."""
         if self.tagClass != Tag.applicationTagClass:
@@ -270,6 +299,8 @@ class Tag(object):
 
 class ApplicationTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, *args):
         if len(args) == 1 and isinstance(args[0], PDUData):
             Tag.__init__(self, args[0])
@@ -287,6 +318,8 @@ class ApplicationTag(Tag):
 
 class ContextTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, *args):
         if len(args) == 1 and isinstance(args[0], PDUData):
             Tag.__init__(self, args[0])
@@ -304,6 +337,8 @@ class ContextTag(Tag):
 
 class OpeningTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, context):
         if isinstance(context, PDUData):
             Tag.__init__(self, context)
@@ -320,6 +355,8 @@ class OpeningTag(Tag):
 
 class ClosingTag(Tag):
 
+    __slots__ = ()
+
     def __init__(self, context):
         if isinstance(context, PDUData):
             Tag.__init__(self, context)
@@ -330,38 +367,367 @@ class ClosingTag(Tag):
         else:
             raise TypeError("ClosingTag ctor requires an integer or PDUData")
 
+#
+#   decode_tag_header
+#
+
+def decode_tag_header(data, offset):
+    """Decode the header of the tag starting at the offset in the data and
+    return a tuple (tagClass, tagNumber, tagLVT, start, end) where the tag
+    data is data[start:end] and the next tag starts at the end."""
+    try:
+        tag = data[offset]
+        offset += 1
+
+        # extract the type
+        tagClass = (tag >> 3) & 0x01
+
+        # extract the tag number
+        tagNumber = (tag >> 4)
+        if (tagNumber == 0x0F):
+            tagNumber = data[offset]
+            offset += 1
+
+        # extract the length
+        tagLVT = tag & 0x07
+        if (tagLVT == 5):
+            tagLVT = data[offset]
+            offset += 1
+            if (tagLVT == 254):
+                tagLVT = struct.unpack_from('>H', data, offset)[0]
+                offset += 2
+            elif (tagLVT == 255):
+                tagLVT = struct.unpack_from('>L', data, offset)[0]
+                offset += 4
+        elif (tagLVT == 6):
+            tagClass = Tag.openingTagClass
+            tagLVT = 0
+        elif (tagLVT == 7):
+            tagClass = Tag.closingTagClass
+            tagLVT = 0
+    except (IndexError, struct.error):
+        raise InvalidTag("invalid tag encoding")
+
+    # application tagged boolean has no more data, tagLVT contains value
+    if (tagClass == Tag.applicationTagClass) and (tagNumber == Tag.booleanAppTag):
+        return (tagClass, tagNumber, tagLVT, offset, offset)
+
+    # tagLVT contains length
+    if offset + tagLVT > len(data):
+        raise InvalidTag("invalid tag encoding")
+
+    return (tagClass, tagNumber, tagLVT, offset, offset + tagLVT)
+
+#
+#   TagReader
+#
+
+class TagReader(object):
+
+    """Read tags from encoded data without building a TagList.  The tag
+    headers can be looked at and tags (or whole opening/closing tag groups)
+    skipped without creating Tag objects or copying data, Tag objects are
+    only built when they are read."""
+
+    def __init__(self, data):
+        if not isinstance(data, memoryview):
+            data = memoryview(data)
+
+        self.data = data
+        self.offset = 0
+
+        # header of the tag at the offset
+        self._header = None
+
+    def __bool__(self):
+        return self.offset < len(self.data)
+
+    __nonzero__ = __bool__
+
+    def peek(self):
+        """Return the header (tagClass, tagNumber, tagLVT, start, end) of
+        the next tag, or None at the end of the data."""
+        if self._header is None:
+            if self.offset >= len(self.data):
+                return None
+            self._header = decode_tag_header(self.data, self.offset)
+
+        return self._header
+
+    def read(self):
+        """Return the next tag, or None at the end of the data."""
+        header = self._header
+        if header is None:
+            if self.offset >= len(self.data):
+                return None
+            header = decode_tag_header(self.data, self.offset)
+
+        tag = Tag()
+        tag.tagClass, tag.tagNumber, tag.tagLVT, start, end = header
+        if start == end:
+            tag.tagData = b''
+        else:
+            tag.tagData = self.data[start:end].tobytes()
+
+        # advance past it
+        self.offset = end
+        self._header = None
+
+        return tag
+
+    def advance(self):
+        """Move past the next tag without building it."""
+        header = self.peek()
+        if header is None:
+            raise InvalidTag("no more tags")
+
+        self.offset = header[4]
+        self._header = None
+
+    def read_tags(self):
+        """Read the tags up to the closing tag that ends the current group,
+        or to the end of the data, and return them in a list.  The closing
+        tag is not read."""
+        tags = []
+
+        lvl = 0
+        while True:
+            header = self.peek()
+            if header is None:
+                break
+
+            tagClass = header[0]
+            if tagClass == Tag.openingTagClass:
+                lvl += 1
+            elif tagClass == Tag.closingTagClass:
+                if lvl == 0:
+                    break
+                lvl -= 1
+
+            tags.append(self.read())
+
+        return tags
+
+    def skip(self):
+        """Skip the next tag, when it is an opening tag skip everything up
+        to and including the matching closing tag.  Return the view of the
+        encoded data that was skipped."""
+        start = self.offset
+
+        lvl = 0
+        while True:
+            header = self.peek()
+            if header is None:
+                raise InvalidTag("mismatched open/close tags")
+
+            tagClass = header[0]
+            if tagClass == Tag.openingTagClass:
+                lvl += 1
+            elif tagClass == Tag.closingTagClass:
+                lvl -= 1
+                if lvl < 0:
+                    raise InvalidTag("unexpected closing tag")
+
+            self.offset = header[4]
+            self._header = None
+
+            if lvl == 0:
+                break
+
+        return self.data[start:self.offset]
+
+    def __iter__(self):
+        """Generate the headers of the rest of the tags."""
+        while True:
+            header = self.peek()
+            if header is None:
+                break
+
+            self.offset = header[4]
+            self._header = None
+
+            yield header
+
+#
+#   TagListView
+#
+
+class TagListView(MutableSequence):
+
+    """The unread tags of a TagList as a list-like object.  Reading it goes
+    straight to the tags of the TagList, the list is not copied when some of
+    the tags have been read.  Changing it copies the unread tags first so
+    marks and the list given to the TagList are left alone."""
+
+    def __init__(self, taglist):
+        self._taglist = taglist
+
+    def _position(self, item):
+        """Return the position in the unread tags of an index."""
+        length = len(self._taglist)
+        if item < 0:
+            item += length
+        if not (0 <= item < length):
+            raise IndexError("list index out of range")
+
+        return item
+
+    def __len__(self):
+        return len(self._taglist)
+
+    def __iter__(self):
+        return iter(self._taglist)
+
+    def __getitem__(self, item):
+        return self._taglist[item]
+
+    def __setitem__(self, item, value):
+        if isinstance(item, slice):
+            self._taglist._detach()[item] = value
+        else:
+            position = self._position(item)
+            self._taglist._detach()[position] = value
+
+    def __delitem__(self, item):
+        if isinstance(item, slice):
+            del self._taglist._detach()[item]
+        else:
+            position = self._position(item)
+            del self._taglist._detach()[position]
+
+    def insert(self, item, value):
+        length = len(self._taglist)
+        if item < 0:
+            item = max(item + length, 0)
+        else:
+            item = min(item, length)
+
+        self._taglist._detach().insert(item, value)
+
+    def append(self, value):
+        self._taglist.append(value)
+
+    def extend(self, values):
+        self._taglist.extend(values)
+
+    def __eq__(self, other):
+        if isinstance(other, (TagListView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        rslt = self.__eq__(other)
+        if rslt is NotImplemented:
+            return rslt
+        return not rslt
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
 #
 #   TagList
 #
 
 class TagList(object):
 
+    """A list of tags that is consumed from the front.  The tags that have
+    been read are not removed, a read index is advanced instead, so Pop()
+    and push() do not move the rest of the list and mark() and restore()
+    can back up without copying it."""
+
     def __init__(self, arg=None):
-        self.tagList = []
+        self._tags = []
+        self._index = 0
 
         if isinstance(arg, list):
-            self.tagList = arg
+            self._tags = arg
         elif isinstance(arg, TagList):
-            self.tagList = arg.tagList[:]
+            self._tags = arg.tagList[:]
+        elif isinstance(arg, TagReader):
+            tag = arg.read()
+            while tag is not None:
+                self._tags.append(tag)
+                tag = arg.read()
         elif isinstance(arg, PDUData):
             self.decode(arg)
 
+    def _compact(self):
+        """Drop the tags that have been read and return the list of the
+        rest of them."""
+        if self._index:
+            # a new list so marks keep the old one
+            self._tags = self._tags[self._index:]
+            self._index = 0
+
+        return self._tags
+
+    def _detach(self):
+        """Copy the unread tags into a new list before it is changed in
+        place, marks and the list given to the constructor keep the old
+        one."""
+        self._tags = self._tags[self._index:]
+        self._index = 0
+
+        return self._tags
+
+    def _get_tag_list(self):
+        """Return the list of the unread tags."""
+        return self._compact()
+
+    def _set_tag_list(self, tag_list):
+        if not isinstance(tag_list, list):
+            tag_list = list(tag_list)
+        self._tags = tag_list
+        self._index = 0
+
+    tagList = property(_get_tag_list, _set_tag_list)
+
+    @property
+    def tagListView(self):
+        """Return a view of the unread tags that does not copy them."""
+        return TagListView(self)
+
     def append(self, tag):
-        self.tagList.append(tag)
+        self._tags.append(tag)
 
     def extend(self, taglist):
-        self.tagList.extend(taglist)
+        self._tags.extend(taglist)
 
     def __getitem__(self, item):
-        return self.tagList[item]
+        if isinstance(item, slice):
+            return self._tags[self._index:][item]
+        if item < 0:
+            if item < self._index - len(self._tags):
+                raise IndexError("list index out of range")
+            return self._tags[item]
+        return self._tags[self._index + item]
 
     def __len__(self):
-        return len(self.tagList)
+        return len(self._tags) - self._index
+
+    def __bool__(self):
+        return len(self._tags) > self._index
+
+    __nonzero__ = __bool__
+
+    def __iter__(self):
+        return islice(self._tags, self._index, None)
+
+    def mark(self):
+        """Return the current position to be given to restore()."""
+        return (self._tags, self._index)
+
+    def restore(self, mark):
+        """Go back to a position returned by mark(), the tags that have been
+        read since then are unread again."""
+        self._tags, self._index = mark
 
     def Peek(self):
         """Return the tag at the front of the list."""
-        if self.tagList:
-            tag = self.tagList[0]
+        if self._index < len(self._tags):
+            tag = self._tags[self._index]
         else:
             tag = None
 
@@ -369,13 +735,19 @@ class TagList(object):
 
     def push(self, tag):
         """Return a tag back to the front of the list."""
-        self.tagList = [tag] + self.tagList
+        if self._index and (self._tags[self._index - 1] is tag):
+            # the tag that was popped, back up over it
+            self._index -= 1
+        else:
+            # leave the list that may be shared alone
+            self._tags = [tag] + self._tags[self._index:]
+            self._index = 0
 
     def Pop(self):
         """Remove the tag from the front of the list and return it."""
-        if self.tagList:
-            tag = self.tagList[0]
-            del self.tagList[0]
+        if self._index < len(self._tags):
+            tag = self._tags[self._index]
+            self._index += 1
         else:
             tag = None
 
@@ -383,10 +755,11 @@ class TagList(object):
 
     def get_context(self, context):
         """Return a tag or a list of tags context encoded."""
+
         # forward pass
-        i = 0
-        while i < len(self.tagList):
-            tag = self.tagList[i]
+        i = self._index
+        while i < len(self._tags):
+            tag = self._tags[i]
 
             # skip application stuff
             if tag.tagClass == Tag.applicationTagClass:
@@ -403,8 +776,8 @@ class TagList(object):
                 rslt = []
                 i += 1
                 lvl = 0
-                while i < len(self.tagList):
-                    tag = self.tagList[i]
+                while i < len(self._tags):
+                    tag = self._tags[i]
                     if tag.tagClass == Tag.openingTagClass:
                         lvl += 1
                     elif tag.tagClass == Tag.closingTagClass:
@@ -432,16 +805,24 @@ class TagList(object):
 
     def encode(self, pdu):
         """encode the tag list into a PDU."""
-        for tag in self.tagList:
-            tag.encode(pdu)
+
+        buff = pdu.get_buffer()
+        if buff is not None:
+            # write the tags directly into the encoding buffer
+            for tag in islice(self._tags, self._index, None):
+                tag.encode(buff)
+            pdu.pduData = buff.get_view()
+        else:
+            for tag in islice(self._tags, self._index, None):
+                tag.encode(pdu)
 
     def decode(self, pdu):
         """decode the tags from a PDU."""
         while pdu.pduData:
-            self.tagList.append( Tag(pdu) )
+            self._tags.append( Tag(pdu) )
 
     def debug_contents(self, indent=1, file=sys.stdout, _ids=None):
-        for tag in self.tagList:
+        for tag in islice(self._tags, self._index, None):
             tag.debug_contents(indent+1, file, _ids)
 
 #
@@ -6,6 +6,7 @@ Task
 
 import sys
 
+from math import ceil, floor
 from time import time as _time
 from heapq import heapify, heappush, heappop
 
@@ -20,8 +21,13 @@ _log = ModuleLogger(globals())
 _task_manager = None
 _unscheduled_tasks = []
 
-# only defined for linux platforms
-if sys.platform in ('linux', 'darwin'):
+# only defined for linux platforms, and only needed by asyncore.loop()
+try:
+    import asyncore
+except ImportError:
+    asyncore = None
+
+if asyncore and sys.platform in ('linux', 'darwin'):
     from .event import WaitableEvent
     #
     #   _Trigger
@@ -50,10 +56,20 @@ class _Task(DebugContents, Logging):
 
     _debug_contents = ('taskTime', 'isScheduled')
 
+    # tasks are scheduled by the task manager unless this is a TimingWheel
+    timingWheel = None
+
     def __init__(self):
         self.taskTime = None
         self.isScheduled = False
 
+        # the (when, task) entry in the task manager heap
+        self._taskEntry = None
+
+        # the timing wheel slot and tick
+        self._wheelSlot = None
+        self._wheelTick = None
+
     def install_task(self, when=None, delta=None):
         global _task_manager, _unscheduled_tasks
 
@@ -74,6 +90,8 @@ class _Task(DebugContents, Logging):
         # pass along to the task manager
         if not _task_manager:
             _unscheduled_tasks.append(self)
+        elif self.timingWheel is not None:
+            self.timingWheel.add_timer(self)
         else:
             _task_manager.install_task(self)
 
@@ -86,13 +104,18 @@ class _Task(DebugContents, Logging):
         # pass along to the task manager
         if not _task_manager:
             _unscheduled_tasks.remove(self)
+        elif self.timingWheel is not None:
+            self.timingWheel.remove_timer(self)
         else:
             _task_manager.suspend_task(self)
 
     def resume_task(self):
         global _task_manager
 
-        _task_manager.resume_task(self)
+        if self.timingWheel is not None:
+            self.timingWheel.add_timer(self)
+        else:
+            _task_manager.resume_task(self)
 
     def __lt__(self, other):
         return id(self) < id(other)
@@ -199,7 +222,10 @@ class RecurringTask(_Task):
             if _debug: RecurringTask._debug("    - task time: %r", self.taskTime)
 
             # install it
-            _task_manager.install_task(self)
+            if self.timingWheel is not None:
+                self.timingWheel.add_timer(self)
+            else:
+                _task_manager.install_task(self)
 
 #
 #   RecurringFunctionTask
@@ -253,8 +279,11 @@ class TaskManager(SingletonLogging):
         if _debug: TaskManager._debug("__init__")
         global _task_manager, _unscheduled_tasks
 
-        # initialize
+        # initialize, the tasks are a heap of (when, task) entries and the
+        # entries of suspended tasks are left in it until they get to the
+        # top or there are too many of them
         self.tasks = []
+        self.deadTasks = 0
         if _Trigger:
             self.trigger = _Trigger()
         else:
@@ -282,15 +311,18 @@ class TaskManager(SingletonLogging):
         if task.taskTime is None:
             raise RuntimeError("task time is None")
 
-        # if this is already installed, suspend it
+        # if this is already installed, the old entry is dead
         if task.isScheduled:
-            self.suspend_task(task)
+            self._remove_entry(task)
 
         # save this in the task list
-        heappush( self.tasks, (task.taskTime, task) )
+        entry = (task.taskTime, task)
+        heappush(self.tasks, entry)
         if _debug: TaskManager._debug("    - tasks: %r", self.tasks)
 
+        task._taskEntry = entry
         task.isScheduled = True
+        self._clean_tasks()
 
         # trigger the event
         if self.trigger:
@@ -300,14 +332,12 @@ class TaskManager(SingletonLogging):
         if _debug: TaskManager._debug("suspend_task %r", task)
 
         # remove this guy
-        for i, (when, curtask) in enumerate(self.tasks):
-            if task is curtask:
-                if _debug: TaskManager._debug("    - task found")
-                del self.tasks[i]
+        if task.isScheduled:
+            if _debug: TaskManager._debug("    - task found")
+            self._remove_entry(task)
 
-                task.isScheduled = False
-                heapify(self.tasks)
-                break
+            task.isScheduled = False
+            self._clean_tasks()
         else:
             if _debug: TaskManager._debug("    - task not found")
 
@@ -315,6 +345,28 @@ class TaskManager(SingletonLogging):
         if self.trigger:
             self.trigger.set()
 
+    def _remove_entry(self, task):
+        """The heap entry for the task is no longer valid, it stays in
+        the heap until it is cleaned out."""
+        task._taskEntry = None
+        self.deadTasks += 1
+
+    def _clean_tasks(self):
+        """Pop the dead entries off the top of the heap so the first one is
+        always a task that is scheduled, and rebuild the heap when most of
+        it is dead entries."""
+        tasks = self.tasks
+
+        if self.deadTasks > (len(tasks) // 2):
+            if _debug: TaskManager._debug("    - rebuild: %r dead", self.deadTasks)
+            tasks[:] = [entry for entry in tasks if entry[1]._taskEntry is entry]
+            heapify(tasks)
+            self.deadTasks = 0
+
+        while tasks and (tasks[0][1]._taskEntry is not tasks[0]):
+            heappop(tasks)
+            self.deadTasks -= 1
+
     def resume_task(self, task):
         if _debug: TaskManager._debug("resume_task %r", task)
 
@@ -341,6 +393,8 @@ class TaskManager(SingletonLogging):
                 heappop(self.tasks)
                 task = nxttask
                 task.isScheduled = False
+                task._taskEntry = None
+                self._clean_tasks()
 
                 if self.tasks:
                     when, nxttask = self.tasks[0]
@@ -355,6 +409,11 @@ class TaskManager(SingletonLogging):
     def process_task(self, task):
         if _debug: TaskManager._debug("process_task %r", task)
 
+        # a task taken off the top of the heap by a subclass
+        if not task.isScheduled:
+            task._taskEntry = None
+        self._clean_tasks()
+
         # process the task
         task.process_task()
 
@@ -363,3 +422,138 @@ class TaskManager(SingletonLogging):
             task.install_task()
         elif isinstance(task, OneShotDeleteTask):
             del task
+
+#
+#   TimingWheel
+#
+
+@bacpypes_debugging
+class TimingWheel(OneShotTask, DebugContents):
+
+    """A hierarchical timing wheel for large numbers of timers that do not
+    need to be more accurate than the tick, they run at the first tick at
+    or after their task time.  Tasks use a wheel by setting their
+    timingWheel attribute, adding and removing a timer takes constant time
+    and the wheel is a single task in the task manager while it has
+    timers.
+    """
+
+    _debug_contents = ('tick', 'slots', 'levels', 'currentTick', 'timerCount')
+
+    def __init__(self, tick=1.0, slots=64, levels=4):
+        if _debug: TimingWheel._debug("__init__ tick=%r slots=%r levels=%r", tick, slots, levels)
+        OneShotTask.__init__(self)
+
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+
+        # each level is a list of slots, a slot at level n is slots**n ticks
+        # and maps its tasks to the order they were added
+        self.wheels = [[{} for i in range(slots)] for j in range(levels)]
+
+        self.currentTick = None
+        self.timerCount = 0
+        self.timerSequence = 0
+
+    def get_tick(self):
+        """Return the tick for the current time."""
+        return int(floor(_task_manager.get_time() / self.tick + 1e-9))
+
+    def add_timer(self, task):
+        """Add a task to run at its task time."""
+        if _debug: TimingWheel._debug("add_timer %r", task)
+
+        # if this is already installed, take it out
+        if task.isScheduled:
+            self.remove_timer(task)
+
+        # the wheel starts turning now
+        if not self.timerCount:
+            self.currentTick = self.get_tick()
+
+        # never early, at least the next tick
+        task._wheelTick = max(int(ceil(task.taskTime / self.tick - 1e-9)), self.currentTick + 1)
+        self._place(task, self.timerSequence)
+        self.timerSequence += 1
+
+        task.isScheduled = True
+        self.timerCount += 1
+
+        # make sure the wheel is turning
+        if not self.isScheduled:
+            self.install_task((self.currentTick + 1) * self.tick)
+
+    def remove_timer(self, task):
+        """Take a task out of the wheel."""
+        if _debug: TimingWheel._debug("remove_timer %r", task)
+
+        if task._wheelSlot is None:
+            if _debug: TimingWheel._debug("    - timer not found")
+            return
+
+        del task._wheelSlot[task]
+        task._wheelSlot = None
+        task.isScheduled = False
+        self.timerCount -= 1
+
+    def _place(self, task, sequence):
+        """Put the task in the slot for its tick, the further away it is the
+        higher the level and the coarser the slot."""
+        when = task._wheelTick
+        delta = when - self.currentTick
+
+        for level in range(self.levels):
+            if delta < self.slots ** (level + 1):
+                break
+        else:
+            # beyond the top, it is placed again when the slot comes around
+            when = self.currentTick + self.slots ** self.levels - 1
+
+        slot = self.wheels[level][(when // self.slots ** level) % self.slots]
+        slot[task] = sequence
+        task._wheelSlot = slot
+
+    def process_task(self):
+        if _debug: TimingWheel._debug("process_task")
+
+        tick = self.get_tick()
+        while self.currentTick < tick:
+            self.currentTick += 1
+            current = self.currentTick
+
+            # move the timers in the slots of the higher levels down
+            for level in range(self.levels - 1, 0, -1):
+                span = self.slots ** level
+                if current % span:
+                    continue
+
+                index = (current // span) % self.slots
+                slot = self.wheels[level][index]
+                if slot:
+                    self.wheels[level][index] = {}
+                    for task, sequence in slot.items():
+                        self._place(task, sequence)
+
+            # run the timers in this slot
+            index = current % self.slots
+            slot = self.wheels[0][index]
+            if not slot:
+                continue
+            self.wheels[0][index] = {}
+
+            # in time order, then the order they were added
+            for task in sorted(slot, key=lambda task: (task.taskTime, slot[task])):
+                # removed or added again by an earlier one
+                if task._wheelSlot is not slot:
+                    continue
+
+                task._wheelSlot = None
+                task.isScheduled = False
+                self.timerCount -= 1
+
+                _task_manager.process_task(task)
+
+        # keep turning while there are timers
+        if self.timerCount and not self.isScheduled:
+            self.install_task((self.currentTick + 1) * self.tick)
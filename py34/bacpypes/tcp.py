@@ -4,7 +4,6 @@
 TCP Communications Module
 """
 
-import asyncore
 import socket
 import pickle
 from time import time as _time, sleep as _sleep
@@ -12,7 +11,7 @@ from io import StringIO
 
 from .debugging import ModuleLogger, DebugContents, bacpypes_debugging
 
-from .core import deferred
+from .core import deferred, Dispatcher
 from .task import FunctionTask, OneShotFunction
 from .comm import PDU, Client, Server
 from .comm import ServiceAccessPoint, ApplicationServiceElement
@@ -89,11 +88,11 @@ class PickleActorMixIn:
 #
 
 @bacpypes_debugging
-class TCPClient(asyncore.dispatcher):
+class TCPClient(Dispatcher):
 
     def __init__(self, peer):
         if _debug: TCPClient._debug("__init__ %r", peer)
-        asyncore.dispatcher.__init__(self)
+        Dispatcher.__init__(self)
 
         # ask the dispatcher for a socket
         self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -133,7 +132,7 @@ class TCPClient(asyncore.dispatcher):
             return
 
         # pass along
-        asyncore.dispatcher.handle_connect_event(self)
+        Dispatcher.handle_connect_event(self)
 
     def readable(self):
         return self.connected
@@ -200,7 +199,7 @@ class TCPClient(asyncore.dispatcher):
             return
 
         # pass along
-        asyncore.dispatcher.handle_write_event(self)
+        Dispatcher.handle_write_event(self)
 
     def handle_close(self):
         if _debug: TCPClient._debug("handle_close")
@@ -216,13 +215,14 @@ class TCPClient(asyncore.dispatcher):
         if _debug: TCPClient._debug("handle_error %r", error)
 
         # core does not take parameters
-        asyncore.dispatcher.handle_error(self)
+        Dispatcher.handle_error(self)
 
     def indication(self, pdu):
         """Requests are queued for delivery."""
         if _debug: TCPClient._debug("indication %r", pdu)
 
         self.request += pdu.pduData
+        self.update_channel()
 
 #
 #   TCPClientActor
@@ -453,11 +453,11 @@ class TCPClientDirector(Server, ServiceAccessPoint, DebugContents):
 #
 
 @bacpypes_debugging
-class TCPServer(asyncore.dispatcher):
+class TCPServer(Dispatcher):
 
     def __init__(self, sock, peer):
         if _debug: TCPServer._debug("__init__ %r %r", sock, peer)
-        asyncore.dispatcher.__init__(self, sock)
+        Dispatcher.__init__(self, sock)
 
         # save the peer
         self.peer = peer
@@ -533,13 +533,14 @@ class TCPServer(asyncore.dispatcher):
         if _debug: TCPServer._debug("handle_error %r", error)
 
         # core does not take parameters
-        asyncore.dispatcher.handle_error(self)
+        Dispatcher.handle_error(self)
 
     def indication(self, pdu):
         """Requests are queued for delivery."""
         if _debug: TCPServer._debug("indication %r", pdu)
 
         self.request += pdu.pduData
+        self.update_channel()
 
 #
 #   TCPServerActor
@@ -657,7 +658,7 @@ class TCPPickleServerActor(PickleActorMixIn, TCPServerActor):
 #
 
 @bacpypes_debugging
-class TCPServerDirector(asyncore.dispatcher, Server, ServiceAccessPoint, DebugContents):
+class TCPServerDirector(Dispatcher, Server, ServiceAccessPoint, DebugContents):
 
     _debug_contents = ('port', 'timeout', 'actorClass', 'servers')
 
@@ -682,7 +683,7 @@ class TCPServerDirector(asyncore.dispatcher, Server, ServiceAccessPoint, DebugCo
         self.servers = {}
 
         # continue with initialization
-        asyncore.dispatcher.__init__(self)
+        Dispatcher.__init__(self)
 
         # create a listening port
         self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -4,7 +4,7 @@
 UDP Communications Module
 """
 
-import asyncore
+import errno
 import socket
 import pickle
 import queue
@@ -13,7 +13,7 @@ from time import time as _time
 
 from .debugging import ModuleLogger, bacpypes_debugging
 
-from .core import deferred
+from .core import deferred, Dispatcher
 from .task import FunctionTask
 from .comm import PDU, Server
 from .comm import ServiceAccessPoint
@@ -32,6 +32,9 @@ _log = ModuleLogger(globals())
 @bacpypes_debugging
 class UDPActor:
 
+    # the idle timers can use a TimingWheel rather than the task manager
+    timingWheel = None
+
     def __init__(self, director, peer):
         if _debug: UDPActor._debug("__init__ %r %r", director, peer)
 
@@ -45,6 +48,7 @@ class UDPActor:
         self.timeout = director.timeout
         if self.timeout > 0:
             self.timer = FunctionTask(self.idle_timeout)
+            self.timer.timingWheel = self.timingWheel
             self.timer.install_task(_time() + self.timeout)
         else:
             self.timer = None
@@ -67,6 +71,7 @@ class UDPActor:
 
         # put it in the outbound queue for the director
         self.director.request.put(pdu)
+        self.director.update_channel()
 
     def response(self, pdu):
         if _debug: UDPActor._debug("response %r", pdu)
@@ -123,13 +128,28 @@ class UDPPickleActor(UDPActor):
 #
 
 @bacpypes_debugging
-class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
+class UDPDirector(Dispatcher, Server, ServiceAccessPoint):
+
+    # the most datagrams read or written each time the socket is ready
+    batchSize = 1
 
-    def __init__(self, address, timeout=0, reuse=False, actorClass=UDPActor, sid=None, sapID=None):
-        if _debug: UDPDirector._debug("__init__ %r timeout=%r reuse=%r actorClass=%r sid=%r sapID=%r", address, timeout, reuse, actorClass, sid, sapID)
+    # socket buffer sizes, None for the system default
+    rcvbuf = None
+    sndbuf = None
+
+    def __init__(self, address, timeout=0, reuse=False, actorClass=UDPActor, sid=None, sapID=None, batchSize=None, rcvbuf=None, sndbuf=None):
+        if _debug: UDPDirector._debug("__init__ %r timeout=%r reuse=%r actorClass=%r sid=%r sapID=%r batchSize=%r rcvbuf=%r sndbuf=%r", address, timeout, reuse, actorClass, sid, sapID, batchSize, rcvbuf, sndbuf)
         Server.__init__(self, sid)
         ServiceAccessPoint.__init__(self, sapID)
 
+        # override the defaults
+        if batchSize is not None:
+            self.batchSize = batchSize
+        if rcvbuf is not None:
+            self.rcvbuf = rcvbuf
+        if sndbuf is not None:
+            self.sndbuf = sndbuf
+
         # check the actor class
         if not issubclass(actorClass, UDPActor):
             raise TypeError("actorClass must be a subclass of UDPActor")
@@ -141,7 +161,7 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         # save the address
         self.address = address
 
-        asyncore.dispatcher.__init__(self)
+        Dispatcher.__init__(self)
 
         # ask the dispatcher for a socket
         self.create_socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -157,6 +177,16 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         # allow it to send broadcasts
         self.socket.setsockopt( socket.SOL_SOCKET, socket.SO_BROADCAST, 1 )
 
+        # bigger buffers hold more of a burst
+        if self.rcvbuf:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+        if self.sndbuf:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.sndbuf)
+        if _debug: UDPDirector._debug("    - buffers: %r %r",
+            self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF),
+            self.socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF),
+            )
+
         # create the request queue
         self.request = queue.Queue()
 
@@ -202,18 +232,20 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
     def handle_read(self):
         if _debug: UDPDirector._debug("handle_read")
 
+        # read what is waiting, up to the batch size
+        pdus = []
         try:
-            msg, addr = self.socket.recvfrom(65536)
-            if _debug: UDPDirector._debug("    - received %d octets from %s", len(msg), addr)
+            while len(pdus) < self.batchSize:
+                msg, addr = self.socket.recvfrom(65536)
+                if _debug: UDPDirector._debug("    - received %d octets from %s", len(msg), addr)
 
-            # send the PDU up to the client
-            deferred(self._response, PDU(msg, source=addr))
+                pdus.append(PDU(msg, source=addr))
 
         except socket.timeout as err:
             if _debug: UDPDirector._debug("    - socket timeout: %s", err)
 
         except socket.error as err:
-            if err.args[0] == 11:
+            if err.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
                 pass
             else:
                 if _debug: UDPDirector._debug("    - socket error: %s", err)
@@ -221,31 +253,41 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
                 # pass along to a handler
                 self.handle_error(err)
 
+        # send the PDUs up to the client
+        if len(pdus) == 1:
+            deferred(self._response, pdus[0])
+        elif pdus:
+            deferred(self._responses, pdus)
+
     def writable(self):
         """Return true iff there is a request pending."""
         return (not self.request.empty())
 
     def handle_write(self):
-        """get a PDU from the queue and send it."""
+        """get PDUs from the queue and send them, up to the batch size."""
         if _debug: UDPDirector._debug("handle_write")
 
-        try:
-            pdu = self.request.get()
+        for i in range(self.batchSize):
+            try:
+                pdu = self.request.get_nowait()
+            except queue.Empty:
+                break
 
-            sent = self.socket.sendto(pdu.pduData, pdu.pduDestination)
-            if _debug: UDPDirector._debug("    - sent %d octets to %s", sent, pdu.pduDestination)
+            try:
+                sent = self.socket.sendto(pdu.pduData, pdu.pduDestination)
+                if _debug: UDPDirector._debug("    - sent %d octets to %s", sent, pdu.pduDestination)
 
-        except socket.error as err:
-            if _debug: UDPDirector._debug("    - socket error: %s", err)
+            except socket.error as err:
+                if _debug: UDPDirector._debug("    - socket error: %s", err)
 
-            # get the peer
-            peer = self.peers.get(pdu.pduDestination, None)
-            if peer:
-                # let the actor handle the error
-                peer.handle_error(err)
-            else:
-                # let the director handle the error
-                self.handle_error(err)
+                # get the peer
+                peer = self.peers.get(pdu.pduDestination, None)
+                if peer:
+                    # let the actor handle the error
+                    peer.handle_error(err)
+                else:
+                    # let the director handle the error
+                    self.handle_error(err)
 
     def handle_close(self):
         """Remove this from the monitor when it's closed."""
@@ -272,6 +314,13 @@ class UDPDirector(asyncore.dispatcher, Server, ServiceAccessPoint):
         # send the message
         peer.indication(pdu)
 
+    def _responses(self, pdus):
+        """A batch of incoming datagrams."""
+        if _debug: UDPDirector._debug("_responses %r", pdus)
+
+        for pdu in pdus:
+            self._response(pdu)
+
     def _response(self, pdu):
         """Incoming datagrams are routed through an actor."""
         if _debug: UDPDirector._debug("_response %r", pdu)
@@ -0,0 +1,107 @@
+#!/usr/bin/python
+
+"""
+lazy_decode
+
+This application compares the time it takes to decode a ReadPropertyACK
+that carries a large array and read only its objectIdentifier, with the
+ack decoded normally and with it decoded as a LazySequence.
+"""
+
+import sys
+import time
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import PDU
+from bacpypes.primitivedata import Real
+from bacpypes.constructeddata import Any, ArrayOf, LazySequence
+from bacpypes.apdu import APDU, ComplexAckPDU, ReadPropertyACK
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   LazyReadPropertyACK
+#
+
+class LazyReadPropertyACK(LazySequence, ReadPropertyACK):
+    pass
+
+#
+#   encode_ack
+#
+
+def encode_ack(count):
+    """Return the octets of a ReadPropertyACK with an array of count
+    values."""
+    ack = ReadPropertyACK(
+        objectIdentifier=('analogValue', 1),
+        propertyIdentifier='priorityArray',
+        propertyValue=Any(ArrayOf(Real)([float(i) for i in range(count)])),
+        )
+    ack.apduInvokeID = 1
+
+    apdu = ComplexAckPDU()
+    ack.encode(apdu)
+    xpdu = APDU()
+    apdu.encode(xpdu)
+    pdu = PDU()
+    xpdu.encode(pdu)
+
+    return bytes(pdu.pduData)
+
+#
+#   measure
+#
+
+@bacpypes_debugging
+def measure(klass, data, loops):
+    """Return the milliseconds it takes to decode the data into an instance
+    of the class and read the objectIdentifier."""
+    if _debug: measure._debug("measure %r %r %r", klass, len(data), loops)
+
+    start = time.time()
+    for i in range(loops):
+        apdu = APDU()
+        apdu.decode(PDU(memoryview(data)))
+        ack = klass()
+        ack.decode(apdu)
+        ack.objectIdentifier
+    elapsed = time.time() - start
+
+    return elapsed * 1000.0 / loops
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=2000,
+        help="number of values in the array",
+        )
+    parser.add_argument('--loops', type=int, default=100,
+        help="number of times to decode the ack",
+        )
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    data = encode_ack(args.count)
+
+    sys.stdout.write("%-8s %10s\n" % ("decode", "ms"))
+    for name, klass in (
+            ('normal', ReadPropertyACK),
+            ('lazy', LazyReadPropertyACK),
+            ):
+        sys.stdout.write("%-8s %10.3f\n" % (name, measure(klass, data, args.loops)))
+
+    if _debug: _log.debug("finally")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/python
+
+"""
+segmentation_window
+
+This application builds a VLAN with a client and a server application and
+compares the time it takes to transfer large segmented AtomicReadFile and
+ReadRange responses with a fixed segmentation window and with the adaptive
+window.  The network adds latency, has a link with limited bandwidth and a
+short queue, and drops some percentage of the packets.
+"""
+
+import sys
+import time
+import random
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.core import run_once, deferred
+from bacpypes.task import FunctionTask
+from bacpypes.comm import bind
+from bacpypes.iocb import IOCB
+
+from bacpypes.pdu import Address
+from bacpypes.vlan import Network, Node
+
+from bacpypes.app import ApplicationIOController
+from bacpypes.appservice import StateMachineAccessPoint, ApplicationServiceAccessPoint
+from bacpypes.netservice import NetworkServiceAccessPoint, NetworkServiceElement
+
+from bacpypes.primitivedata import Unsigned
+from bacpypes.constructeddata import Any
+from bacpypes.basetypes import ResultFlags
+from bacpypes.apdu import AtomicReadFileRequest, \
+    AtomicReadFileRequestAccessMethodChoice, \
+    AtomicReadFileRequestAccessMethodChoiceStreamAccess, \
+    ReadRangeRequest, ReadRangeACK
+
+from bacpypes.service.device import LocalDeviceObject
+from bacpypes.service.file import FileServices, LocalStreamAccessFileObject
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+# globals
+args = None
+
+#
+#   LossyNetwork
+#
+
+@bacpypes_debugging
+class LossyNetwork(Network):
+
+    def __init__(self, dropPercent=0.0, latency=0.0, bandwidth=None, queueLimit=None):
+        if _debug: LossyNetwork._debug("__init__ dropPercent=%r latency=%r bandwidth=%r queueLimit=%r", dropPercent, latency, bandwidth, queueLimit)
+        Network.__init__(self)
+
+        self.lossPercent = dropPercent
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.queueLimit = queueLimit
+
+        # when the link will be done sending what has been queued
+        self.linkTime = 0.0
+        self.queued = 0
+
+        self.sent = 0
+        self.dropped = 0
+
+    def process_pdu(self, pdu):
+        if _debug: LossyNetwork._debug("process_pdu %r", pdu)
+
+        self.sent += 1
+        if (random.random() * 100.0) < self.lossPercent:
+            if _debug: LossyNetwork._debug("    - packet lost")
+            self.dropped += 1
+            return
+
+        # tail drop when the link is busy
+        if (self.queueLimit is not None) and (self.queued >= self.queueLimit):
+            if _debug: LossyNetwork._debug("    - queue full")
+            self.dropped += 1
+            return
+
+        # wait for the link then send the packet
+        now = time.time()
+        self.linkTime = max(self.linkTime, now)
+        if self.bandwidth:
+            self.linkTime += float(len(pdu.pduData)) / self.bandwidth
+
+        self.queued += 1
+        task = FunctionTask(self.deliver_pdu, pdu)
+        task.install_task(self.linkTime + self.latency)
+
+    def deliver_pdu(self, pdu):
+        if _debug: LossyNetwork._debug("deliver_pdu %r", pdu)
+
+        self.queued -= 1
+        Network.process_pdu(self, pdu)
+
+#
+#   VLANApplication
+#
+
+@bacpypes_debugging
+class VLANApplication(ApplicationIOController, FileServices):
+
+    def __init__(self, vlan_device, vlan_address, aseID=None):
+        if _debug: VLANApplication._debug("__init__ %r %r aseID=%r", vlan_device, vlan_address, aseID)
+        ApplicationIOController.__init__(self, vlan_device, aseID=aseID)
+
+        # include a application decoder
+        self.asap = ApplicationServiceAccessPoint()
+
+        # pass the device object to the state machine access point so it
+        # can know if it should support segmentation
+        self.smap = StateMachineAccessPoint(vlan_device)
+        self.smap.deviceInfoCache = self.deviceInfoCache
+
+        # a network service access point will be needed
+        self.nsap = NetworkServiceAccessPoint()
+
+        # give the NSAP a generic network layer service element
+        self.nse = NetworkServiceElement()
+        bind(self.nse, self.nsap)
+
+        # bind the top layers
+        bind(self, self.asap, self.smap, self.nsap)
+
+        # create a vlan node at the assigned address
+        self.vlan_node = Node(vlan_address)
+
+        # bind the stack to the node, no network number
+        self.nsap.bind(self.vlan_node)
+
+    def do_ReadRangeRequest(self, apdu):
+        """Return all of the items in a fake log buffer."""
+        if _debug: VLANApplication._debug("do_ReadRangeRequest %r", apdu)
+
+        # build the items
+        item_data = []
+        for i in range(args.items):
+            item = Any()
+            item.cast_in(Unsigned(i))
+            item_data.append(item)
+
+        resp = ReadRangeACK(context=apdu,
+            objectIdentifier=apdu.objectIdentifier,
+            propertyIdentifier=apdu.propertyIdentifier,
+            resultFlags=ResultFlags([1, 1, 0]),
+            itemCount=len(item_data),
+            itemData=item_data,
+            )
+        self.response(resp)
+
+#
+#   BenchmarkFile
+#
+
+@bacpypes_debugging
+class BenchmarkFile(LocalStreamAccessFileObject):
+
+    def __init__(self, **kwargs):
+        if _debug: BenchmarkFile._debug("__init__ %r", kwargs)
+        LocalStreamAccessFileObject.__init__(self, **kwargs)
+
+        self._file_data = bytes(bytearray(random.randrange(256) for i in range(args.octets)))
+
+    def __len__(self):
+        return len(self._file_data)
+
+    def read_stream(self, start_position, octet_count):
+        end_of_file = (start_position + octet_count) >= len(self._file_data)
+        return end_of_file, self._file_data[start_position:start_position + octet_count]
+
+#
+#   Benchmark
+#
+
+@bacpypes_debugging
+class Benchmark:
+
+    def __init__(self, client, server, network, jobs):
+        if _debug: Benchmark._debug("__init__ %r %r %r %r", client, server, network, jobs)
+
+        self.client = client
+        self.server = server
+        self.network = network
+        self.jobs = list(jobs)
+
+        self.results = []
+        self.running = True
+
+    def start(self):
+        if _debug: Benchmark._debug("start")
+
+        if not self.jobs:
+            self.running = False
+            return
+
+        # pull out the next job
+        self.mode, self.service, self.count = self.jobs.pop(0)
+        if _debug: Benchmark._debug("    - job: %r %r %r", self.mode, self.service, self.count)
+
+        # receivers pick the window size
+        adaptive = (self.mode == 'adaptive')
+        self.client.smap.adaptiveSegmentWindow = adaptive
+        self.server.smap.adaptiveSegmentWindow = adaptive
+
+        self.network.sent = self.network.dropped = 0
+        self.errors = 0
+        self.elapsed = []
+        self.send_request()
+
+    def send_request(self):
+        if _debug: Benchmark._debug("send_request")
+
+        if self.service == 'file':
+            request = AtomicReadFileRequest(
+                fileIdentifier=('file', 1),
+                accessMethod=AtomicReadFileRequestAccessMethodChoice(
+                    streamAccess=AtomicReadFileRequestAccessMethodChoiceStreamAccess(
+                        fileStartPosition=0,
+                        requestedOctetCount=args.octets,
+                        ),
+                    ),
+                )
+        else:
+            request = ReadRangeRequest(
+                objectIdentifier=('trendLog', 1),
+                propertyIdentifier='logBuffer',
+                )
+        request.pduDestination = self.server.vlan_node.address
+
+        iocb = IOCB(request)
+        iocb.add_callback(self.complete)
+        iocb.start_time = time.time()
+
+        self.client.request_io(iocb)
+
+    def complete(self, iocb):
+        if _debug: Benchmark._debug("complete %r", iocb)
+
+        if iocb.ioError:
+            self.errors += 1
+        else:
+            self.elapsed.append(time.time() - iocb.start_time)
+
+        self.count -= 1
+        if self.count:
+            deferred(self.send_request)
+            return
+
+        self.results.append((self.mode, self.service, self.elapsed, self.errors,
+            self.network.sent, self.network.dropped,
+            ))
+        deferred(self.start)
+
+#
+#   __main__
+#
+
+def main():
+    global args
+
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=10,
+        help="number of transfers of each kind",
+        )
+    parser.add_argument('--octets', type=int, default=32768,
+        help="size of the file",
+        )
+    parser.add_argument('--items', type=int, default=8000,
+        help="number of items in the range",
+        )
+    parser.add_argument('--drop', type=float, default=2.0,
+        help="percent of packets lost",
+        )
+    parser.add_argument('--latency', type=float, default=0.010,
+        help="seconds to cross the network",
+        )
+    parser.add_argument('--bandwidth', type=int, default=500000,
+        help="bytes per second",
+        )
+    parser.add_argument('--queue', type=int, default=16,
+        help="packets queued on the link",
+        )
+    parser.add_argument('--segment-timeout', type=int, default=250,
+        help="segment timeout in milliseconds",
+        )
+    parser.add_argument('--seed', type=int, default=1,
+        help="random number seed",
+        )
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    random.seed(args.seed)
+
+    network = LossyNetwork(args.drop, args.latency, args.bandwidth, args.queue)
+
+    apps = []
+    for i in (1, 2):
+        device = LocalDeviceObject(
+            objectName="device-%d" % (i,),
+            objectIdentifier=('device', i),
+            maxApduLengthAccepted=480,
+            segmentationSupported='segmentedBoth',
+            maxSegmentsAccepted=64,
+            apduSegmentTimeout=args.segment_timeout,
+            vendorIdentifier=15,
+            )
+        app = VLANApplication(device, Address(i))
+        network.add_node(app.vlan_node)
+        apps.append(app)
+    client, server = apps
+
+    # the client waits longer than the server for the next segment
+    client.smap.segmentTimeout = 4 * args.segment_timeout
+
+    server.add_object(BenchmarkFile(
+        objectIdentifier=('file', 1),
+        objectName='file-1',
+        fileAccessMethod='streamAccess',
+        ))
+
+    jobs = []
+    for service in ('file', 'range'):
+        for mode in ('fixed', 'adaptive'):
+            jobs.append((mode, service, args.count))
+
+    benchmark = Benchmark(client, server, network, jobs)
+    deferred(benchmark.start)
+
+    # the delivery tasks are installed while other tasks are running, so
+    # rather than run() which could sleep past them, keep checking
+    while benchmark.running:
+        run_once()
+        time.sleep(0.0002)
+
+    sys.stdout.write("%-8s %-8s %10s %10s %8s %8s %8s\n" % ("mode", "service", "mean ms", "max ms", "errors", "sent", "dropped"))
+    for mode, service, elapsed, errors, sent, dropped in benchmark.results:
+        mean = 1000.0 * sum(elapsed) / len(elapsed) if elapsed else 0.0
+        worst = 1000.0 * max(elapsed) if elapsed else 0.0
+        sys.stdout.write("%-8s %-8s %10.1f %10.1f %8d %8d %8d\n" % (mode, service, mean, worst, errors, sent, dropped))
+
+    if _debug: _log.debug("finally")
+
+if __name__ == "__main__":
+    main()
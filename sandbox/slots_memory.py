@@ -0,0 +1,135 @@
+#!/usr/bin/python
+
+"""
+slots_memory
+
+This application compares the memory used by, and the time it takes to
+build, the PDU, Address, Tag, APDU and NPDU classes that have their
+attributes in slots with subclasses that have an instance dictionary like
+they used to have.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+from bacpypes.consolelogging import ArgumentParser
+
+from bacpypes.pdu import Address, PDU
+from bacpypes.primitivedata import Tag
+from bacpypes.apdu import ConfirmedRequestPDU
+from bacpypes.npdu import NPDU
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+#
+#   Dictionary Versions
+#
+
+class DictAddress(Address):
+    pass
+
+class DictPDU(PDU):
+    pass
+
+class DictTag(Tag):
+    pass
+
+class DictConfirmedRequestPDU(ConfirmedRequestPDU):
+    pass
+
+class DictNPDU(NPDU):
+    pass
+
+#
+#   Builders
+#
+
+def build_address(klass, i):
+    return klass(bytes(bytearray([10, 0, (i >> 8) & 0xFF, i & 0xFF, 0xBA, 0xC0])))
+
+def build_pdu(klass, i):
+    return klass(b'\x01\x02\x03\x04', source=i, destination=i + 1)
+
+def build_tag(klass, i):
+    return klass(Tag.contextTagClass, i & 0x0F, 1, b'\x00')
+
+def build_apdu(klass, i):
+    return klass(12, b'\x0c\x00\x80\x00\x01\x19\x55', source=i)
+
+def build_npdu(klass, i):
+    return klass(b'\x10\x08', source=i)
+
+#
+#   measure
+#
+
+@bacpypes_debugging
+def measure(builder, klass, count, repeat=5):
+    """Return the bytes per instance and the microseconds per instance to
+    build count instances of the class, the time is the best of repeat
+    runs with the garbage collector off."""
+    if _debug: measure._debug("measure %r %r %r", builder, klass, count)
+
+    # memory
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    objs = [builder(klass, i) for i in range(count)]
+    stats = tracemalloc.take_snapshot().compare_to(snapshot, 'filename')
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in stats)
+    del objs
+
+    # allocation time
+    elapsed = None
+    gc.disable()
+    try:
+        for i in range(repeat):
+            start = time.time()
+            objs = [builder(klass, i) for i in range(count)]
+            run_time = time.time() - start
+            del objs
+
+            if (elapsed is None) or (run_time < elapsed):
+                elapsed = run_time
+    finally:
+        gc.enable()
+
+    return (float(size) / count, elapsed * 1000000.0 / count)
+
+#
+#   __main__
+#
+
+def main():
+    # parse the command line arguments
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100000,
+        help="number of instances to build",
+        )
+    args = parser.parse_args()
+
+    if _debug: _log.debug("initialization")
+    if _debug: _log.debug("    - args: %r", args)
+
+    sys.stdout.write("%-8s %12s %12s %10s %10s\n" % ("class", "dict bytes", "slots bytes", "dict us", "slots us"))
+    for name, builder, dict_class, slots_class in (
+            ('Address', build_address, DictAddress, Address),
+            ('PDU', build_pdu, DictPDU, PDU),
+            ('Tag', build_tag, DictTag, Tag),
+            ('APDU', build_apdu, DictConfirmedRequestPDU, ConfirmedRequestPDU),
+            ('NPDU', build_npdu, DictNPDU, NPDU),
+            ):
+        dict_size, dict_time = measure(builder, dict_class, args.count)
+        slots_size, slots_time = measure(builder, slots_class, args.count)
+
+        sys.stdout.write("%-8s %12.1f %12.1f %10.2f %10.2f\n" % (name, dict_size, slots_size, dict_time, slots_time))
+
+    if _debug: _log.debug("finally")
+
+if __name__ == "__main__":
+    main()
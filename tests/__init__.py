@@ -14,9 +14,15 @@ from . import time_machine
 from . import extended_tag_list
 from . import trapped_classes
 
+from . import test_aiocore
+from . import test_app
+from . import test_appservice
 from . import test_comm
+from . import test_iocb
 # from . import test_objects
 from . import test_pdu
 from . import test_primitive_data
+from . import test_task
+from . import test_udp
 from . import test_utilities
 from . import test_vlan
@@ -0,0 +1,8 @@
+#!/usr/bin/python
+
+"""
+Test Asyncio Core
+-----------------
+"""
+
+from . import test_aiocore
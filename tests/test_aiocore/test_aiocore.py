@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Asyncio Core
+-----------------
+
+These tests run on a real event loop and clock, not the time machine.
+"""
+
+import asyncio
+import threading
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes import core, task, aiocore
+from bacpypes.core import deferred
+from bacpypes.task import FunctionTask, TaskManager
+from bacpypes.aiocore import AsyncioTaskManager
+from bacpypes.comm import Client, bind
+from bacpypes.pdu import PDU
+from bacpypes.udp import UDPDirector
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class SampleClient(Client):
+
+    def __init__(self, loop):
+        Client.__init__(self)
+        self.received = loop.create_future()
+
+    def confirmation(self, pdu):
+        self.received.set_result((bytes(pdu.pduData), pdu.pduSource))
+
+
+@bacpypes_debugging
+class TestAsyncioCore(unittest.TestCase):
+
+    def setUp(self):
+        # the time machine is the task manager for the other tests, put it
+        # aside while the event loop has one
+        self.saved = (
+            TaskManager._singleton_instance, task._task_manager,
+            core.taskManager, core.asyncioTaskManager,
+            )
+        TaskManager._singleton_instance = None
+        AsyncioTaskManager._singleton_instance = None
+
+        self.loop = asyncio.new_event_loop()
+        self.task_manager = aiocore.setup(self.loop)
+
+        self.directors = []
+
+    def tearDown(self):
+        for director in self.directors:
+            director.close()
+        self.loop.close()
+
+        TaskManager._singleton_instance, task._task_manager, \
+            core.taskManager, core.asyncioTaskManager = self.saved
+        AsyncioTaskManager._singleton_instance = None
+
+    def run_for(self, seconds):
+        self.loop.run_until_complete(asyncio.sleep(seconds))
+
+    def test_task(self):
+        if _debug: TestAsyncioCore._debug("test_task")
+
+        record = []
+        FunctionTask(record.append, 1).install_task(delta=0.05)
+        FunctionTask(record.append, 2).install_task(delta=0.01)
+
+        self.run_for(0.02)
+        assert record == [2]
+        self.run_for(0.1)
+        assert record == [2, 1]
+
+    def test_event_loop(self):
+        if _debug: TestAsyncioCore._debug("test_event_loop")
+
+        # without a running loop a new one becomes the current loop
+        TaskManager._singleton_instance = None
+        AsyncioTaskManager._singleton_instance = None
+        task_manager = AsyncioTaskManager()
+        try:
+            assert task_manager.loop is not self.loop
+            assert asyncio.get_event_loop() is task_manager.loop
+        finally:
+            asyncio.set_event_loop(None)
+            task_manager.loop.close()
+
+        # the running loop is used when there is one
+        async def build():
+            return AsyncioTaskManager()
+
+        TaskManager._singleton_instance = None
+        AsyncioTaskManager._singleton_instance = None
+        task_manager = self.loop.run_until_complete(build())
+        assert task_manager.loop is self.loop
+
+    def test_cancel(self):
+        if _debug: TestAsyncioCore._debug("test_cancel")
+
+        record = []
+        tasks = [FunctionTask(record.append, i) for i in range(3)]
+        for t in tasks:
+            t.install_task(delta=0.05)
+
+        # suspend one, move another one later
+        tasks[0].suspend_task()
+        tasks[2].install_task(delta=0.5)
+        assert not tasks[0].isScheduled
+
+        self.run_for(0.1)
+        assert record == [1]
+        assert tasks[2].isScheduled
+        tasks[2].suspend_task()
+
+    def test_deferred(self):
+        if _debug: TestAsyncioCore._debug("test_deferred")
+
+        record = []
+        deferred(record.append, 1)
+        self.run_for(0.01)
+        assert record == [1]
+
+        # from another thread while the loop is waiting
+        future = self.loop.create_future()
+        thread = threading.Timer(0.05, deferred, (future.set_result, 2))
+        thread.start()
+        assert self.loop.run_until_complete(asyncio.wait_for(future, 1.0)) == 2
+        thread.join()
+
+    def test_stop(self):
+        if _debug: TestAsyncioCore._debug("test_stop")
+
+        # in case it does not stop
+        timeout = self.loop.call_later(2.0, self.loop.stop)
+        start = self.loop.time()
+
+        deferred(core.stop)
+        aiocore.run(self.loop)
+        assert self.loop.time() - start < 1.0
+        timeout.cancel()
+
+        assert not core.running
+        assert not self.task_manager.running
+
+    def test_udp_round_trip(self):
+        if _debug: TestAsyncioCore._debug("test_udp_round_trip")
+
+        clients = []
+        for i in range(2):
+            director = UDPDirector(('127.0.0.1', 0))
+            self.directors.append(director)
+
+            client = SampleClient(self.loop)
+            bind(client, director)
+            clients.append(client)
+
+        source = self.directors[0].socket.getsockname()
+        destination = self.directors[1].socket.getsockname()
+
+        # a coroutine sends it directly, the loop is woken up to write it
+        async def send_and_wait():
+            clients[0].request(PDU(b'hello', destination=destination))
+            return await asyncio.wait_for(clients[1].received, 1.0)
+
+        data, pdu_source = self.loop.run_until_complete(send_and_wait())
+        assert data == b'hello'
+        assert pdu_source == source
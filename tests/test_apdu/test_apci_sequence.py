@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test APCI Sequences
+-------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+from bacpypes.errors import DecodingError, MissingRequiredParameter, InvalidTag
+
+from bacpypes.pdu import PDU
+from bacpypes.primitivedata import Real, CharacterString, TagReader
+from bacpypes.constructeddata import Any, Element, LazySequence
+from bacpypes.basetypes import ErrorType, PropertyReference
+from bacpypes.apdu import APDU, ComplexAckPDU, ConfirmedRequestPDU, \
+    ReadPropertyACK, ReadPropertyMultipleACK, ReadAccessResult, \
+    ReadAccessResultElement, ReadAccessResultElementChoice, \
+    SubscribeCOVPropertyRequest
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def encode_ack(ack):
+    """Encode a complex ack and return the octets."""
+    ack.apduInvokeID = 1
+
+    apdu = ComplexAckPDU()
+    ack.encode(apdu)
+    xpdu = APDU()
+    apdu.encode(xpdu)
+    pdu = PDU()
+    xpdu.encode(pdu)
+
+    return bytes(pdu.pduData)
+
+
+def decode_sequence(klass, data):
+    """Decode the octets into an instance of the sequence class."""
+    apdu = APDU()
+    apdu.decode(PDU(memoryview(data)))
+    sequence = klass()
+    sequence.decode(apdu)
+
+    return sequence
+
+
+@bacpypes_debugging
+class TestAPCISequence(unittest.TestCase):
+
+    def test_read_property_ack(self):
+        if _debug: TestAPCISequence._debug("test_read_property_ack")
+
+        ack = ReadPropertyACK(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            propertyValue=Any(Real(3.5)),
+            )
+        ack = decode_sequence(ReadPropertyACK, encode_ack(ack))
+
+        assert ack.objectIdentifier == ('analogValue', 1)
+        assert ack.propertyIdentifier == 'presentValue'
+        assert ack.propertyArrayIndex is None
+        assert ack.propertyValue.cast_out(Real) == 3.5
+
+    def test_missing_element(self):
+        if _debug: TestAPCISequence._debug("test_missing_element")
+
+        ack = ReadPropertyACK(objectIdentifier=('analogValue', 1))
+        with self.assertRaises(MissingRequiredParameter):
+            encode_ack(ack)
+
+    def test_read_property_multiple_ack(self):
+        if _debug: TestAPCISequence._debug("test_read_property_multiple_ack")
+
+        value_element = ReadAccessResultElement(
+            propertyIdentifier='presentValue',
+            readResult=ReadAccessResultElementChoice(
+                propertyValue=Any(Real(1.0)),
+                ),
+            )
+        error_element = ReadAccessResultElement(
+            propertyIdentifier='description',
+            readResult=ReadAccessResultElementChoice(
+                propertyAccessError=ErrorType(errorClass='property', errorCode='unknownProperty'),
+                ),
+            )
+        name_element = ReadAccessResultElement(
+            propertyIdentifier='objectName',
+            readResult=ReadAccessResultElementChoice(
+                propertyValue=Any(CharacterString("av1")),
+                ),
+            )
+        ack = ReadPropertyMultipleACK(listOfReadAccessResults=[
+            ReadAccessResult(
+                objectIdentifier=('analogValue', 1),
+                listOfResults=[value_element, error_element, name_element],
+                ),
+            ])
+        ack = decode_sequence(ReadPropertyMultipleACK, encode_ack(ack))
+
+        assert len(ack.listOfReadAccessResults) == 1
+        result = ack.listOfReadAccessResults[0]
+        assert result.objectIdentifier == ('analogValue', 1)
+        assert len(result.listOfResults) == 3
+
+        element = result.listOfResults[0]
+        assert element.propertyIdentifier == 'presentValue'
+        assert element.readResult.propertyValue.cast_out(Real) == 1.0
+        assert element.readResult.propertyAccessError is None
+
+        element = result.listOfResults[1]
+        assert element.propertyIdentifier == 'description'
+        assert element.readResult.propertyValue is None
+        assert element.readResult.propertyAccessError.errorClass == 'property'
+        assert element.readResult.propertyAccessError.errorCode == 'unknownProperty'
+
+        element = result.listOfResults[2]
+        assert element.readResult.propertyValue.cast_out(CharacterString) == "av1"
+
+    def test_nested_sequence(self):
+        if _debug: TestAPCISequence._debug("test_nested_sequence")
+
+        request = SubscribeCOVPropertyRequest(
+            subscriberProcessIdentifier=1,
+            monitoredObjectIdentifier=('analogValue', 1),
+            monitoredPropertyIdentifier=PropertyReference(
+                propertyIdentifier='presentValue',
+                ),
+            covIncrement=0.5,
+            )
+        request.apduInvokeID = 1
+        request.apduMaxResp = 1024
+        apdu = ConfirmedRequestPDU()
+        request.encode(apdu)
+        xpdu = APDU()
+        apdu.encode(xpdu)
+        pdu = PDU()
+        xpdu.encode(pdu)
+        data = bytes(pdu.pduData)
+
+        # the context encoded sequence is decoded from the same reader
+        request = decode_sequence(SubscribeCOVPropertyRequest, data)
+        assert request.subscriberProcessIdentifier == 1
+        assert request.issueConfirmedNotifications is None
+        assert request.monitoredPropertyIdentifier.propertyIdentifier == 'presentValue'
+        assert request.monitoredPropertyIdentifier.propertyArrayIndex is None
+        assert request.covIncrement == 0.5
+        assert not request._tag_list
+
+        # the closing tag has to match
+        with self.assertRaises(InvalidTag):
+            decode_sequence(SubscribeCOVPropertyRequest, data.replace(b'\x4f', b'\x3f'))
+
+        # content in the group that does not belong in the sequence
+        with self.assertRaises(InvalidTag):
+            decode_sequence(SubscribeCOVPropertyRequest, data.replace(b'\x4f', b'\x21\x09\x4f'))
+
+    def test_lazy_decode(self):
+        if _debug: TestAPCISequence._debug("test_lazy_decode")
+
+        ack = ReadPropertyACK(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            propertyValue=Any(Real(3.5)),
+            )
+        data = encode_ack(ack)
+
+        class LazyReadPropertyACK(LazySequence, ReadPropertyACK):
+            pass
+
+        ack = decode_sequence(LazyReadPropertyACK, data)
+        assert 'objectIdentifier' not in ack.__dict__
+        assert 'propertyValue' not in ack.__dict__
+
+        # decoded when they are read
+        assert ack.objectIdentifier == ('analogValue', 1)
+        assert 'objectIdentifier' in ack.__dict__
+        assert 'propertyValue' not in ack.__dict__
+
+        # omitted optional elements are not lazy
+        assert ack.__dict__['propertyArrayIndex'] is None
+
+        assert ack.propertyValue.cast_out(Real) == 3.5
+        assert ack.propertyIdentifier == 'presentValue'
+
+        # a lazy decoded sequence can be encoded again
+        assert encode_ack(decode_sequence(LazyReadPropertyACK, data)) == data
+
+        with self.assertRaises(AttributeError):
+            ack.noSuchElement
+
+    def test_lazy_decode_structure(self):
+        if _debug: TestAPCISequence._debug("test_lazy_decode_structure")
+
+        result = ReadAccessResult(
+            objectIdentifier=('analogValue', 1),
+            listOfResults=[
+                ReadAccessResultElement(
+                    propertyIdentifier='presentValue',
+                    readResult=ReadAccessResultElementChoice(
+                        propertyValue=Any(Real(1.0)),
+                        ),
+                    ),
+                ],
+            )
+        data = encode_ack(ReadPropertyMultipleACK(listOfReadAccessResults=[result]))
+
+        class LazyReadPropertyMultipleACK(LazySequence, ReadPropertyMultipleACK):
+            pass
+
+        # the list is not context encoded so it is decoded normally
+        ack = decode_sequence(LazyReadPropertyMultipleACK, data)
+        assert 'listOfReadAccessResults' in ack.__dict__
+        assert ack.listOfReadAccessResults[0].objectIdentifier == ('analogValue', 1)
+
+    def test_lazy_decode_error(self):
+        if _debug: TestAPCISequence._debug("test_lazy_decode_error")
+
+        class LazyResult(LazySequence):
+            sequenceElements = \
+                [ Element('readResult', ReadAccessResultElementChoice, 0)
+                ]
+
+        # the group has a tag that is not one of the choices
+        result = LazyResult()
+        assert not result.decode_reader(TagReader(xtob('0e' '7900' '0f')), True)
+
+        # the error is not hidden by a default
+        with self.assertRaises(DecodingError):
+            getattr(result, 'readResult', None)
+        with self.assertRaises(DecodingError):
+            result.readResult
+
+        # only lazy sequences look for lazy elements
+        assert not hasattr(ReadPropertyACK, '__getattr__')
@@ -0,0 +1,11 @@
+#!/usr/bin/python
+
+"""
+Test Application
+----------------
+"""
+
+from . import test_read_property_batch
+from . import test_read_property_coalescing
+from . import test_read_property_cache
+from . import test_async_client
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Application Testing Helpers
+---------------------------
+"""
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.pdu import Address
+from bacpypes.iocb import IOCB, IOController
+from bacpypes.apdu import ReadPropertyRequest
+from bacpypes.app import DeviceInfoCache
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class RecordingController(IOController):
+
+    """Stands in for the application and keeps the requests."""
+
+    def __init__(self):
+        if _debug: RecordingController._debug("__init__")
+        IOController.__init__(self)
+
+        self.deviceInfoCache = DeviceInfoCache()
+        self.iocbs = []
+
+    def process_io(self, iocb):
+        if _debug: RecordingController._debug("process_io %r", iocb)
+
+        self.active_io(iocb)
+        self.iocbs.append(iocb)
+
+
+def read_request(objid, propid, indx=None, address="5"):
+    request = ReadPropertyRequest(
+        objectIdentifier=objid,
+        propertyIdentifier=propid,
+        propertyArrayIndex=indx,
+        )
+    request.pduDestination = Address(address)
+    return IOCB(request)
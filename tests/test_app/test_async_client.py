@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Async Client
+-----------------
+"""
+
+import asyncio
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.iocb import AwaitableIOCB
+from bacpypes.primitivedata import Real, CharacterString
+from bacpypes.constructeddata import Any
+from bacpypes.basetypes import ErrorType
+from bacpypes.apdu import ReadPropertyACK, ReadPropertyMultipleACK, \
+    ReadAccessResult, ReadAccessResultElement, ReadAccessResultElementChoice, \
+    SimpleAckPDU, Error
+from bacpypes.errors import ExecutionError, IOCBError
+from bacpypes.app import AsyncClientMixIn
+
+from ..time_machine import reset_time_machine, run_time_machine
+from .helpers import RecordingController, read_request
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class SampleApplication(RecordingController, AsyncClientMixIn):
+    pass
+
+
+@bacpypes_debugging
+class TestAsyncClient(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.app = SampleApplication()
+        reset_time_machine()
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def call(self, fn, *args, **kwargs):
+        """Call a method of the application from a coroutine, the future it
+        returns belongs to the running loop."""
+        async def caller():
+            return fn(*args, **kwargs)
+
+        return self.loop.run_until_complete(caller())
+
+    def test_read_property(self):
+        if _debug: TestAsyncClient._debug("test_read_property")
+
+        future = self.call(self.app.read_property, "5", ('analogValue', 1), 'presentValue')
+        run_time_machine(1.0)
+        iocb = self.app.iocbs[0]
+        assert not future.done()
+
+        request = iocb.args[0]
+        assert str(request.pduDestination) == "5"
+        assert request.objectIdentifier == ('analogValue', 1)
+
+        self.app.complete_io(iocb, ReadPropertyACK(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            propertyValue=Any(Real(12.5)),
+            ))
+        assert self.loop.run_until_complete(future) == 12.5
+
+    def test_read_property_multiple(self):
+        if _debug: TestAsyncClient._debug("test_read_property_multiple")
+
+        future = self.call(self.app.read_property_multiple, "5", [
+            (('analogValue', 1), ['presentValue', ('priorityArray', 0)]),
+            (('device', 5), ['objectName']),
+            ])
+        run_time_machine(1.0)
+        iocb = self.app.iocbs[0]
+        specs = iocb.args[0].listOfReadAccessSpecs
+        assert len(specs) == 2
+        assert specs[0].listOfPropertyReferences[1].propertyArrayIndex == 0
+
+        self.app.complete_io(iocb, ReadPropertyMultipleACK(listOfReadAccessResults=[
+            ReadAccessResult(objectIdentifier=('analogValue', 1), listOfResults=[
+                ReadAccessResultElement(propertyIdentifier='presentValue',
+                    readResult=ReadAccessResultElementChoice(propertyValue=Any(Real(1.0))),
+                    ),
+                ReadAccessResultElement(propertyIdentifier='priorityArray', propertyArrayIndex=0,
+                    readResult=ReadAccessResultElementChoice(propertyAccessError=ErrorType(
+                        errorClass='property', errorCode='unknownProperty',
+                        )),
+                    ),
+                ]),
+            ReadAccessResult(objectIdentifier=('device', 5), listOfResults=[
+                ReadAccessResultElement(propertyIdentifier='objectName',
+                    readResult=ReadAccessResultElementChoice(propertyValue=Any(CharacterString("dev"))),
+                    ),
+                ]),
+            ]))
+
+        values = self.loop.run_until_complete(future)
+        assert values[(('analogValue', 1), 'presentValue', None)] == 1.0
+        assert values[(('device', 5), 'objectName', None)] == "dev"
+
+        error = values[(('analogValue', 1), 'priorityArray', 0)]
+        assert isinstance(error, ExecutionError)
+        assert error.errorCode == 'unknownProperty'
+
+    def test_write_property(self):
+        if _debug: TestAsyncClient._debug("test_write_property")
+
+        future = self.call(self.app.write_property, "5", ('analogValue', 1), 'presentValue', 3.0, priority=8)
+        run_time_machine(1.0)
+        iocb = self.app.iocbs[0]
+
+        request = iocb.args[0]
+        assert request.priority == 8
+        assert request.propertyValue.cast_out(Real) == 3.0
+
+        self.app.complete_io(iocb, SimpleAckPDU())
+        assert self.loop.run_until_complete(future) is None
+
+    def test_error(self):
+        if _debug: TestAsyncClient._debug("test_error")
+
+        future = self.call(self.app.read_property, "5", ('analogValue', 1), 'presentValue')
+        run_time_machine(1.0)
+        error = Error(errorClass='object', errorCode='unknownObject')
+        self.app.abort_io(self.app.iocbs[0], error)
+
+        with self.assertRaises(IOCBError) as context:
+            self.loop.run_until_complete(future)
+        assert context.exception.ioError is error
+
+        # exceptions are raised as they are
+        future = self.call(self.app.read_property, "5", ('analogValue', 1), 'presentValue')
+        run_time_machine(1.0)
+        self.app.abort_io(self.app.iocbs[1], RuntimeError("timeout"))
+
+        with self.assertRaises(RuntimeError):
+            self.loop.run_until_complete(future)
+
+    def test_cancel(self):
+        if _debug: TestAsyncClient._debug("test_cancel")
+
+        future = self.call(self.app.read_property, "5", ('analogValue', 1), 'presentValue')
+        run_time_machine(1.0)
+        iocb = self.app.iocbs[0]
+
+        # giving up on the future aborts the request
+        future.cancel()
+        self.loop.run_until_complete(asyncio.sleep(0))
+        assert iocb.ioError is None
+
+        # the abort is deferred to the stack
+        run_time_machine(2.0)
+        assert isinstance(iocb.ioError, asyncio.CancelledError)
+
+    def test_future_loop(self):
+        if _debug: TestAsyncClient._debug("test_future_loop")
+
+        # the future needs a loop when there isn't one running
+        iocb = AwaitableIOCB(read_request(('analogValue', 1), 'presentValue').args[0])
+        with self.assertRaises(RuntimeError):
+            iocb.get_future()
+
+        future = iocb.get_future(loop=self.loop)
+        assert future.get_loop() is self.loop
+
+    def test_await(self):
+        if _debug: TestAsyncClient._debug("test_await")
+
+        iocb = AwaitableIOCB(read_request(('analogValue', 1), 'presentValue').args[0])
+        self.app.request_io(iocb)
+        task = asyncio.ensure_future(iocb)
+
+        ack = SimpleAckPDU()
+        self.app.complete_io(iocb, ack)
+        assert self.loop.run_until_complete(task) is ack
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Application IO Controller
+------------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.comm import ServiceAccessPoint, bind
+from bacpypes.pdu import Address
+from bacpypes.iocb import IOCB, ACTIVE, COMPLETED
+from bacpypes.apdu import SimpleAckPDU, WhoIsRequest, WritePropertyRequest
+from bacpypes.primitivedata import Real
+from bacpypes.constructeddata import Any
+from bacpypes.app import ApplicationIOController
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class Lower(ServiceAccessPoint):
+
+    """Stands in for the state machine access point, gives the confirmed
+    requests invoke IDs unless next_invoke_id is None and keeps them."""
+
+    def __init__(self):
+        if _debug: Lower._debug("__init__")
+        ServiceAccessPoint.__init__(self)
+
+        self.sent = []
+        self.next_invoke_id = 1
+
+    def sap_indication(self, apdu):
+        if _debug: Lower._debug("sap_indication %r", apdu)
+
+        if (self.next_invoke_id is not None) and not isinstance(apdu, WhoIsRequest):
+            apdu.apduInvokeID = self.next_invoke_id
+            self.next_invoke_id += 1
+        self.sent.append(apdu)
+
+
+def write_request():
+    request = WritePropertyRequest(
+        objectIdentifier=('analogValue', 1),
+        propertyIdentifier='presentValue',
+        propertyValue=Any(Real(1.0)),
+        )
+    request.pduDestination = Address("5")
+    return IOCB(request)
+
+
+def simple_ack(invoke_id):
+    ack = SimpleAckPDU(15, invoke_id)
+    ack.pduSource = Address("5")
+    return ack
+
+
+@bacpypes_debugging
+class TestApplicationIOController(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+
+        self.app = ApplicationIOController()
+        self.app.max_window_size = 2
+        self.app.initial_window_size = 2
+        self.lower = Lower()
+        bind(self.app, self.lower)
+
+    def test_match_invoke_id(self):
+        if _debug: TestApplicationIOController._debug("test_match_invoke_id")
+
+        iocbs = [write_request(), write_request()]
+        for iocb in iocbs:
+            self.app.request_io(iocb)
+        run_time_machine(1.0)
+        assert [apdu.apduInvokeID for apdu in self.lower.sent] == [1, 2]
+
+        # responses can come back in any order
+        self.app.confirmation(simple_ack(2))
+        assert iocbs[0].ioState == ACTIVE
+        assert iocbs[1].ioState == COMPLETED
+
+    def test_stray_response(self):
+        if _debug: TestApplicationIOController._debug("test_stray_response")
+
+        iocb = write_request()
+        self.app.request_io(iocb)
+        run_time_machine(1.0)
+
+        # a response for some other request is dropped
+        self.app.confirmation(simple_ack(9))
+        assert iocb.ioState == ACTIVE
+
+        self.app.confirmation(simple_ack(1))
+        assert iocb.ioState == COMPLETED
+        assert not self.app.queue_by_address
+
+        # even when the request does not have an invoke ID
+        self.lower.next_invoke_id = None
+        iocb = write_request()
+        self.app.request_io(iocb)
+        run_time_machine(1.0)
+
+        self.app.confirmation(simple_ack(1))
+        assert iocb.ioState == ACTIVE
+
+    def test_unconfirmed(self):
+        if _debug: TestApplicationIOController._debug("test_unconfirmed")
+
+        confirmed = write_request()
+        self.app.request_io(confirmed)
+
+        request = WhoIsRequest()
+        request.pduDestination = Address("5")
+        unconfirmed = IOCB(request)
+        self.app.request_io(unconfirmed)
+        run_time_machine(1.0)
+
+        # the unconfirmed request is complete when it is sent
+        assert unconfirmed.ioState == COMPLETED
+        assert confirmed.ioState == ACTIVE
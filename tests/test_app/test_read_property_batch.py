@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test ReadProperty Batching
+--------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.pdu import Address
+from bacpypes.iocb import IOCB, COMPLETED, ABORTED
+from bacpypes.primitivedata import Real, CharacterString
+from bacpypes.constructeddata import Any
+from bacpypes.basetypes import ErrorType
+from bacpypes.apdu import ReadPropertyACK, \
+    ReadPropertyMultipleRequest, ReadPropertyMultipleACK, ReadAccessResult, \
+    ReadAccessResultElement, ReadAccessResultElementChoice, RejectPDU, \
+    RejectReason, WritePropertyRequest, Error
+from bacpypes.app import ReadPropertyBatchController
+
+from ..time_machine import reset_time_machine, run_time_machine
+from .helpers import RecordingController, read_request
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def read_result(objid, *elements):
+    return ReadAccessResult(
+        objectIdentifier=objid,
+        listOfResults=[
+            ReadAccessResultElement(
+                propertyIdentifier=propid,
+                readResult=ReadAccessResultElementChoice(**{choice: value}),
+                )
+            for propid, choice, value in elements
+            ],
+        )
+
+
+@bacpypes_debugging
+class TestReadPropertyBatchController(unittest.TestCase):
+
+    def setUp(self):
+        self.app = RecordingController()
+        self.batcher = ReadPropertyBatchController(self.app)
+        reset_time_machine()
+
+    def test_batch(self):
+        if _debug: TestReadPropertyBatchController._debug("test_batch")
+
+        iocbs = [
+            read_request(('analogValue', 1), 'presentValue'),
+            read_request(('analogValue', 1), 'objectName'),
+            read_request(('analogValue', 2), 'presentValue'),
+            read_request(('analogValue', 2), 'presentValue'),
+            read_request(('analogValue', 3), 'presentValue'),
+            ]
+        for iocb in iocbs:
+            self.batcher.request_io(iocb)
+        assert not self.app.iocbs
+
+        # one request for all of them
+        run_time_machine(1.0)
+        assert len(self.app.iocbs) == 1
+        rpm = self.app.iocbs[0].args[0]
+        assert isinstance(rpm, ReadPropertyMultipleRequest)
+        assert [len(spec.listOfPropertyReferences) for spec in rpm.listOfReadAccessSpecs] == [2, 1, 1]
+
+        # the device answers
+        ack = ReadPropertyMultipleACK(listOfReadAccessResults=[
+            read_result(('analogValue', 1),
+                ('presentValue', 'propertyValue', Any(Real(1.0))),
+                ('objectName', 'propertyValue', Any(CharacterString("one"))),
+                ),
+            read_result(('analogValue', 2),
+                ('presentValue', 'propertyValue', Any(Real(2.0))),
+                ),
+            read_result(('analogValue', 3),
+                ('presentValue', 'propertyAccessError', ErrorType(errorClass='object', errorCode='unknownObject')),
+                ),
+            ])
+        self.app.iocbs[0].complete(ack)
+
+        # everybody gets their own answer
+        assert [iocb.ioState for iocb in iocbs] == [COMPLETED] * 4 + [ABORTED]
+        assert isinstance(iocbs[0].ioResponse, ReadPropertyACK)
+        assert iocbs[0].ioResponse.propertyValue.cast_out(Real) == 1.0
+        assert iocbs[1].ioResponse.propertyValue.cast_out(CharacterString) == "one"
+        assert iocbs[2].ioResponse.propertyValue.cast_out(Real) == 2.0
+        assert iocbs[3].ioResponse.propertyValue.cast_out(Real) == 2.0
+        assert isinstance(iocbs[4].ioError, Error)
+        assert iocbs[4].ioError.errorCode == 'unknownObject'
+        assert iocbs[4].ioError.pduSource == Address("5")
+
+    def test_size(self):
+        if _debug: TestReadPropertyBatchController._debug("test_size")
+
+        # a small device
+        info = self.app.deviceInfoCache.get_device_info(Address("5"))
+        info.maxApduLengthAccepted = 50
+
+        for i in range(6):
+            self.batcher.request_io(read_request(('analogValue', i), 'presentValue'))
+
+        # each property is 24 bytes after the 3 byte header, one at a time
+        run_time_machine(1.0)
+        assert len(self.app.iocbs) == 6
+
+        # a bigger one
+        info.maxApduLengthAccepted = 100
+        for i in range(6):
+            self.batcher.request_io(read_request(('analogValue', i), 'presentValue'))
+
+        run_time_machine(2.0)
+        assert [len(iocb.args[0].listOfReadAccessSpecs) for iocb in self.app.iocbs[6:]] == [4, 2]
+
+    def test_pass_through(self):
+        if _debug: TestReadPropertyBatchController._debug("test_pass_through")
+
+        # a single read goes by itself
+        iocb = read_request(('analogValue', 1), 'presentValue')
+        self.batcher.request_io(iocb)
+        run_time_machine(1.0)
+        assert self.app.iocbs == [iocb]
+
+        # other requests go straight through
+        request = WritePropertyRequest()
+        request.pduDestination = Address("5")
+        iocb = IOCB(request)
+        self.batcher.request_io(iocb)
+        assert self.app.iocbs[-1] is iocb
+
+    def test_reject(self):
+        if _debug: TestReadPropertyBatchController._debug("test_reject")
+
+        iocbs = [read_request(('analogValue', i), 'presentValue') for i in range(2)]
+        for iocb in iocbs:
+            self.batcher.request_io(iocb)
+        run_time_machine(1.0)
+
+        # the device does not know about RPM
+        reject = RejectPDU(reason=RejectReason.unrecognizedService)
+        self.app.iocbs[0].abort(reject)
+
+        # sent by themselves
+        assert self.app.iocbs[1:] == iocbs
+        assert Address("5") in self.batcher.single_reads
+
+        # and from now on
+        iocbs = [read_request(('analogValue', i), 'presentValue') for i in range(2)]
+        for iocb in iocbs:
+            self.batcher.request_io(iocb)
+        assert self.app.iocbs[3:] == iocbs
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test ReadProperty Cache
+-----------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.pdu import Address
+from bacpypes.task import FunctionTask
+from bacpypes.iocb import IOCB, COMPLETED
+from bacpypes.primitivedata import Real
+from bacpypes.constructeddata import Any
+from bacpypes.basetypes import PropertyReference, PropertyValue
+from bacpypes.apdu import ReadPropertyACK, ReadPropertyMultipleRequest, \
+    ReadPropertyMultipleACK, ReadAccessSpecification, WritePropertyRequest, \
+    WritePropertyMultipleRequest, WriteAccessSpecification, \
+    ConfirmedCOVNotificationRequest, UnconfirmedCOVNotificationRequest, \
+    SimpleAckPDU
+from bacpypes.app import Application, ReadPropertyCacheController, \
+    ReadPropertyCacheCOVMixIn
+
+from ..time_machine import reset_time_machine, run_time_machine
+from .helpers import RecordingController, read_request
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def read_ack(iocb, value):
+    request = iocb.args[0]
+    return ReadPropertyACK(
+        objectIdentifier=request.objectIdentifier,
+        propertyIdentifier=request.propertyIdentifier,
+        propertyArrayIndex=request.propertyArrayIndex,
+        propertyValue=Any(Real(value)),
+        )
+
+
+@bacpypes_debugging
+class TestReadPropertyCacheController(unittest.TestCase):
+
+    def setUp(self):
+        self.app = RecordingController()
+        self.cache = ReadPropertyCacheController(self.app)
+        self.cache.property_ttl = {'objectName': 0}
+        reset_time_machine()
+
+    def read(self, *args, **kwargs):
+        iocb = read_request(*args, **kwargs)
+        self.cache.request_io(iocb)
+        return iocb
+
+    def test_read_through(self):
+        if _debug: TestReadPropertyCacheController._debug("test_read_through")
+
+        # first one goes to the device
+        iocb = self.read(('analogValue', 1), 'presentValue')
+        assert self.app.iocbs == [iocb]
+        iocb.complete(read_ack(iocb, 1.0))
+
+        # second one does not
+        iocb = self.read(('analogValue', 1), 'presentValue')
+        assert len(self.app.iocbs) == 1
+        assert iocb.ioState == COMPLETED
+        assert iocb.ioResponse.propertyValue.cast_out(Real) == 1.0
+        assert iocb.ioResponse.pduSource == Address("5")
+        assert (self.cache.hit_count, self.cache.miss_count) == (1, 1)
+
+        # until it expires
+        FunctionTask(lambda: None).install_task(delta=10.0)
+        run_time_machine(20.0)
+        iocb = self.read(('analogValue', 1), 'presentValue')
+        assert len(self.app.iocbs) == 2
+
+        # some properties are not kept
+        iocb = self.read(('analogValue', 1), 'objectName')
+        iocb.complete(read_ack(iocb, 2.0))
+        assert not self.cache.cache.get((Address("5"), ('analogValue', 1), 'objectName', None))
+
+    def test_lru(self):
+        if _debug: TestReadPropertyCacheController._debug("test_lru")
+
+        self.cache.max_entries = 2
+        for i in range(3):
+            iocb = self.read(('analogValue', i), 'presentValue')
+            iocb.complete(read_ack(iocb, i))
+
+            # keep the first one fresh
+            self.read(('analogValue', 0), 'presentValue')
+
+        assert [key[1] for key in self.cache.cache] == [('analogValue', 2), ('analogValue', 0)]
+
+    def test_rpm(self):
+        if _debug: TestReadPropertyCacheController._debug("test_rpm")
+
+        for i in range(2):
+            iocb = self.read(('analogValue', i), 'presentValue')
+            iocb.complete(read_ack(iocb, i))
+
+        # everything is known
+        request = ReadPropertyMultipleRequest(listOfReadAccessSpecs=[
+            ReadAccessSpecification(
+                objectIdentifier=('analogValue', i),
+                listOfPropertyReferences=[PropertyReference(propertyIdentifier='presentValue')],
+                )
+            for i in range(2)
+            ])
+        request.pduDestination = Address("5")
+        iocb = IOCB(request)
+        self.cache.request_io(iocb)
+
+        assert len(self.app.iocbs) == 2
+        assert isinstance(iocb.ioResponse, ReadPropertyMultipleACK)
+        results = iocb.ioResponse.listOfReadAccessResults
+        assert [result.listOfResults[0].readResult.propertyValue.cast_out(Real) for result in results] == [0.0, 1.0]
+
+        # something is not
+        request.listOfReadAccessSpecs[0].listOfPropertyReferences.append(
+            PropertyReference(propertyIdentifier='description'))
+        iocb = IOCB(request)
+        self.cache.request_io(iocb)
+        assert self.app.iocbs[-1] is iocb
+
+    def test_write_cov(self):
+        if _debug: TestReadPropertyCacheController._debug("test_write_cov")
+
+        iocb = self.read(('analogValue', 1), 'presentValue')
+        iocb.complete(read_ack(iocb, 1.0))
+
+        # a change of value notification refreshes it
+        cov = UnconfirmedCOVNotificationRequest(
+            monitoredObjectIdentifier=('analogValue', 1),
+            listOfValues=[PropertyValue(propertyIdentifier='presentValue', value=Any(Real(2.0)))],
+            )
+        cov.pduSource = Address("5")
+        self.cache.cov_notification(cov)
+
+        iocb = self.read(('analogValue', 1), 'presentValue')
+        assert iocb.ioResponse.propertyValue.cast_out(Real) == 2.0
+
+        # writing forgets it
+        request = WritePropertyRequest(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            propertyValue=Any(Real(3.0)),
+            )
+        request.pduDestination = Address("5")
+        self.cache.request_io(IOCB(request))
+        assert not self.cache.cache
+
+    def write(self, objid, propid, indx=None):
+        request = WritePropertyRequest(
+            objectIdentifier=objid,
+            propertyIdentifier=propid,
+            propertyArrayIndex=indx,
+            propertyValue=Any(Real(0.0)),
+            )
+        request.pduDestination = Address("5")
+        self.cache.request_io(IOCB(request))
+
+    def test_write_array(self):
+        if _debug: TestReadPropertyCacheController._debug("test_write_array")
+
+        for indx in (None, 0, 1, 2):
+            iocb = self.read(('analogValue', 1), 'priorityArray', indx)
+            iocb.complete(read_ack(iocb, 1.0))
+        assert len(self.cache.cache) == 4
+
+        # writing an element forgets it and the whole array
+        self.write(('analogValue', 1), 'priorityArray', 1)
+        assert sorted(key[3] for key in self.cache.cache) == [0, 2]
+
+        # writing the length forgets the elements
+        self.write(('analogValue', 1), 'priorityArray', 0)
+        assert not self.cache.cache
+
+    def test_write_property_multiple(self):
+        if _debug: TestReadPropertyCacheController._debug("test_write_property_multiple")
+
+        for propid in ('presentValue', 'description', 'units'):
+            iocb = self.read(('analogValue', 1), propid)
+            iocb.complete(read_ack(iocb, 1.0))
+
+        request = WritePropertyMultipleRequest(listOfWriteAccessSpecs=[
+            WriteAccessSpecification(
+                objectIdentifier=('analogValue', 1),
+                listOfProperties=[
+                    PropertyValue(propertyIdentifier='presentValue', value=Any(Real(2.0))),
+                    PropertyValue(propertyIdentifier='units', value=Any(Real(3.0))),
+                    ],
+                ),
+            ])
+        request.pduDestination = Address("5")
+        iocb = IOCB(request)
+        self.cache.request_io(iocb)
+
+        # passed through and the values are forgotten
+        assert self.app.iocbs[-1] is iocb
+        assert [key[2] for key in self.cache.cache] == ['description']
+
+    def test_application_cov(self):
+        if _debug: TestReadPropertyCacheController._debug("test_application_cov")
+
+        class CachingApplication(ReadPropertyCacheCOVMixIn, Application):
+
+            def __init__(self):
+                Application.__init__(self)
+                self.responses = []
+
+            def response(self, apdu):
+                self.responses.append(apdu)
+
+        app = CachingApplication()
+        app.readPropertyCache = self.cache
+
+        iocb = self.read(('analogValue', 1), 'presentValue')
+        iocb.complete(read_ack(iocb, 1.0))
+
+        # the application passes the notification to the cache
+        cov = UnconfirmedCOVNotificationRequest(
+            monitoredObjectIdentifier=('analogValue', 1),
+            listOfValues=[PropertyValue(propertyIdentifier='presentValue', value=Any(Real(2.0)))],
+            )
+        cov.pduSource = Address("5")
+        app.indication(cov)
+
+        iocb = self.read(('analogValue', 1), 'presentValue')
+        assert iocb.ioResponse.propertyValue.cast_out(Real) == 2.0
+
+        # confirmed ones are acknowledged
+        cov = ConfirmedCOVNotificationRequest(
+            subscriberProcessIdentifier=1,
+            initiatingDeviceIdentifier=('device', 5),
+            monitoredObjectIdentifier=('analogValue', 1),
+            timeRemaining=60,
+            listOfValues=[PropertyValue(propertyIdentifier='presentValue', value=Any(Real(3.0)))],
+            )
+        cov.pduSource = Address("5")
+        cov.apduInvokeID = 7
+        app.indication(cov)
+
+        iocb = self.read(('analogValue', 1), 'presentValue')
+        assert iocb.ioResponse.propertyValue.cast_out(Real) == 3.0
+        assert len(app.responses) == 1
+        assert isinstance(app.responses[0], SimpleAckPDU)
+        assert app.responses[0].apduInvokeID == 7
+        assert app.responses[0].pduDestination == Address("5")
+
+    def test_values_not_shared(self):
+        if _debug: TestReadPropertyCacheController._debug("test_values_not_shared")
+
+        iocb = self.read(('analogValue', 1), 'presentValue')
+        iocb.complete(read_ack(iocb, 1.0))
+
+        # changing one answer does not change the next one
+        iocb1 = self.read(('analogValue', 1), 'presentValue')
+        value1 = iocb1.ioResponse.propertyValue
+        value1.tagList.Pop()
+        value1.cast_in(Real(5.0))
+
+        iocb2 = self.read(('analogValue', 1), 'presentValue')
+        value2 = iocb2.ioResponse.propertyValue
+        assert value2 is not value1
+        assert value2.cast_out(Real) == 1.0
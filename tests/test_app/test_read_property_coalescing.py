@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test ReadProperty Coalescing
+----------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.iocb import COMPLETED, ABORTED
+from bacpypes.primitivedata import Real
+from bacpypes.constructeddata import Any
+from bacpypes.apdu import ReadPropertyACK, AbortPDU, AbortReason
+from bacpypes.app import ReadPropertyCoalescingController
+
+from .helpers import RecordingController, read_request
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestReadPropertyCoalescingController(unittest.TestCase):
+
+    def setUp(self):
+        self.app = RecordingController()
+        self.coalescer = ReadPropertyCoalescingController(self.app)
+
+    def test_same_read(self):
+        if _debug: TestReadPropertyCoalescingController._debug("test_same_read")
+
+        iocbs = [
+            read_request(('analogValue', 1), 'presentValue'),
+            read_request(('analogValue', 1), 'presentValue'),
+            read_request(('analogValue', 1), 'presentValue', address="6"),
+            read_request(('analogValue', 1), 'presentValue', 1),
+            ]
+        for iocb in iocbs:
+            self.coalescer.request_io(iocb)
+
+        # the second one is the same as the first
+        assert len(self.app.iocbs) == 3
+        assert self.coalescer.coalesced_count == 1
+
+        ack = ReadPropertyACK(
+            objectIdentifier=('analogValue', 1),
+            propertyIdentifier='presentValue',
+            propertyValue=Any(Real(1.0)),
+            )
+        self.app.iocbs[0].complete(ack)
+        assert iocbs[0].ioResponse.propertyValue.cast_out(Real) == 1.0
+        assert iocbs[1].ioResponse.propertyValue.cast_out(Real) == 1.0
+        assert len(self.coalescer.in_flight) == 2
+
+        # each one has an acknowledgement of its own
+        assert iocbs[0].ioResponse is not iocbs[1].ioResponse
+        assert iocbs[0].ioResponse.propertyValue is not iocbs[1].ioResponse.propertyValue
+        iocbs[0].ioResponse.propertyValue.tagList.Pop()
+        assert iocbs[1].ioResponse.propertyValue.cast_out(Real) == 1.0
+
+        # a new one goes out again
+        iocb = read_request(('analogValue', 1), 'presentValue')
+        self.coalescer.request_io(iocb)
+        assert len(self.app.iocbs) == 4
+
+    def test_client_abort(self):
+        if _debug: TestReadPropertyCoalescingController._debug("test_client_abort")
+
+        iocbs = [read_request(('analogValue', 1), 'presentValue') for i in range(2)]
+        for iocb in iocbs:
+            self.coalescer.request_io(iocb)
+
+        # the first one gives up, the request is still out there
+        iocbs[0].abort(RuntimeError("timeout"))
+        assert self.app.iocbs[0].ioState != ABORTED
+
+        self.app.iocbs[0].complete("ack")
+        assert iocbs[0].ioState == ABORTED
+        assert iocbs[1].ioState == COMPLETED
+        assert iocbs[1].ioResponse == "ack"
+
+    def test_all_abort(self):
+        if _debug: TestReadPropertyCoalescingController._debug("test_all_abort")
+
+        iocbs = [read_request(('analogValue', 1), 'presentValue') for i in range(2)]
+        for iocb in iocbs:
+            self.coalescer.request_io(iocb)
+
+        # when everyone gives up so does the request
+        error = RuntimeError("timeout")
+        iocbs[0].abort(error)
+        iocbs[1].abort(error)
+        assert self.app.iocbs[0].ioState == ABORTED
+        assert self.app.iocbs[0].ioError is error
+        assert not self.coalescer.in_flight
+
+        # the next one goes out again
+        iocb = read_request(('analogValue', 1), 'presentValue')
+        self.coalescer.request_io(iocb)
+        assert len(self.app.iocbs) == 2
+
+    def test_request_abort(self):
+        if _debug: TestReadPropertyCoalescingController._debug("test_request_abort")
+
+        iocbs = [read_request(('analogValue', 1), 'presentValue') for i in range(2)]
+        for iocb in iocbs:
+            self.coalescer.request_io(iocb)
+
+        # the device does not answer
+        abort = AbortPDU(False, 1, AbortReason.noResponse)
+        self.app.iocbs[0].abort(abort)
+        assert [iocb.ioError for iocb in iocbs] == [abort, abort]
+        assert not self.coalescer.in_flight
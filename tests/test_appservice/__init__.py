@@ -0,0 +1,13 @@
+#!/usr/bin/python
+
+"""
+Test Application Service
+------------------------
+"""
+
+from . import test_invoke_id
+from . import test_retry_timeout
+from . import test_segment_window
+from . import test_segmentation
+from . import test_response_cache
+from . import test_admission
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Server Transaction Admission
+---------------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.comm import Server, ApplicationServiceElement, bind
+from bacpypes.pdu import Address
+from bacpypes.apdu import APDU, AbortPDU, AbortReason, ConfirmedRequestPDU, \
+    SimpleAckPDU
+from bacpypes.app import DeviceInfoCache
+from bacpypes.appservice import StateMachineAccessPoint
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class Lower(Server):
+
+    def __init__(self):
+        Server.__init__(self)
+        self.sent = []
+
+    def indication(self, pdu):
+        self.sent.append(pdu)
+
+
+class Holder(ApplicationServiceElement):
+
+    """Keeps the requests until they are answered."""
+
+    def __init__(self):
+        ApplicationServiceElement.__init__(self)
+        self.requests = []
+
+    def indication(self, apdu):
+        self.requests.append(apdu)
+
+    def answer(self):
+        apdu = self.requests.pop(0)
+
+        ack = SimpleAckPDU(apdu.apduService, apdu.apduInvokeID)
+        ack.pduDestination = apdu.pduSource
+        self.response(ack)
+
+
+def confirmed_request(source, invoke_id):
+    """Return an encoded confirmed request."""
+    request = ConfirmedRequestPDU(15)
+    request.apduInvokeID = invoke_id
+
+    pdu = APDU()
+    request.encode(pdu)
+    pdu.pduSource = Address(source)
+
+    return pdu
+
+
+@bacpypes_debugging
+class TestAdmission(unittest.TestCase):
+
+    def setUp(self):
+        self.sap = StateMachineAccessPoint(deviceInfoCache=DeviceInfoCache())
+        self.ase = Holder()
+        self.lower = Lower()
+        bind(self.ase, self.sap, self.lower)
+        reset_time_machine()
+
+    def tearDown(self):
+        # the transactions still waiting for the application have timers
+        for tr in list(self.sap.serverTransactions.values()):
+            tr.stop_timer()
+
+    def test_unlimited(self):
+        if _debug: TestAdmission._debug("test_unlimited")
+
+        for invoke_id in range(10):
+            self.sap.confirmation(confirmed_request("5", invoke_id))
+        assert len(self.ase.requests) == 10
+        assert self.sap.requestsAdmitted == 10
+        assert self.sap.peakServerTransactions == 10
+
+    def test_queued(self):
+        if _debug: TestAdmission._debug("test_queued")
+
+        self.sap.maxServerTransactions = 2
+        self.sap.maxQueuedRequests = 1
+
+        for invoke_id in range(4):
+            self.sap.confirmation(confirmed_request("5", invoke_id))
+
+        # two running, one waiting, one aborted
+        assert len(self.ase.requests) == 2
+        assert list(self.sap.queuedRequests) == [(Address("5"), 2)]
+        assert self.sap.requestsShed == 1
+
+        abort = self.lower.sent[0]
+        assert isinstance(abort, AbortPDU)
+        assert abort.apduInvokeID == 3
+        assert abort.apduAbortRejectReason == AbortReason.outOfResources
+
+        # a retransmission while waiting is ignored
+        self.sap.confirmation(confirmed_request("5", 2))
+        assert len(self.sap.queuedRequests) == 1
+
+        # finishing one starts the next
+        self.ase.answer()
+        run_time_machine(1.0)
+        assert len(self.ase.requests) == 2
+        assert self.ase.requests[1].apduInvokeID == 2
+        assert not self.sap.queuedRequests
+
+        assert (self.sap.requestsAdmitted, self.sap.requestsQueued, self.sap.requestsShed) == (3, 1, 1)
+        assert self.sap.peakServerTransactions == 2
+
+    def test_per_peer(self):
+        if _debug: TestAdmission._debug("test_per_peer")
+
+        self.sap.maxServerTransactionsPerPeer = 2
+        for invoke_id in range(3):
+            self.sap.confirmation(confirmed_request("5", invoke_id))
+
+        # the third from the same device is aborted, others are fine
+        assert self.sap.requestsShed == 1
+        self.sap.confirmation(confirmed_request("6", 0))
+        assert len(self.ase.requests) == 3
+
+        # room again after one is answered
+        self.ase.answer()
+        self.sap.confirmation(confirmed_request("5", 3))
+        assert len(self.ase.requests) == 3
+        assert self.sap.peerTransactions == {Address("5"): 2, Address("6"): 1}
+
+    def test_stale(self):
+        if _debug: TestAdmission._debug("test_stale")
+
+        self.sap.maxServerTransactions = 1
+        self.sap.maxQueuedRequests = 1
+
+        self.sap.confirmation(confirmed_request("5", 0))
+        self.sap.confirmation(confirmed_request("6", 0))
+        assert list(self.sap.queuedRequests) == [(Address("6"), 0)]
+
+        # waited longer than the client would, room for another
+        run_time_machine(4.0)
+        self.sap.confirmation(confirmed_request("7", 0))
+        assert list(self.sap.queuedRequests) == [(Address("7"), 0)]
+        assert (self.sap.requestsDropped, self.sap.requestsShed) == (1, 0)
+        assert Address("6") not in self.sap.peerTransactions
+
+        # a retransmission keeps it waiting
+        run_time_machine(6.0)
+        self.sap.confirmation(confirmed_request("7", 0))
+        run_time_machine(8.0)
+        self.ase.answer()
+        run_time_machine(9.0)
+        assert [apdu.pduSource for apdu in self.ase.requests] == [Address("7")]
+
+    def test_cached_response(self):
+        if _debug: TestAdmission._debug("test_cached_response")
+
+        self.sap.responseCacheTime = 10000
+        self.sap.maxServerTransactions = 1
+
+        self.sap.confirmation(confirmed_request("5", 0))
+        self.ase.answer()
+        self.sap.confirmation(confirmed_request("5", 1))
+
+        # answered again while the other request is running
+        self.sap.confirmation(confirmed_request("5", 0))
+        assert self.sap.requestsShed == 0
+        assert [apdu.apduInvokeID for apdu in self.lower.sent] == [0, 0]
+        assert isinstance(self.lower.sent[1], SimpleAckPDU)
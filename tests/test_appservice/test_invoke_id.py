@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Invoke ID Allocation
+-------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.pdu import Address
+from bacpypes.appservice import InvokeIDAllocator
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestInvokeIDAllocator(unittest.TestCase):
+
+    def test_per_peer(self):
+        if _debug: TestInvokeIDAllocator._debug("test_per_peer")
+
+        allocator = InvokeIDAllocator()
+        addr1 = Address("1")
+        addr2 = Address("2")
+
+        # each peer starts somewhere different
+        assert allocator.allocate(addr1) == 1
+        allocator.reserve(addr1, 1)
+        assert allocator.allocate(addr1) == 2
+        allocator.reserve(addr1, 2)
+        assert allocator.allocate(addr2) == 2
+
+        # equal addresses share the space
+        assert allocator.allocate(Address("1")) == 3
+
+    def test_exhausted(self):
+        if _debug: TestInvokeIDAllocator._debug("test_exhausted")
+
+        allocator = InvokeIDAllocator()
+        addr = Address("1")
+
+        invoke_ids = set()
+        for i in range(256):
+            invoke_id = allocator.allocate(addr)
+            allocator.reserve(addr, invoke_id)
+            invoke_ids.add(invoke_id)
+        assert invoke_ids == set(range(256))
+
+        with self.assertRaises(RuntimeError):
+            allocator.allocate(addr)
+        with self.assertRaises(RuntimeError):
+            allocator.reserve(addr, 10)
+
+        # released IDs come back last
+        allocator.release(addr, 10)
+        assert allocator.allocate(addr) == 10
+
+    def test_unused(self):
+        if _debug: TestInvokeIDAllocator._debug("test_unused")
+
+        allocator = InvokeIDAllocator()
+        addr = Address("1")
+
+        # IDs that are handed out but never reserved are not lost
+        for i in range(300):
+            allocator.allocate(addr)
+        assert not allocator.peers
+
+        allocator.reserve(addr, 5)
+        for i in range(300):
+            assert allocator.allocate(addr) != 5
+        allocator.release(addr, 5)
+        assert not allocator.peers
+
+    def test_reserve_release(self):
+        if _debug: TestInvokeIDAllocator._debug("test_reserve_release")
+
+        allocator = InvokeIDAllocator()
+        addr = Address("1")
+
+        # a reserved ID is not handed out, the next ones follow it
+        allocator.reserve(addr, 1)
+        assert allocator.allocate(addr) == 2
+        allocator.reserve(addr, 2)
+
+        # the peer is forgotten when everything is released
+        allocator.release(addr, 1)
+        allocator.release(addr, 2)
+        assert not allocator.peers
+
+        # releasing again is harmless
+        allocator.release(addr, 2)
+        assert not allocator.peers
+
+        allocator.reserve(addr, 3)
+        allocator.release(addr, 3)
+        allocator.release(addr, 3)
+        assert not allocator.peers
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Server Response Cache
+--------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+
+from bacpypes.comm import Server, ApplicationServiceElement, bind
+from bacpypes.pdu import Address
+from bacpypes.apdu import APDU, ConfirmedRequestPDU, SimpleAckPDU
+from bacpypes.app import DeviceInfoCache
+from bacpypes.appservice import StateMachineAccessPoint
+from bacpypes.task import FunctionTask
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class Lower(Server):
+
+    def __init__(self):
+        Server.__init__(self)
+        self.sent = []
+
+    def indication(self, pdu):
+        self.sent.append(pdu)
+
+
+class Responder(ApplicationServiceElement):
+
+    def __init__(self):
+        ApplicationServiceElement.__init__(self)
+        self.requests = []
+
+    def indication(self, apdu):
+        self.requests.append(apdu)
+
+        ack = SimpleAckPDU(apdu.apduService, apdu.apduInvokeID)
+        ack.pduDestination = apdu.pduSource
+        self.response(ack)
+
+
+def confirmed_request(invoke_id, data):
+    """Return an encoded confirmed request from device 5."""
+    request = ConfirmedRequestPDU(15)
+    request.apduInvokeID = invoke_id
+    request.pduData = bytearray(data)
+
+    pdu = APDU()
+    request.encode(pdu)
+    pdu.pduSource = Address("5")
+
+    return pdu
+
+
+@bacpypes_debugging
+class TestResponseCache(unittest.TestCase):
+
+    def setup_sap(self, cache_time):
+        sap = StateMachineAccessPoint(deviceInfoCache=DeviceInfoCache())
+        sap.responseCacheTime = cache_time
+
+        self.ase = Responder()
+        self.lower = Lower()
+        bind(self.ase, sap, self.lower)
+
+        return sap
+
+    def test_disabled(self):
+        if _debug: TestResponseCache._debug("test_disabled")
+
+        sap = self.setup_sap(0)
+
+        # the application answers every time
+        sap.confirmation(confirmed_request(3, xtob('0102')))
+        sap.confirmation(confirmed_request(3, xtob('0102')))
+        assert len(self.ase.requests) == 2
+        assert len(self.lower.sent) == 2
+        assert not sap.responseCache
+
+    def test_retransmission(self):
+        if _debug: TestResponseCache._debug("test_retransmission")
+
+        sap = self.setup_sap(1000)
+
+        sap.confirmation(confirmed_request(3, xtob('0102')))
+        sap.confirmation(confirmed_request(3, xtob('0102')))
+
+        # answered twice, but the application only saw it once
+        assert len(self.ase.requests) == 1
+        assert len(self.lower.sent) == 2
+        assert self.lower.sent[1].apduInvokeID == 3
+        assert self.lower.sent[1].pduDestination == Address("5")
+
+        # a new copy of the response each time
+        assert self.lower.sent[1] is not self.lower.sent[0]
+        assert isinstance(self.lower.sent[1], SimpleAckPDU)
+        assert self.lower.sent[1].apduService == 15
+
+    def test_no_refresh(self):
+        if _debug: TestResponseCache._debug("test_no_refresh")
+
+        sap = self.setup_sap(1000)
+
+        sap.confirmation(confirmed_request(3, xtob('0102')))
+        expires, fingerprint, response = sap.responseCache[(Address("5"), 3)]
+        assert isinstance(response, bytes)
+
+        # answering again does not change the entry
+        sap.confirmation(confirmed_request(3, xtob('0102')))
+        assert sap.responseCache[(Address("5"), 3)] == (expires, fingerprint, response)
+
+    def test_expired(self):
+        if _debug: TestResponseCache._debug("test_expired")
+
+        reset_time_machine()
+        sap = self.setup_sap(1000)
+
+        # something for the time machine to move the clock toward
+        FunctionTask(lambda: None).install_task(delta=10.0)
+
+        # still cached before the cache time is up
+        sap.confirmation(confirmed_request(3, xtob('0102')))
+        run_time_machine(0.5)
+        sap.confirmation(confirmed_request(3, xtob('0102')))
+        assert len(self.ase.requests) == 1
+
+        # the application answers again after it
+        run_time_machine(1.5)
+        sap.confirmation(confirmed_request(3, xtob('0102')))
+        assert len(self.ase.requests) == 2
+        assert len(self.lower.sent) == 3
+
+    def test_different_request(self):
+        if _debug: TestResponseCache._debug("test_different_request")
+
+        sap = self.setup_sap(1000)
+
+        # same invoke ID, something else
+        sap.confirmation(confirmed_request(3, xtob('0102')))
+        sap.confirmation(confirmed_request(3, xtob('0103')))
+        assert len(self.ase.requests) == 2
+
+    def test_limit(self):
+        if _debug: TestResponseCache._debug("test_limit")
+
+        sap = self.setup_sap(1000)
+        sap.maxCachedResponses = 2
+
+        for invoke_id in range(4):
+            sap.confirmation(confirmed_request(invoke_id, xtob('01')))
+        assert list(sap.responseCache) == [(Address("5"), 2), (Address("5"), 3)]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Adaptive Retry Timeout
+---------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.comm import Server, ApplicationServiceElement, bind
+from bacpypes.pdu import Address
+from bacpypes.apdu import APDU, ConfirmedRequestPDU, SimpleAckPDU
+from bacpypes.app import DeviceInfo, DeviceInfoCache
+from bacpypes.appservice import StateMachineAccessPoint
+
+from ..time_machine import reset_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestRetryTimeout(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+
+    def test_estimate(self):
+        if _debug: TestRetryTimeout._debug("test_estimate")
+
+        sap = StateMachineAccessPoint()
+        info = DeviceInfo()
+
+        # nothing known, or not enabled
+        assert sap.get_retry_timeout(info) == 3000
+        sap.update_round_trip_time(info, 20.0)
+        assert (info.smoothedRoundTripTime, info.roundTripTimeVariance) == (20.0, 10.0)
+        assert sap.get_retry_timeout(info) == 3000
+
+        # fast device, the minimum
+        sap.adaptiveRetryTimeout = True
+        assert sap.get_retry_timeout(info) == 100
+
+        # slower
+        sap.update_round_trip_time(info, 900.0)
+        assert info.smoothedRoundTripTime == 130.0
+        assert info.roundTripTimeVariance == 227.5
+        assert sap.get_retry_timeout(info) == 1040
+
+        # backing off, up to the maximum
+        assert sap.get_retry_timeout(info, 1) == 2080
+        assert sap.get_retry_timeout(info, 4) == 10000
+
+    def test_bad_sample(self):
+        if _debug: TestRetryTimeout._debug("test_bad_sample")
+
+        sap = StateMachineAccessPoint()
+        sap.adaptiveRetryTimeout = True
+        info = DeviceInfo()
+
+        # the clock went backwards
+        sap.update_round_trip_time(info, -500.0)
+        assert info.smoothedRoundTripTime == 0.0
+
+        # one huge sample is no more than the maximum
+        sap.update_round_trip_time(info, 1e9)
+        assert info.smoothedRoundTripTime == 1250.0
+        assert sap.get_retry_timeout(info) == 10000
+
+    def test_transaction(self):
+        if _debug: TestRetryTimeout._debug("test_transaction")
+
+        sent = []
+
+        class Lower(Server):
+            def indication(self, pdu):
+                sent.append(pdu)
+
+        sap = StateMachineAccessPoint(deviceInfoCache=DeviceInfoCache())
+        ase = ApplicationServiceElement()
+        bind(ase, sap, Lower())
+
+        # send a request and answer it
+        request = ConfirmedRequestPDU(12)
+        request.pduDestination = Address("5")
+        ase.request(request)
+
+        ack = SimpleAckPDU(12, sent[0].apduInvokeID)
+        pdu = APDU()
+        ack.encode(pdu)
+        pdu.pduSource = Address("5")
+        ase.confirmation = lambda apdu: None
+        sap.confirmation(pdu)
+
+        # the device information is kept with the round trip time
+        info = sap.deviceInfoCache.get_device_info(Address("5"))
+        assert info.smoothedRoundTripTime is not None
+        assert not sap.clientTransactions
+
+        # the invoke ID is free again
+        assert not sap.invokeIDAllocator.peers
+
+    def test_idle_devices(self):
+        if _debug: TestRetryTimeout._debug("test_idle_devices")
+
+        cache = DeviceInfoCache()
+        cache.max_idle_devices = 2
+
+        def use(addr, rtt=10.0):
+            info = cache.acquire_device_info(Address(addr))
+            info.smoothedRoundTripTime = rtt
+            return info
+
+        # one without round trip times is dropped right away
+        cache.release_device_info(use("4", None))
+        assert not cache.has_device_info(Address("4"))
+
+        for info in [use("1"), use("2"), use("3")]:
+            cache.release_device_info(info)
+
+        # the least recently used is dropped
+        assert not cache.has_device_info(Address("1"))
+        assert cache.has_device_info(Address("2"))
+        assert cache.has_device_info(Address("3"))
+
+        # using one again moves it to the end
+        cache.release_device_info(use("2"))
+        cache.release_device_info(use("5"))
+        assert cache.has_device_info(Address("2"))
+        assert not cache.has_device_info(Address("3"))
+
+        # one that is in use is not counted
+        info = use("2")
+        cache.release_device_info(use("6"))
+        assert cache.has_device_info(Address("5"))
+        cache.release_device_info(info)
+        assert not cache.has_device_info(Address("5"))
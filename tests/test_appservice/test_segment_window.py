@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Adaptive Segment Window
+----------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.app import DeviceInfo
+from bacpypes.appservice import StateMachineAccessPoint, ServerSSM
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestSegmentWindow(unittest.TestCase):
+
+    def test_fixed(self):
+        if _debug: TestSegmentWindow._debug("test_fixed")
+
+        sap = StateMachineAccessPoint()
+        ssm = ServerSSM(sap, DeviceInfo())
+
+        # smaller of what is proposed and what is accepted
+        ssm.actualWindowSize = ssm.start_window(16)
+        assert ssm.actualWindowSize == 8
+
+        # does not change
+        ssm.open_window()
+        ssm.close_window()
+        assert ssm.actualWindowSize == 8
+
+    def test_adaptive(self):
+        if _debug: TestSegmentWindow._debug("test_adaptive")
+
+        sap = StateMachineAccessPoint()
+        sap.adaptiveSegmentWindow = True
+        sap.maxSegmentsAccepted = 32
+        ssm = ServerSSM(sap, DeviceInfo())
+
+        ssm.actualWindowSize = ssm.start_window(16)
+        assert ssm.actualWindowSize == 1
+
+        # doubles up to the limit
+        sizes = []
+        for i in range(6):
+            ssm.open_window()
+            sizes.append(ssm.actualWindowSize)
+        assert sizes == [2, 4, 8, 16, 16, 16]
+
+        # cut in half once for the group
+        ssm.close_window()
+        ssm.close_window()
+        assert ssm.actualWindowSize == 8
+
+        # then grows by one
+        ssm.open_window()
+        assert ssm.actualWindowSize == 9
+        ssm.close_window()
+        assert ssm.actualWindowSize == 4
+        ssm.open_window()
+        assert ssm.actualWindowSize == 5
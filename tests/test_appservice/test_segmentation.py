@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Segmentation and Reassembly
+--------------------------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.pdu import Address
+from bacpypes.apdu import ConfirmedRequestPDU
+from bacpypes.app import DeviceInfo
+from bacpypes.appservice import StateMachineAccessPoint, ClientSSM, ServerSSM
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+def segment_apdu(sap, data, size):
+    """Return a list of the segments of a confirmed request."""
+    info = DeviceInfo()
+    info.address = Address("5")
+
+    ssm = ClientSSM(sap, info)
+    ssm.invokeID = 1
+    ssm.segmentSize = size
+    ssm.segmentCount = (len(data) + size - 1) // size
+    ssm.proposedWindowSize = 4
+
+    apdu = ConfirmedRequestPDU(12)
+    apdu.pduData = bytearray(data)
+    ssm.set_segmentation_context(apdu)
+
+    return [ssm.get_segment(i) for i in range(ssm.segmentCount)]
+
+
+@bacpypes_debugging
+class TestSegmentation(unittest.TestCase):
+
+    def test_segments(self):
+        if _debug: TestSegmentation._debug("test_segments")
+
+        data = bytes(bytearray(range(250)))
+        segments = segment_apdu(StateMachineAccessPoint(), data, 100)
+
+        # the segments are views of the same data
+        assert [len(seg.pduData) for seg in segments] == [100, 100, 50]
+        assert all(isinstance(seg.pduData, memoryview) for seg in segments)
+        assert segments[0].pduData.obj is segments[2].pduData.obj
+        assert b''.join(seg.pduData for seg in segments) == data
+        assert [seg.apduMor for seg in segments] == [True, True, False]
+
+    def test_reassembly(self):
+        if _debug: TestSegmentation._debug("test_reassembly")
+
+        sap = StateMachineAccessPoint()
+        data = bytes(bytearray(range(250)))
+        segments = segment_apdu(sap, data, 100)
+
+        ssm = ServerSSM(sap, DeviceInfo())
+        ssm.set_segmentation_context(segments[0])
+        assert ssm.append_segment(segments[1])
+        assert ssm.append_segment(segments[2])
+
+        # nothing is copied until the end
+        assert segments[0].pduData == data[:100]
+        ssm.join_segments()
+        assert ssm.segmentAPDU.pduData == data
+        assert ssm.segmentLength == 250
+
+    def test_reassembly_limit(self):
+        if _debug: TestSegmentation._debug("test_reassembly_limit")
+
+        sap = StateMachineAccessPoint()
+        sap.maxReassemblySize = 200
+        segments = segment_apdu(sap, bytes(250), 100)
+
+        ssm = ServerSSM(sap, DeviceInfo())
+        ssm.set_segmentation_context(segments[0])
+        assert ssm.append_segment(segments[1])
+        assert not ssm.append_segment(segments[2])
@@ -1 +1,202 @@
-# placeholder
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+BACpypes PDUData Testing
+------------------------
+"""
+
+import unittest
+import pickle
+from copy import deepcopy
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
+from bacpypes.errors import DecodingError
+from bacpypes.comm import PDUData, PDUBuffer
+from bacpypes.pdu import Address, PDU
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestPDUData(unittest.TestCase):
+
+    def test_pdudata(self):
+        if _debug: TestPDUData._debug("test_pdudata")
+
+        pdu = PDUData(xtob('0102030405060708'))
+        assert isinstance(pdu.pduData, bytearray)
+
+        assert pdu.get() == 1
+        assert pdu.get_short() == 0x0203
+        assert pdu.get_long() == 0x04050607
+        assert pdu.get_data(1) == xtob('08')
+        assert not pdu.pduData
+
+        with self.assertRaises(DecodingError):
+            pdu.get()
+
+    def test_decode_mode(self):
+        if _debug: TestPDUData._debug("test_decode_mode")
+
+        blob = xtob('0102030405060708')
+        pdu = PDUData(memoryview(blob))
+        assert isinstance(pdu.pduData, memoryview)
+
+        assert pdu.get() == 1
+        assert pdu.get_short() == 0x0203
+        assert pdu.get_long() == 0x04050607
+
+        # the data is a slice of the original buffer
+        data = pdu.get_data(1)
+        assert isinstance(data, memoryview)
+        assert data.obj is blob
+        assert data == xtob('08')
+        assert not pdu.pduData
+
+        with self.assertRaises(DecodingError):
+            pdu.get_data(1)
+
+    def test_decode_mode_copy(self):
+        if _debug: TestPDUData._debug("test_decode_mode_copy")
+
+        pdu = PDUData(memoryview(xtob('0102')))
+        pdu.get()
+
+        # copies share the view
+        pdu2 = PDUData(pdu)
+        assert pdu2.pduData == xtob('02')
+        assert pdu2.get() == 2
+        assert pdu.pduData == xtob('02')
+
+    def test_decode_mode_put(self):
+        if _debug: TestPDUData._debug("test_decode_mode_put")
+
+        pdu = PDUData(memoryview(xtob('0102')))
+        pdu.get()
+
+        # appending switches back to a bytearray
+        pdu.put(3)
+        assert isinstance(pdu.pduData, bytearray)
+        assert pdu.pduData == xtob('0203')
+
+        # views can be appended
+        pdu.put_data(memoryview(xtob('04')))
+        assert pdu.pduData == xtob('020304')
+
+    def test_deepcopy(self):
+        if _debug: TestPDUData._debug("test_deepcopy")
+
+        pdu = PDU(memoryview(xtob('0102')), source=Address(1), destination=Address(2))
+        pdu.pduUserData = [1]
+
+        # views are copied into a bytearray
+        pdu2 = deepcopy(pdu)
+        assert isinstance(pdu2.pduData, bytearray)
+        assert pdu2.pduData == xtob('0102')
+        assert pdu2.pduSource == Address(1)
+        assert pdu2.pduDestination == Address(2)
+        assert pdu2.pduUserData == [1]
+        assert pdu2.pduUserData is not pdu.pduUserData
+
+        # the encoding buffer is not shared
+        pdu.use_buffer()
+        pdu3 = deepcopy(pdu)
+        assert pdu3.get_buffer() is None
+        pdu3.put(3)
+        assert pdu.pduData == xtob('0102')
+
+    def test_pickle(self):
+        if _debug: TestPDUData._debug("test_pickle")
+
+        pdu = PDU(memoryview(xtob('0102')), source=Address(1), destination=Address(2))
+        pdu.pduUserData = [1]
+        pdu.use_buffer()
+
+        # views are pickled as a bytearray without the encoding buffer
+        pdu2 = pickle.loads(pickle.dumps(pdu))
+        assert isinstance(pdu2.pduData, bytearray)
+        assert pdu2.pduData == xtob('0102')
+        assert pdu2.pduSource == Address(1)
+        assert pdu2.pduDestination == Address(2)
+        assert pdu2.pduUserData == [1]
+        assert pdu2.get_buffer() is None
+
+
+@bacpypes_debugging
+class TestPDUBuffer(unittest.TestCase):
+
+    def test_pdu_buffer(self):
+        if _debug: TestPDUBuffer._debug("test_pdu_buffer")
+
+        buff = PDUBuffer(size=4, headroom=2)
+        buff.put(1)
+        buff.put_short(0x0203)
+        buff.put_long(0x04050607)
+        buff.put_data(xtob('08'))
+        assert buff.get_view() == xtob('0102030405060708')
+
+        # room in front
+        buff.prepend(xtob('0a0b'))
+        assert buff.get_view() == xtob('0a0b0102030405060708')
+
+        # more room in front
+        buff.prepend(xtob('0c0d0e'))
+        assert buff.get_view() == xtob('0c0d0e0a0b0102030405060708')
+        assert len(buff) == 13
+
+    def test_views(self):
+        if _debug: TestPDUBuffer._debug("test_views")
+
+        buff = PDUBuffer(size=2, headroom=0)
+        buff.put_data(xtob('0102'))
+        view = buff.get_view()
+
+        # growing does not change the views already handed out
+        buff.put_data(xtob('0304'))
+        buff.prepend(xtob('00'))
+        assert view == xtob('0102')
+        assert buff.get_view() == xtob('0001020304')
+
+    def test_encode_mode(self):
+        if _debug: TestPDUBuffer._debug("test_encode_mode")
+
+        pdu = PDUData(xtob('01'))
+        pdu.use_buffer()
+        pdu.put(2)
+        pdu.put_short(0x0304)
+        assert isinstance(pdu.pduData, memoryview)
+        assert pdu.pduData == xtob('01020304')
+
+        # replacing the data drops the buffer
+        pdu.pduData = bytearray(xtob('05'))
+        pdu.put(6)
+        assert pdu.get_buffer() is None
+        assert pdu.pduData == xtob('0506')
+
+    def test_put_pdu_data(self):
+        if _debug: TestPDUBuffer._debug("test_put_pdu_data")
+
+        payload = PDUData()
+        payload.use_buffer()
+        payload.put_data(xtob('0304'))
+        buff = payload.get_buffer()
+
+        # header then payload, the payload buffer is taken over
+        pdu = PDUData()
+        pdu.put_short(0x0102)
+        pdu.put_pdu_data(payload)
+        assert pdu.pduData == xtob('01020304')
+        assert pdu.get_buffer() is buff
+        assert payload.get_buffer() is None
+        assert payload.pduData == xtob('0304')
+
+        # a second time the data is copied
+        pdu2 = PDUData()
+        pdu2.put(0)
+        pdu2.put_pdu_data(payload)
+        assert pdu2.pduData == xtob('000304')
+        assert isinstance(pdu2.pduData, bytearray)
+        assert pdu.pduData == xtob('01020304')
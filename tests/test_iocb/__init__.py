@@ -0,0 +1,9 @@
+#!/usr/bin/python
+
+"""
+Test IOCB
+---------
+"""
+
+from . import test_window_queue
+from . import test_lightweight_iocb
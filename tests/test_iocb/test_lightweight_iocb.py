@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Lightweight IOCB
+---------------------
+"""
+
+import threading
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.iocb import IOCB, LightweightIOCB, IOGroup, COMPLETED
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestLightweightIOCB(unittest.TestCase):
+
+    def test_callback(self):
+        if _debug: TestLightweightIOCB._debug("test_callback")
+
+        results = []
+        iocb = LightweightIOCB(1)
+        iocb.add_callback(lambda iocb: results.append(iocb.ioResponse))
+
+        # no event until something waits
+        assert iocb.ioComplete._event is None
+
+        iocb.complete(2)
+        assert results == [2]
+        assert iocb.ioComplete.is_set()
+        assert iocb.ioComplete._event is None
+
+        # already complete, no waiting
+        iocb.wait()
+        assert iocb.ioComplete._event is None
+
+        # late callbacks are called
+        iocb.add_callback(lambda iocb: results.append(3))
+        assert results[-1] == 3
+
+    def test_wait(self):
+        if _debug: TestLightweightIOCB._debug("test_wait")
+
+        iocb = LightweightIOCB(1)
+        assert not iocb.ioComplete.wait(0.001)
+
+        # completed by another thread
+        thread = threading.Thread(target=iocb.complete, args=(2,))
+        thread.start()
+        iocb.wait(1.0)
+        thread.join()
+
+        assert iocb.ioState == COMPLETED
+        assert iocb.ioResponse == 2
+
+    def test_identity(self):
+        if _debug: TestLightweightIOCB._debug("test_identity")
+
+        # the same sequence as the other blocks
+        ids = [IOCB().ioID, LightweightIOCB().ioID, IOCB().ioID]
+        assert ids[0] < ids[1] < ids[2]
+
+    def test_group(self):
+        if _debug: TestLightweightIOCB._debug("test_group")
+
+        group = IOGroup()
+        members = [LightweightIOCB(i) for i in range(2)]
+        for iocb in members:
+            group.add(iocb)
+
+        members[0].complete(0)
+        assert group.ioState != COMPLETED
+        members[1].complete(1)
+        assert group.ioState == COMPLETED
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Window Queue
+-----------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.iocb import IOCB, WindowQueue, PENDING, ACTIVE, COMPLETED, ABORTED
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+@bacpypes_debugging
+class TestWindowQueue(unittest.TestCase):
+
+    def setup_queue(self, window_size, max_window_size):
+        if _debug: TestWindowQueue._debug("setup_queue %r %r", window_size, max_window_size)
+
+        # requests that have been sent
+        self.sent = []
+
+        queue = WindowQueue(self.sent.append, "addr", window_size, max_window_size)
+        iocbs = [IOCB(i) for i in range(6)]
+        for iocb in iocbs:
+            queue.request_io(iocb)
+
+        reset_time_machine()
+        return queue, iocbs
+
+    def test_window(self):
+        if _debug: TestWindowQueue._debug("test_window")
+
+        queue, iocbs = self.setup_queue(2, 2)
+
+        # two are active, the rest wait
+        assert self.sent == [0, 1]
+        assert [iocb.ioState for iocb in iocbs[:3]] == [ACTIVE, ACTIVE, PENDING]
+
+        # completing one out of order lets another one go
+        queue.complete_io(iocbs[1], "one")
+        run_time_machine(1.0)
+        assert self.sent == [0, 1, 2]
+        assert iocbs[1].ioState == COMPLETED
+        assert queue.active_iocbs == [iocbs[0], iocbs[2]]
+
+    def test_grow_shrink(self):
+        if _debug: TestWindowQueue._debug("test_grow_shrink")
+
+        queue, iocbs = self.setup_queue(1, 4)
+        assert self.sent == [0]
+
+        # the window grows as requests complete
+        queue.complete_io(iocbs[0], None)
+        run_time_machine(1.0)
+        assert queue.window_size == 2.0
+        assert self.sent == [0, 1, 2]
+
+        # and shrinks when there is trouble
+        queue.congestion()
+        queue.abort_io(iocbs[1], RuntimeError("busy"))
+        run_time_machine(1.0)
+        assert queue.window_size == 1.0
+        assert iocbs[1].ioState == ABORTED
+        assert self.sent == [0, 1, 2]
+
+    def test_abort_pending(self):
+        if _debug: TestWindowQueue._debug("test_abort_pending")
+
+        queue, iocbs = self.setup_queue(1, 1)
+
+        # aborting a waiting request takes it out of the queue
+        iocbs[1].abort(RuntimeError("cancel"))
+        assert iocbs[1].ioState == ABORTED
+        assert len(queue.ioQueue.queue) == 4
+
+        queue.complete_io(iocbs[0], None)
+        run_time_machine(1.0)
+        assert self.sent == [0, 2]
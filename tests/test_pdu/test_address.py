@@ -6,11 +6,14 @@ Nose Test PDU Address
 ---------------------
 """
 
+import copy
+import pickle
 import unittest
 
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob
 from bacpypes.pdu import Address, LocalStation, RemoteStation, \
-    LocalBroadcast, RemoteBroadcast, GlobalBroadcast
+    LocalBroadcast, RemoteBroadcast, GlobalBroadcast, InternedAddress, \
+    intern_address
 
 # some debugging
 _debug = 0
@@ -377,3 +380,67 @@ class TestAddressEquality(unittest.TestCase, MatchAddressMixin):
         assert Address("3:4") == RemoteStation(3, 4)
         assert Address("5:*") == RemoteBroadcast(5)
         assert Address("*:*") == GlobalBroadcast()
+
+
+@bacpypes_debugging
+class TestInternedAddress(unittest.TestCase, MatchAddressMixin):
+
+    def test_intern_address(self):
+        if _debug: TestInternedAddress._debug("test_intern_address")
+
+        test_addr = intern_address("3:4")
+        assert isinstance(test_addr, InternedAddress)
+        self.match_address(test_addr, 4, 3, 1, '04')
+        assert str(test_addr) == "3:4"
+
+        # the same arguments, the same address or an equal address all
+        # give the same instance
+        assert intern_address("3:4") is test_addr
+        assert intern_address(3, 4) is test_addr
+        assert intern_address(RemoteStation(3, 4)) is test_addr
+        assert intern_address(test_addr) is test_addr
+
+        # it is still equal to ones that are not interned
+        assert test_addr == RemoteStation(3, 4)
+        assert test_addr == "3:4"
+        assert hash(test_addr) == hash(RemoteStation(3, 4))
+
+    def test_intern_address_views(self):
+        if _debug: TestInternedAddress._debug("test_intern_address_views")
+
+        data = bytearray(xtob('c0a80001bac0'))
+        test_addr = intern_address(memoryview(data))
+        assert intern_address(xtob('c0a80001bac0')) is test_addr
+        assert intern_address(('192.168.0.1', 47808)) is test_addr
+        assert test_addr.addrTuple == ('192.168.0.1', 47808)
+
+        # changing the buffer does not change the address
+        data[0] = 10
+        assert intern_address(xtob('c0a80001bac0')) is test_addr
+        assert str(test_addr) == "192.168.0.1"
+
+    def test_intern_address_mask(self):
+        if _debug: TestInternedAddress._debug("test_intern_address_mask")
+
+        # addresses with a subnet mask are not shared
+        test_addr = intern_address("192.168.0.2/24")
+        assert test_addr.addrBroadcastTuple == ('192.168.0.255', 47808)
+        assert intern_address("192.168.0.2") is not test_addr
+        assert intern_address("192.168.0.2") == test_addr
+
+    def test_immutable(self):
+        if _debug: TestInternedAddress._debug("test_immutable")
+
+        test_addr = intern_address(5)
+        with self.assertRaises(TypeError):
+            test_addr.addrNet = 1
+        with self.assertRaises(TypeError):
+            del test_addr.addrAddr
+
+        # copies are the same address, pickles are regular addresses
+        assert copy.copy(test_addr) is test_addr
+        assert copy.deepcopy(test_addr) is test_addr
+
+        pickled_addr = pickle.loads(pickle.dumps(test_addr))
+        assert not isinstance(pickled_addr, InternedAddress)
+        assert pickled_addr == test_addr
@@ -11,7 +11,7 @@ import unittest
 from bacpypes.errors import InvalidTag
 from bacpypes.debugging import bacpypes_debugging, ModuleLogger, xtob, btox
 from bacpypes.primitivedata import Tag, ApplicationTag, ContextTag, \
-    OpeningTag, ClosingTag, TagList, \
+    OpeningTag, ClosingTag, TagList, TagReader, \
     Null, Boolean, Unsigned, Integer, Real, Double, OctetString, \
     CharacterString, BitString, Enumerated, Date, Time, ObjectIdentifier
 from bacpypes.pdu import PDUData
@@ -496,6 +496,136 @@ class TestTagList(unittest.TestCase):
         taglist.push(tag1)
         assert taglist.tagList == [tag1]
 
+    def test_pop_push(self):
+        if _debug: TestTagList._debug("test_pop_push")
+
+        tags = [IntegerTag(i) for i in range(4)]
+        taglist = TagList(tags[:])
+
+        # read from the front
+        assert taglist.Pop() == tags[0]
+        assert taglist.Pop() == tags[1]
+        assert len(taglist) == 2
+        assert taglist[0] == tags[2]
+        assert taglist[-1] == tags[3]
+        assert taglist[:] == tags[2:]
+        with self.assertRaises(IndexError):
+            taglist[-3]
+
+        # push back something different
+        taglist.push(tags[0])
+        assert taglist.Peek() == tags[0]
+        assert len(taglist) == 3
+
+        # the list of tags only has the unread ones
+        assert taglist.tagList == [tags[0], tags[2], tags[3]]
+
+        # drain it
+        assert taglist.Pop() == tags[0]
+        assert taglist.Pop() == tags[2]
+        assert taglist.Pop() == tags[3]
+        assert taglist.Pop() is None
+        assert taglist.Peek() is None
+        assert not taglist
+
+    def test_mark_restore(self):
+        if _debug: TestTagList._debug("test_mark_restore")
+
+        tags = [IntegerTag(i) for i in range(4)]
+        taglist = TagList(tags[:])
+        taglist.Pop()
+
+        # read some, then go back
+        mark = taglist.mark()
+        assert taglist.Pop() == tags[1]
+        assert taglist.Pop() == tags[2]
+        taglist.restore(mark)
+        assert taglist[:] == tags[1:]
+
+        # still good when the list of unread tags has been replaced
+        taglist.Pop()
+        assert taglist.tagList == tags[2:]
+        taglist.restore(mark)
+        assert list(taglist) == tags[1:]
+
+    def test_mark_push(self):
+        if _debug: TestTagList._debug("test_mark_push")
+
+        tags = [IntegerTag(i) for i in range(4)]
+        tag_data = tags[:]
+        taglist = TagList(tag_data)
+        assert taglist.Pop() == tags[0]
+
+        # pushing something different does not change the marked tags
+        mark = taglist.mark()
+        assert taglist.Pop() == tags[1]
+        extra = IntegerTag(9)
+        taglist.push(extra)
+        assert list(taglist) == [extra, tags[2], tags[3]]
+        taglist.restore(mark)
+        assert list(taglist) == tags[1:]
+
+        # or the list given to the tag list
+        assert tag_data == tags
+
+        # pushing back the same tag backs up over it
+        tag = taglist.Pop()
+        taglist.push(tag)
+        assert taglist._index == 1
+
+    def test_tag_list(self):
+        """Test the tagList is a list of the unread tags."""
+        if _debug: TestTagList._debug("test_tag_list")
+
+        tags = [IntegerTag(i) for i in range(4)]
+        taglist = TagList(tags[:])
+        taglist.Pop()
+
+        assert isinstance(taglist.tagList, list)
+        assert taglist.tagList + [tags[0]] == tags[1:] + [tags[0]]
+        assert taglist.tagList.copy() == tags[1:]
+
+        # changes go to the tag list
+        taglist.tagList.append(tags[0])
+        assert list(taglist) == tags[1:] + [tags[0]]
+
+    def test_tag_list_view(self):
+        """Test the tagListView of the unread tags."""
+        if _debug: TestTagList._debug("test_tag_list_view")
+
+        tags = [IntegerTag(i) for i in range(4)]
+        tag_data = tags[:]
+        taglist = TagList(tag_data)
+        taglist.Pop()
+
+        # the view does not copy the list of tags
+        view = taglist.tagListView
+        assert view == tags[1:]
+        assert taglist._index == 1
+        assert len(view) == 3
+        assert view[0] == tags[1]
+        assert view[-1] == tags[3]
+
+        # changes go to the tag list
+        mark = taglist.mark()
+        extra = IntegerTag(9)
+        view.insert(0, tags[0])
+        assert taglist.Pop() == tags[0]
+        del view[-1]
+        view[0] = extra
+        assert list(taglist) == [extra, tags[2]]
+
+        # but not to the marked tags or the list given to the tag list
+        assert tag_data == tags
+        taglist.restore(mark)
+        assert list(taglist) == tags[1:]
+
+        # slices
+        view[1:] = [extra]
+        assert taglist.tagList == [tags[1], extra]
+        del view[1:]
+        assert taglist.tagList == [tags[1]]
+
     def test_get_context(self):
         """Test extracting specific context encoded content.
         """
@@ -592,4 +722,121 @@ class TestTagList(unittest.TestCase):
 
         taglist = TagList()
         taglist.decode(data)
-        assert taglist.tagList == [tag0, tag1, tag2]
\ No newline at end of file
+        assert taglist.tagList == [tag0, tag1, tag2]
+
+    def test_decode_mode(self):
+        """Test decoding tags from a memoryview matches a bytearray."""
+        if _debug: TestTagList._debug("test_decode_mode")
+
+        tag0 = OpeningTag(0)
+        tag1 = IntegerTag(0x0102)
+        tag2 = ContextTag(20, xtob('00' * 300))
+        tag3 = Tag(Tag.applicationTagClass, Tag.booleanAppTag, 1, b'')
+        tag4 = ClosingTag(0)
+        taglist = TagList([tag0, tag1, tag2, tag3, tag4])
+
+        data = PDUData()
+        taglist.encode(data)
+        blob = bytes(data.pduData)
+
+        taglist1 = TagList()
+        taglist1.decode(PDUData(blob))
+
+        taglist2 = TagList()
+        taglist2.decode(PDUData(memoryview(blob)))
+        assert taglist1.tagList == taglist2.tagList == [tag0, tag1, tag2, tag3, tag4]
+
+        # tag data is not a view
+        assert isinstance(taglist2[2].tagData, bytes)
+
+        # truncated data is an invalid tag
+        with self.assertRaises(InvalidTag):
+            Tag(PDUData(memoryview(blob[4:10])))
+
+    def test_reader(self):
+        """Test a tag list built from a tag reader."""
+        if _debug: TestTagList._debug("test_reader")
+
+        tag0 = ContextTag(0, xtob('00'))
+        tag1 = IntegerTag(0x01)
+        tag2 = IntegerTag(0x02)
+        blob = xtob('09003101' '3102')
+
+        reader = TagReader(blob)
+        reader.advance()
+
+        # the rest of the tags are read
+        taglist = TagList(reader)
+        assert taglist.tagList == [tag1, tag2]
+        assert not reader
+
+
+@bacpypes_debugging
+class TestTagReader(unittest.TestCase):
+
+    def test_peek_read(self):
+        if _debug: TestTagReader._debug("test_peek_read")
+
+        reader = TagReader(xtob('09003102' '11'))
+        assert reader.peek() == (Tag.contextTagClass, 0, 1, 1, 2)
+        assert reader.peek() == (Tag.contextTagClass, 0, 1, 1, 2)
+        assert reader.read() == ContextTag(0, xtob('00'))
+        assert reader.read() == IntegerTag(2)
+
+        # application tagged boolean has no data
+        assert reader.read() == Tag(Tag.applicationTagClass, Tag.booleanAppTag, 1, b'')
+        assert not reader
+        assert reader.peek() is None
+        assert reader.read() is None
+
+    def test_skip(self):
+        if _debug: TestTagReader._debug("test_skip")
+
+        blob = xtob('0900' '1e' '3101' '2e3102' '2f' '1f' '3103')
+        reader = TagReader(blob)
+
+        # skip a context tag, then a whole group
+        assert reader.skip() == xtob('0900')
+        assert reader.skip() == xtob('1e31012e31022f1f')
+        assert reader.read() == IntegerTag(3)
+
+        # unbalanced groups
+        with self.assertRaises(InvalidTag):
+            TagReader(xtob('1e3101')).skip()
+        with self.assertRaises(InvalidTag):
+            TagReader(xtob('1f')).skip()
+
+    def test_read_tags(self):
+        if _debug: TestTagReader._debug("test_read_tags")
+
+        blob = xtob('0900' '1e' '3101' '1f' '2f' '3103')
+        reader = TagReader(blob)
+
+        # up to the closing tag that ends the group
+        assert reader.read_tags() == [
+            ContextTag(0, xtob('00')), OpeningTag(1), IntegerTag(1), ClosingTag(1),
+            ]
+        assert reader.peek()[:2] == (Tag.closingTagClass, 2)
+        reader.advance()
+
+        # or to the end of the data
+        assert reader.read_tags() == [IntegerTag(3)]
+        assert reader.read_tags() == []
+
+        with self.assertRaises(InvalidTag):
+            reader.advance()
+
+    def test_headers(self):
+        if _debug: TestTagReader._debug("test_headers")
+
+        reader = TagReader(xtob('0e' '6dfe0200' + '00' * 0x200 + '0f'))
+        headers = list(reader)
+        assert headers == [
+            (Tag.openingTagClass, 0, 0, 1, 1),
+            (Tag.contextTagClass, 6, 0x200, 5, 0x205),
+            (Tag.closingTagClass, 0, 0, 0x206, 0x206),
+            ]
+
+        # truncated data
+        with self.assertRaises(InvalidTag):
+            TagReader(xtob('6dfe020000')).read()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Task Manager
+-----------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.task import OneShotTask, TaskManager
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class SampleTask(OneShotTask):
+
+    def __init__(self, name, record):
+        OneShotTask.__init__(self)
+        self.name = name
+        self.record = record
+
+    def process_task(self):
+        self.record.append(self.name)
+
+
+@bacpypes_debugging
+class TestTaskManager(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+        self.task_manager = TaskManager()
+
+    def test_suspend(self):
+        if _debug: TestTaskManager._debug("test_suspend")
+
+        record = []
+        tasks = [SampleTask(i, record) for i in range(10)]
+        for i, task in enumerate(tasks):
+            task.install_task(delta=i + 1.0)
+
+        # suspend some, move one
+        tasks[0].suspend_task()
+        tasks[5].suspend_task()
+        tasks[3].install_task(delta=20.0)
+        assert not tasks[0].isScheduled
+        assert tasks[3].isScheduled
+
+        # the first entry is always a scheduled task
+        when, task = self.task_manager.tasks[0]
+        assert task is tasks[1]
+
+        run_time_machine(30.0)
+        assert record == [1, 2, 4, 6, 7, 8, 9, 3]
+        assert not self.task_manager.tasks
+        assert self.task_manager.deadTasks == 0
+
+    def test_rebuild(self):
+        if _debug: TestTaskManager._debug("test_rebuild")
+
+        record = []
+        tasks = [SampleTask(i, record) for i in range(100)]
+        for task in tasks:
+            task.install_task(delta=10.0)
+
+        # suspending most of them does not leave them all in the heap
+        for task in tasks[:90]:
+            task.suspend_task()
+        assert len(self.task_manager.tasks) < 60
+
+        # suspended twice is fine
+        tasks[0].suspend_task()
+
+        run_time_machine(20.0)
+        assert sorted(record) == list(range(90, 100))
+        assert not self.task_manager.tasks
+        assert self.task_manager.deadTasks == 0
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test Timing Wheel
+-----------------
+"""
+
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.task import OneShotTask, RecurringTask, TaskManager, TimingWheel
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class SampleTask(OneShotTask):
+
+    def __init__(self, name, record, wheel):
+        OneShotTask.__init__(self)
+        self.name = name
+        self.record = record
+        self.timingWheel = wheel
+
+    def process_task(self):
+        self.record.append((self.name, TaskManager().get_time()))
+
+
+class SampleRecurringTask(RecurringTask):
+
+    def __init__(self, record, wheel):
+        RecurringTask.__init__(self, 2000)
+        self.record = record
+        self.timingWheel = wheel
+
+    def process_task(self):
+        self.record.append(TaskManager().get_time())
+
+
+@bacpypes_debugging
+class TestTimingWheel(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+        self.task_manager = TaskManager()
+        self.wheel = TimingWheel(1.0, slots=8, levels=2)
+        self.tasks = []
+
+    def tearDown(self):
+        for task in self.tasks + [self.wheel]:
+            if task.isScheduled:
+                task.suspend_task()
+
+    def test_order(self):
+        if _debug: TestTimingWheel._debug("test_order")
+
+        record = []
+        for name, delta in (('c', 5.0), ('a', 1.0), ('b', 2.5), ('d', 5.0)):
+            task = SampleTask(name, record, self.wheel)
+            task.install_task(delta=delta)
+            self.tasks.append(task)
+        assert self.wheel.timerCount == 4
+
+        # one task in the task manager for the wheel
+        assert len(self.task_manager.tasks) == 1
+
+        # run at the first tick at or after the task time
+        run_time_machine(10.0)
+        assert record == [('a', 1.0), ('b', 3.0), ('c', 5.0), ('d', 5.0)]
+        assert self.wheel.timerCount == 0
+        assert not self.wheel.isScheduled
+
+    def test_cancel(self):
+        if _debug: TestTimingWheel._debug("test_cancel")
+
+        record = []
+        for name in range(4):
+            task = SampleTask(name, record, self.wheel)
+            task.install_task(delta=2.1 + name * 0.1)
+            self.tasks.append(task)
+
+        self.tasks[1].suspend_task()
+        assert not self.tasks[1].isScheduled
+
+        # moved later
+        self.tasks[2].install_task(delta=6.0)
+        assert self.wheel.timerCount == 3
+
+        # canceled twice is fine
+        self.tasks[1].suspend_task()
+
+        run_time_machine(10.0)
+        assert record == [(0, 3.0), (3, 3.0), (2, 6.0)]
+
+    def test_cascade(self):
+        if _debug: TestTimingWheel._debug("test_cascade")
+
+        # beyond the first level, and beyond the whole wheel
+        record = []
+        for name, delta in (('near', 7.0), ('far', 20.0), ('farther', 100.0), ('farthest', 200.5)):
+            task = SampleTask(name, record, self.wheel)
+            task.install_task(delta=delta)
+            self.tasks.append(task)
+
+        run_time_machine(300.0)
+        assert record == [('near', 7.0), ('far', 20.0), ('farther', 100.0), ('farthest', 201.0)]
+
+    def test_cancel_during_tick(self):
+        if _debug: TestTimingWheel._debug("test_cancel_during_tick")
+
+        record = []
+        first = SampleTask('first', record, self.wheel)
+        second = SampleTask('second', record, self.wheel)
+
+        # the first one cancels the second in the same tick
+        first.process_task = lambda: (record.append('first'), second.suspend_task())
+        first.install_task(delta=1.0)
+        second.install_task(delta=1.5)
+        self.tasks.extend([first, second])
+
+        run_time_machine(5.0)
+        assert record == ['first']
+        assert self.wheel.timerCount == 0
+
+    def test_recurring(self):
+        if _debug: TestTimingWheel._debug("test_recurring")
+
+        record = []
+        task = SampleRecurringTask(record, self.wheel)
+        task.install_task()
+        self.tasks.append(task)
+
+        run_time_machine(7.0)
+        assert record == [2.0, 4.0, 6.0]
+        assert task.isScheduled
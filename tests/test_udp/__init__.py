@@ -0,0 +1,8 @@
+#!/usr/bin/python
+
+"""
+Test UDP
+--------
+"""
+
+from . import test_udp_director
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Test UDP Director
+-----------------
+"""
+
+import socket
+import unittest
+
+from bacpypes.debugging import bacpypes_debugging, ModuleLogger
+
+from bacpypes.comm import Client, bind
+from bacpypes.pdu import PDU
+from bacpypes.udp import UDPDirector
+
+from ..time_machine import reset_time_machine, run_time_machine
+
+# some debugging
+_debug = 0
+_log = ModuleLogger(globals())
+
+
+class SampleClient(Client):
+
+    def __init__(self):
+        Client.__init__(self)
+        self.received = []
+
+    def confirmation(self, pdu):
+        self.received.append(bytes(pdu.pduData))
+
+
+@bacpypes_debugging
+class TestUDPDirector(unittest.TestCase):
+
+    def setUp(self):
+        reset_time_machine()
+
+        self.peer = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.peer.bind(('127.0.0.1', 0))
+        self.peer.settimeout(1.0)
+        self.peer_address = self.peer.getsockname()
+
+        self.director = None
+
+    def tearDown(self):
+        if self.director:
+            self.director.close()
+        self.peer.close()
+
+    def make_director(self, **kwargs):
+        self.director = UDPDirector(('127.0.0.1', 0), **kwargs)
+        self.address = self.director.socket.getsockname()
+
+        self.client = SampleClient()
+        bind(self.client, self.director)
+
+    def test_read_one(self):
+        if _debug: TestUDPDirector._debug("test_read_one")
+
+        self.make_director()
+        for i in range(3):
+            self.peer.sendto(bytes([i]), self.address)
+
+        # one at a time by default
+        self.director.handle_read()
+        run_time_machine(1.0)
+        assert self.client.received == [b'\x00']
+
+    def test_read_batch(self):
+        if _debug: TestUDPDirector._debug("test_read_batch")
+
+        self.make_director(batchSize=4)
+        for i in range(6):
+            self.peer.sendto(bytes([i]), self.address)
+
+        self.director.handle_read()
+        run_time_machine(1.0)
+        assert self.client.received == [bytes([i]) for i in range(4)]
+
+        # the rest, and nothing more to read is fine
+        self.director.handle_read()
+        run_time_machine(2.0)
+        assert self.client.received == [bytes([i]) for i in range(6)]
+
+    def test_read_nothing(self):
+        if _debug: TestUDPDirector._debug("test_read_nothing")
+
+        self.make_director()
+        errors = []
+        self.director.handle_error = errors.append
+
+        # nothing waiting to be read is not an error
+        self.director.handle_read()
+        run_time_machine(1.0)
+        assert errors == []
+        assert self.client.received == []
+
+    def test_write_batch(self):
+        if _debug: TestUDPDirector._debug("test_write_batch")
+
+        self.make_director(batchSize=2)
+        for i in range(3):
+            self.client.request(PDU(bytes([i]), destination=self.peer_address))
+        assert self.director.writable()
+
+        self.director.handle_write()
+        assert self.director.writable()
+        self.director.handle_write()
+        assert not self.director.writable()
+
+        received = [self.peer.recvfrom(16)[0] for i in range(3)]
+        assert received == [b'\x00', b'\x01', b'\x02']
+
+    def test_buffer_sizes(self):
+        if _debug: TestUDPDirector._debug("test_buffer_sizes")
+
+        self.make_director(rcvbuf=65536, sndbuf=32768)
+
+        # linux doubles the requested size
+        assert self.director.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 65536
+        assert self.director.socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) >= 32768